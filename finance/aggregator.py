@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧮 多数据源行情聚合
+- 同一个品种在各数据源的代码对照表（GC00Y ↔ GC=F ↔ fx_sxau ...）
+- 各数据源并发请求（每个源仍是一个批量请求），截止时间一到就用已返回的结果
+- fastest：每个品种取最先返回的有效报价，某个源卡住不拖慢整体
+- consensus：取中位数，偏离中位数超过 tolerance 的报价剔除后再取中位数
+- 每个数据源同一时间最多一个请求在跑：上一次还没返回时复用或跳过，卡住的源不会占满线程池
+"""
+
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# 同目录的批量行情与本地行情库
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from quotes import PROVIDERS, group_symbols, make_quote
+from quote_store import record_quotes
+
+# 品种 -> 各数据源代码（单位一致：美元/盎司，汇率为 1 美元兑人民币）
+INSTRUMENTS = {
+    "gold": ("eastmoney:101.GC00Y", "yahoo:GC=F", "sina:fx_sxau"),
+    "silver": ("eastmoney:101.SI00Y", "yahoo:SI=F", "sina:fx_sxag"),
+    "usdcny": ("sina:fx_susdcny", "yahoo:CNY=X"),   # 在岸人民币
+    "usdcnh": ("eastmoney:133.USDCNH",),             # 离岸人民币，与在岸有价差，不混在一起取中位数
+}
+
+# 卡住的请求留在后台线程里跑完，不阻塞调用方返回
+_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="quote-aggregator")
+
+# 数据源对象 -> (仍在跑的请求, 请求的代码)
+_IN_FLIGHT: Dict[object, Tuple[Future, frozenset]] = {}
+_IN_FLIGHT_LOCK = threading.Lock()
+
+def _submit(provider, codes: List[str], timeout: float) -> Optional[Future]:
+    """
+    提交一个数据源的批量请求
+
+    该源上一次的请求还没返回时不再提交：已覆盖这次的代码就复用它，否则返回 None（本次跳过该源）
+    """
+    with _IN_FLIGHT_LOCK:
+        running = _IN_FLIGHT.get(provider)
+        if running is not None and not running[0].done():
+            return running[0] if running[1] >= set(codes) else None
+        future = _EXECUTOR.submit(provider.fetch, codes, timeout)
+        _IN_FLIGHT[provider] = (future, frozenset(codes))
+        return future
+
+def _aliases(instruments: Dict[str, tuple]) -> Dict[str, str]:
+    """完整代码、去掉数据源的代码、东方财富去掉市场号的代码，都能查到品种"""
+    aliases = {}
+    for name, symbols in instruments.items():
+        for symbol in symbols:
+            code = symbol.partition(":")[2]
+            for alias in (symbol, code, code.rpartition(".")[2]):
+                aliases.setdefault(alias.lower(), name)
+    return aliases
+
+def valid_quote(quote: Optional[Dict], max_age: float = None) -> bool:
+    """有正的最新价；给出 max_age 时行情时间不能太旧（没有时间的不做检查）"""
+    if not quote or not quote.get("price") or quote["price"] <= 0:
+        return False
+    if max_age is not None and quote.get("time"):
+        return time.time() - quote["time"] <= max_age
+    return True
+
+class QuoteAggregator:
+    """
+    多数据源聚合
+
+    用法：
+        agg = QuoteAggregator(deadline=3)
+        agg.fastest(["gold", "usdcny"])        # 每个品种最先返回的有效报价
+        agg.consensus(["GC00Y"])               # 任意一个数据源的代码也能当品种名
+
+    返回 {品种: 行情记录}，在 quotes.make_quote 的字段外增加：
+        instrument  品种名
+        sources     采用的代码
+        rejected    被剔除的代码（consensus）
+        elapsed     从发出请求到得出结果的秒数
+    截止时间内没有可用报价的品种不出现在结果中
+    """
+
+    def __init__(self, instruments: Dict[str, tuple] = INSTRUMENTS, deadline: float = 3.0,
+                 tolerance: float = 0.01, max_age: float = None, timeout: float = 10,
+                 providers: Dict = None):
+        self.instruments = instruments
+        self.providers = providers or PROVIDERS
+        self.deadline = deadline
+        self.tolerance = tolerance
+        self.max_age = max_age
+        self.timeout = timeout
+        self._aliases = _aliases(instruments)
+
+    def resolve(self, name: str) -> str:
+        if name in self.instruments:
+            return name
+        instrument = self._aliases.get(name.lower())
+        if instrument is None:
+            raise ValueError(f"未知品种: {name}（可用: {'/'.join(self.instruments)}）")
+        return instrument
+
+    def _collect(self, instruments: List[str], enough: Callable[[Dict[str, Dict]], bool],
+                 deadline: float) -> Dict[str, Dict]:
+        """每个数据源一个批量请求并发发出，直到 enough(已收到的行情) 为真、全部返回或到截止时间"""
+        symbols = [symbol for name in instruments for symbol in self.instruments[name]]
+        pending = {}
+        for provider, codes in group_symbols(symbols).items():
+            future = _submit(self.providers[provider], codes, self.timeout)
+            if future is None:
+                print(f"⏳ {provider} 上一次请求仍未返回，本次跳过")
+            else:
+                pending[future] = provider
+        received: Dict[str, Dict] = {}
+        stop = time.monotonic() + deadline
+
+        while pending and not enough(received):
+            remaining = stop - time.monotonic()
+            if remaining <= 0:
+                break
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    # 字典保持到达顺序，fastest 按此挑选
+                    for quote in future.result().values():
+                        received[quote["symbol"]] = quote
+                except Exception as e:
+                    print(f"❌ {provider} 行情获取失败: {e}")
+
+        if pending and not enough(received):
+            print(f"⏱️ 截止时间 {deadline}s 内未返回: {', '.join(pending.values())}")
+        record_quotes(received.values())
+        return received
+
+    def _valid(self, name: str, received: Dict[str, Dict]) -> List[Dict]:
+        """该品种已收到的有效报价，按到达顺序"""
+        symbols = set(self.instruments[name])
+        return [q for s, q in received.items() if s in symbols and valid_quote(q, self.max_age)]
+
+    def _agreeing(self, quotes: List[Dict]) -> List[Dict]:
+        """与中位数的相对偏差不超过 tolerance 的报价"""
+        if not quotes:
+            return []
+        median = statistics.median(q["price"] for q in quotes)
+        return [q for q in quotes if abs(q["price"] - median) <= self.tolerance * median]
+
+    def fastest(self, names: Iterable[str], deadline: float = None) -> Dict[str, Dict]:
+        """每个品种最先返回的有效报价"""
+        start = time.monotonic()
+        instruments = list(dict.fromkeys(self.resolve(name) for name in names))
+        received = self._collect(
+            instruments,
+            lambda got: all(self._valid(name, got) for name in instruments),
+            self.deadline if deadline is None else deadline,
+        )
+
+        result = {}
+        for name in instruments:
+            quotes = self._valid(name, received)
+            if quotes:
+                result[name] = dict(quotes[0], instrument=name, sources=[quotes[0]["symbol"]],
+                                    rejected=[], elapsed=time.monotonic() - start)
+        return result
+
+    def consensus(self, names: Iterable[str], deadline: float = None,
+                  quorum: int = None) -> Dict[str, Dict]:
+        """
+        多个数据源的中位数
+
+        等所有数据源返回（或每个品种已有 quorum 个在 tolerance 内一致的报价）或到截止时间；
+        偏离中位数超过 tolerance（相对值）的报价剔除，剩下的再取中位数
+        """
+        start = time.monotonic()
+        instruments = list(dict.fromkeys(self.resolve(name) for name in names))
+        enough = (lambda got: False) if quorum is None else \
+            (lambda got: all(len(self._agreeing(self._valid(name, got))) >= quorum for name in instruments))
+        received = self._collect(instruments, enough, self.deadline if deadline is None else deadline)
+
+        result = {}
+        for name in instruments:
+            quotes = self._valid(name, received)
+            if not quotes:
+                continue
+            kept = self._agreeing(quotes)
+            if not kept:
+                print(f"⚠️ {name} 各数据源报价分歧过大: "
+                      + ", ".join(f"{q['symbol']}={q['price']}" for q in quotes))
+                continue
+
+            times = [q["time"] for q in kept if q.get("time")]
+            quote = make_quote(
+                "consensus", name,
+                name=kept[0]["name"],
+                price=statistics.median(q["price"] for q in kept),
+                currency=kept[0]["currency"],
+                time=max(times) if times else None,
+            )
+            result[name] = dict(
+                quote,
+                instrument=name,
+                sources=[q["symbol"] for q in kept],
+                rejected=[q["symbol"] for q in quotes if q not in kept],
+                elapsed=time.monotonic() - start,
+            )
+        return result
+
+    def get(self, names: Iterable[str], mode: str = "fastest", **kwargs) -> Dict[str, Dict]:
+        if mode not in ("fastest", "consensus"):
+            raise ValueError(f"未知模式: {mode}（fastest / consensus）")
+        return getattr(self, mode)(names, **kwargs)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="多数据源行情聚合")
+    parser.add_argument("names", nargs="*", default=["gold", "silver", "usdcny"], help="品种名或任一数据源代码")
+    parser.add_argument("--mode", choices=["fastest", "consensus"], default="fastest")
+    parser.add_argument("--deadline", type=float, default=3.0, help="截止时间（秒）")
+    args = parser.parse_args()
+
+    aggregator = QuoteAggregator(deadline=args.deadline)
+    for name, quote in aggregator.get(args.names, args.mode).items():
+        rejected = f"  剔除 {','.join(quote['rejected'])}" if quote["rejected"] else ""
+        print(f"{name:8} {quote['price']:>12.4f}  {quote['elapsed'] * 1000:6.0f}ms  "
+              f"来自 {','.join(quote['sources'])}{rejected}")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+💱 实时汇率
+- 汇率也是一条行情，走 quotes.py 的批量数据源，不单独写接口
+- 进程内短时缓存（默认 60 秒），一次运行内所有换算共用同一次查询
+- 调用方可以把汇率代码并进自己的批量请求（with_fx），不额外多发请求
+- 换算支持单个数、列表、字典和 numpy 数组，一次查汇率换算整批行情
+"""
+
+import os
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+# 同目录的批量行情与本地行情库
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from quotes import fetch_quotes
+from quote_store import record_quotes
+
+# 每个货币对按顺序尝试的行情代码，第一个为首选
+# USDCNY 为在岸人民币（换算默认用它）；离岸 CNH 与在岸有价差，单独作为 USDCNH，不混用
+FX_SYMBOLS = {
+    "USDCNY": ("sina:fx_susdcny", "yahoo:CNY=X"),
+    "USDCNH": ("eastmoney:133.USDCNH",),
+}
+
+OUNCE_TO_GRAM = 31.1035
+
+class FxRates:
+    """
+    汇率缓存
+
+    用法：
+        fx = default_fx()
+        quotes = fetch_quotes(fx.with_fx(["yahoo:GC=F"]))   # 汇率随同一批请求返回（优先选同一数据源的代码）
+        fx.observe(quotes)
+        fx.rate()                                    # 7.2 左右；缓存过期才重新请求，全部失败返回 None
+        fx.usd_oz_to_cny_g([2650.1, 2648.3])         # 整批换算，只查一次汇率
+    """
+
+    def __init__(self, ttl: float = 60, symbols: Dict[str, tuple] = FX_SYMBOLS):
+        self.ttl = ttl
+        self.symbols = symbols
+        self._lock = threading.Lock()            # 只保护 _rates，不跨网络请求
+        self._refresh_lock = threading.Lock()    # 同一时间只有一个调用方去请求
+        self._rates: Dict[str, tuple] = {}   # pair -> (rate, 取得时间, 代码)
+
+    def with_fx(self, symbols: Iterable[str], pair: str = "USDCNY") -> List[str]:
+        """在代码列表后追加该货币对的代码：优先选同一数据源的，能并进同一个批量请求"""
+        symbols = list(symbols)
+        candidates = self.symbols[pair]
+        providers = {symbol.partition(":")[0] for symbol in symbols}
+        chosen = next((c for c in candidates if c.partition(":")[0] in providers), candidates[0])
+        if chosen not in symbols:
+            symbols.append(chosen)
+        return symbols
+
+    def observe(self, quotes: Dict[str, Dict]) -> None:
+        """从一批行情中取出汇率代码的最新价写入缓存"""
+        now = time.time()
+        with self._lock:
+            for pair, candidates in self.symbols.items():
+                for symbol in candidates:
+                    price = (quotes.get(symbol) or {}).get("price")
+                    if price and price > 0:
+                        self._rates[pair] = (price, now, symbol)
+                        break
+
+    def _fresh(self, pair: str) -> Optional[float]:
+        with self._lock:
+            cached = self._rates.get(pair)
+        if cached and time.time() - cached[1] < self.ttl:
+            return cached[0]
+        return None
+
+    def rate(self, pair: str = "USDCNY") -> Optional[float]:
+        """
+        当前汇率
+
+        缓存未过期直接返回；否则按顺序请求候选代码，全部失败时退回过期的缓存值，
+        从未取到过则返回 None
+        """
+        rate = self._fresh(pair)
+        if rate is not None:
+            return rate
+
+        # 并发的调用方等同一次请求；请求期间不持 _lock，observe() 照常写入
+        with self._refresh_lock:
+            rate = self._fresh(pair)
+            if rate is not None:
+                return rate
+            for symbol in self.symbols[pair]:
+                quote = fetch_quotes([symbol]).get(symbol)
+                if quote and quote["price"] and quote["price"] > 0:
+                    record_quotes([quote])
+                    with self._lock:
+                        self._rates[pair] = (quote["price"], time.time(), symbol)
+                    return quote["price"]
+        with self._lock:
+            cached = self._rates.get(pair)
+
+        if cached:
+            print(f"⚠️ {pair} 汇率刷新失败，沿用 {time.time() - cached[1]:.0f} 秒前的 {cached[0]}")
+            return cached[0]
+        print(f"❌ {pair} 汇率获取失败")
+        return None
+
+    def source(self, pair: str = "USDCNY") -> Optional[str]:
+        """缓存中汇率来自哪个代码"""
+        with self._lock:
+            cached = self._rates.get(pair)
+        return cached[2] if cached else None
+
+    def convert(self, amounts, pair: str = "USDCNY", factor: float = 1.0):
+        """
+        按同一个汇率整批换算
+
+        amounts 可以是数、列表/元组、{键: 数} 或 numpy 数组，返回同样结构；
+        其中的 None 保持 None；汇率取不到时返回 None
+        """
+        rate = self.rate(pair)
+        if rate is None:
+            return None
+        k = rate * factor
+        if amounts is None:
+            return None
+        if isinstance(amounts, dict):
+            return {key: None if v is None else float(v) * k for key, v in amounts.items()}
+        if isinstance(amounts, (list, tuple)):
+            return [None if v is None else float(v) * k for v in amounts]
+        if hasattr(amounts, "dtype"):  # numpy 数组直接广播
+            return amounts * k
+        return float(amounts) * k
+
+    def usd_oz_to_cny_g(self, prices):
+        """美元/盎司 -> 人民币/克"""
+        return self.convert(prices, "USDCNY", 1 / OUNCE_TO_GRAM)
+
+_default_fx = None
+_default_fx_lock = threading.Lock()
+
+def default_fx() -> FxRates:
+    """进程内共享的汇率缓存"""
+    global _default_fx
+    with _default_fx_lock:
+        if _default_fx is None:
+            _default_fx = FxRates()
+        return _default_fx
+
+if __name__ == "__main__":
+    fx = default_fx()
+    for pair in fx.symbols:
+        rate = fx.rate(pair)
+        if rate is not None:
+            print(f"💱 {pair}: {rate:.4f}（{fx.source(pair)}）")
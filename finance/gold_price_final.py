@@ -5,9 +5,23 @@
 数据源：东方财富 (最可靠)
 """
 
-import requests
+import os
+import sys
 from datetime import datetime
 
+# 共用 scraping/ 下的重试与熔断
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+from retry import default_engine
+
+# 同目录的行情记录格式与本地行情库
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fx import default_fx
+from quotes import make_quote
+from quote_store import record_quotes
+
+RETRY = default_engine()
+FX = default_fx()
+
 def get_eastmoney_gold():
     """从东方财富获取黄金实时价格"""
     url = "https://push2.eastmoney.com/api/qt/ulist.np/get"
@@ -15,7 +29,8 @@ def get_eastmoney_gold():
         "ut": "fa5fd1943c7b386f172d6893dbfba10b",
         "fltt": "2",
         "invt": "2",
-        "fields": "f2,f3,f4,f12,f13,f14,f18,f20,f21,f33,f34,f35,f36",
+        # f124 为行情更新时间，休市时不变，本地行情库据此去重
+        "fields": "f2,f3,f4,f12,f13,f14,f18,f20,f21,f33,f34,f35,f36,f124",
         "secids": "101.GC00Y,122.XAU,113.au0"
     }
     headers = {
@@ -23,10 +38,11 @@ def get_eastmoney_gold():
     }
     
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=15)
+        response = RETRY.get(url, params=params, headers=headers, timeout=15)
         data = response.json()
         
         results = {}
+        quotes = []
         if "data" in data and "diff" in data["data"]:
             for item in data["data"]["diff"]:
                 code = item.get("f12")
@@ -47,6 +63,12 @@ def get_eastmoney_gold():
                     "最高": high,
                     "最低": low
                 }
+                quotes.append(make_quote(
+                    "eastmoney", f"{item.get('f13')}.{code}", name=name, price=price,
+                    change=change, change_pct=change_pct, prev_close=prev_close,
+                    time=item.get("f124")
+                ))
+        record_quotes(quotes)
         return results
     except Exception as e:
         return {"错误": str(e)}
@@ -56,24 +78,23 @@ if __name__ == "__main__":
     print(f"🪙 黄金实时行情 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 65)
     
-    # 汇率
-    USD_CNY = 7.25
-    OUNCE_TO_GRAM = 31.1035
-    
     data = get_eastmoney_gold()
     
     if "错误" in data:
         print(f"\n❌ 获取失败: {data['错误']}")
     else:
+        # 国际金价按实时汇率一次换算成人民币/克
+        cny = FX.usd_oz_to_cny_g({code: data[code].get("最新价") for code in ("GC00Y", "XAU") if code in data}) or {}
+
         # COMEX黄金
         if "GC00Y" in data:
             print("\n📊 COMEX黄金期货 (GC00Y)")
             item = data["GC00Y"]
             price = item.get("最新价", 0)
             if price:
-                cny_per_gram = price * USD_CNY / OUNCE_TO_GRAM
                 print(f"   💰 美元/盎司: ${price:,.2f}")
-                print(f"   💱 约人民币/克: ¥{cny_per_gram:,.2f}")
+                if cny.get("GC00Y") is not None:
+                    print(f"   💱 约人民币/克: ¥{cny['GC00Y']:,.2f}")
                 
                 change = item.get("涨跌额", 0)
                 change_pct = item.get("涨跌幅", 0)
@@ -95,9 +116,9 @@ if __name__ == "__main__":
             item = data["XAU"]
             price = item.get("最新价", 0)
             if price:
-                cny_per_gram = price * USD_CNY / OUNCE_TO_GRAM
                 print(f"   💰 美元/盎司: ${price:,.2f}")
-                print(f"   💱 约人民币/克: ¥{cny_per_gram:,.2f}")
+                if cny.get("XAU") is not None:
+                    print(f"   💱 约人民币/克: ¥{cny['XAU']:,.2f}")
         
         # 沪金
         if "au0" in data:
@@ -111,5 +132,9 @@ if __name__ == "__main__":
     print("💡 说明：")
     print("   • 数据来源: 东方财富")
     print("   • 银行纸黄金通常在国际金价基础上加10-20元/克溢价")
-    print("   • 人民币价格按汇率7.25估算")
+    rate = FX.rate()
+    if rate is not None:
+        print(f"   • 人民币价格按实时汇率 {rate:.4f}（{FX.source()}）估算")
+    else:
+        print("   • 汇率获取失败，未换算人民币价格")
     print("   • 本数据仅供参考，不构成投资建议")
@@ -5,113 +5,60 @@
 数据源：东方财富
 """
 
-import requests
-import json
+import os
+import sys
 from datetime import datetime
 
-def get_eastmoney_gold():
-    """从东方财富获取黄金期货价格"""
-    # 东方财富API - COMEX黄金
-    url = "https://push2.eastmoney.com/api/qt/stock/get"
-    params = {
-        "ut": "fa5fd1943c7b386f172d6893dbfba10b",
-        "fltt": "2",
-        "invt": "2",
-        "fields": "f43,f44,f45,f46,f47,f48,f57,f58,f60",
-        "secid": "101.GC00Y"  # COMEX黄金主力
-    }
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+# 同目录的批量行情（内部共用 scraping/ 下的重试、熔断和连接池）
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fx import default_fx
+from quotes import fetch_quotes
+from quote_store import record_quotes
+
+FX = default_fx()
+
+# 三个品种合并成一次 ulist.np 批量请求；在岸汇率（新浪 USDCNY）同时并发请求
+SYMBOLS = {
+    "comex": "eastmoney:101.GC00Y",  # COMEX黄金主力
+    "london": "eastmoney:122.XAU",   # 伦敦金
+    "sh": "eastmoney:113.au0",       # 沪金主力
+}
+
+def _to_legacy(quote):
+    """统一行情记录 -> 本脚本原来的中文字段"""
+    if quote is None:
+        return {"错误": "无法获取数据"}
+    return {
+        "最新价": quote["price"],
+        "今开": quote["open"],
+        "最高": quote["high"],
+        "最低": quote["low"],
+        "昨收": quote["prev_close"],
+        "名称": quote["name"],
+        "代码": quote["code"].split(".")[-1]
     }
-    
+
+def get_gold_quotes(keys=tuple(SYMBOLS)):
+    """一次批量请求获取多个品种，返回 {品种: 中文字段行情}"""
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        data = response.json()
-        
-        if data.get("data"):
-            d = data["data"]
-            return {
-                "最新价": d.get("f43"),
-                "今开": d.get("f44"),
-                "最高": d.get("f45"),
-                "最低": d.get("f46"),
-                "昨收": d.get("f60"),
-                "名称": d.get("f58"),
-                "代码": d.get("f57")
-            }
+        quotes = fetch_quotes(FX.with_fx([SYMBOLS[key] for key in keys]), timeout=10)
     except Exception as e:
-        return {"错误": str(e)}
-    
-    return {}
+        return {key: {"错误": str(e)} for key in keys}
+    FX.observe(quotes)
+    record_quotes(quotes.values())
+    return {key: _to_legacy(quotes.get(SYMBOLS[key])) for key in keys}
+
+def get_eastmoney_gold():
+    """从东方财富获取黄金期货价格"""
+    return get_gold_quotes(["comex"])["comex"]
 
 def get_london_gold():
     """获取伦敦金现货"""
-    # 尝试使用外汇黄金的接口
-    url = "https://push2.eastmoney.com/api/qt/stock/get"
-    params = {
-        "ut": "fa5fd1943c7b386f172d6893dbfba10b",
-        "fltt": "2",
-        "invt": "2", 
-        "fields": "f43,f44,f45,f46,f47,f48,f57,f58,f60",
-        "secid": "122.XAU"  # 伦敦金
-    }
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-    }
-    
-    try:
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        data = response.json()
-        
-        if data.get("data"):
-            d = data["data"]
-            return {
-                "最新价": d.get("f43"),
-                "今开": d.get("f44"),
-                "最高": d.get("f45"),
-                "最低": d.get("f46"),
-                "昨收": d.get("f60"),
-                "名称": d.get("f58"),
-                "代码": d.get("f57")
-            }
-    except Exception as e:
-        return {"错误": str(e)}
-    
-    return {}
+    return get_gold_quotes(["london"])["london"]
 
 def get_sh_gold():
     """获取上海黄金"""
-    url = "https://push2.eastmoney.com/api/qt/stock/get"
-    params = {
-        "ut": "fa5fd1943c7b386f172d6893dbfba10b",
-        "fltt": "2",
-        "invt": "2",
-        "fields": "f43,f44,f45,f46,f47,f48,f57,f58,f60",
-        "secid": "113.au0"  # 沪金主力
-    }
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-    }
-    
-    try:
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        data = response.json()
-        
-        if data.get("data"):
-            d = data["data"]
-            return {
-                "最新价": d.get("f43"),
-                "今开": d.get("f44"),
-                "最高": d.get("f45"),
-                "最低": d.get("f46"),
-                "昨收": d.get("f60"),
-                "名称": d.get("f58"),
-                "代码": d.get("f57")
-            }
-    except Exception as e:
-        return {"错误": str(e)}
-    
-    return {}
+    return get_gold_quotes(["sh"])["sh"]
 
 def format_price(value):
     """格式化价格"""
@@ -127,46 +74,42 @@ if __name__ == "__main__":
     print(f"🪙 黄金实时行情 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 60)
     
-    # 汇率
-    USD_CNY = 7.25
-    OUNCE_TO_GRAM = 31.1035
+    quotes = get_gold_quotes()
+    
+    # 国际金价按实时汇率一次换算成人民币/克
+    cny_per_gram = FX.usd_oz_to_cny_g({key: quotes[key].get("最新价") for key in ("comex", "london")}) or {}
     
     # COMEX黄金
     print("\n📊 COMEX黄金期货")
-    comex = get_eastmoney_gold()
+    comex = quotes["comex"]
     if comex:
         if "错误" in comex:
             print(f"   获取失败: {comex['错误']}")
         else:
             price = comex.get("最新价")
             if price:
-                price_usd = float(price)
-                price_cny_g = price_usd * USD_CNY / OUNCE_TO_GRAM
                 print(f"   💰 美元/盎司: ${format_price(price)}")
-                print(f"   💰 约人民币/克: ¥{price_cny_g:.2f}")
+                if cny_per_gram.get("comex") is not None:
+                    print(f"   💰 约人民币/克: ¥{cny_per_gram['comex']:.2f}")
                 print(f"   📈 最高: ${format_price(comex.get('最高'))}")
                 print(f"   📉 最低: ${format_price(comex.get('最低'))}")
                 print(f"   📊 昨收: ${format_price(comex.get('昨收'))}")
     
     # 伦敦金
     print("\n📊 伦敦金现货")
-    london = get_london_gold()
+    london = quotes["london"]
     if london and not london.get("错误"):
         price = london.get("最新价")
         if price:
-            try:
-                price_usd = float(price)
-                price_cny_g = price_usd * USD_CNY / OUNCE_TO_GRAM
-                print(f"   💰 美元/盎司: ${format_price(price)}")
-                print(f"   💰 约人民币/克: ¥{price_cny_g:.2f}")
-            except:
-                print(f"   💰 价格: {price}")
+            print(f"   💰 美元/盎司: ${format_price(price)}")
+            if cny_per_gram.get("london") is not None:
+                print(f"   💰 约人民币/克: ¥{cny_per_gram['london']:.2f}")
     else:
         print("   暂无法获取")
     
     # 沪金
     print("\n📊 上海黄金(沪金主连)")
-    sh = get_sh_gold()
+    sh = quotes["sh"]
     if sh:
         if "错误" in sh:
             print(f"   获取失败: {sh['错误']}")
@@ -179,6 +122,10 @@ if __name__ == "__main__":
     
     print("\n" + "=" * 60)
     print("💡 提示：")
-    print("   • 国际金价按汇率7.25估算，实际以银行报价为准")
+    rate = FX.rate()
+    if rate is not None:
+        print(f"   • 国际金价按实时汇率 {rate:.4f}（{FX.source()}）估算，实际以银行报价为准")
+    else:
+        print("   • 汇率获取失败，未换算人民币价格")
     print("   • 银行纸黄金通常在国际金价基础上加10-20元/克")
     print("   • 本脚本数据仅供参考，不构成投资建议")
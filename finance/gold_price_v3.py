@@ -5,10 +5,24 @@
 数据源：金投网 API
 """
 
-import requests
 import json
+import os
+import sys
 from datetime import datetime
 
+# 共用 scraping/ 下的重试与熔断
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+from retry import default_engine
+
+# 同目录的行情记录格式与本地行情库
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fx import OUNCE_TO_GRAM, default_fx
+from quotes import make_quote, sina_timestamp
+from quote_store import record_quotes
+
+RETRY = default_engine()
+FX = default_fx()
+
 def get_jintou_gold():
     """从金投网获取黄金价格"""
     try:
@@ -23,7 +37,7 @@ def get_jintou_gold():
             "Referer": "https://gold.cngold.org/"
         }
         
-        response = requests.get(url, params=params, headers=headers, timeout=10)
+        response = RETRY.get(url, params=params, headers=headers, timeout=10)
         return response.json()
     except Exception as e:
         return {"error": str(e)}
@@ -36,13 +50,18 @@ def get_sina_forex_gold():
             "Referer": "https://finance.sina.com.cn",
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         }
-        response = requests.get(url, headers=headers, timeout=10)
+        response = RETRY.get(url, headers=headers, timeout=10)
         response.encoding = 'gbk'
         
         # 解析: var hq_str_fx_sxau="美元/盎司,2955.45,2945.30,0.00,0.34%,2958.20,2932.15,0.00,0.00,0.00,0.00,2025-02-25,08:59:52,0,0";
         data_str = response.text
         if 'var hq_str_' in data_str:
             parts = data_str.split('="')[1].rstrip('";').split(',')
+            record_quotes([make_quote(
+                "sina", "fx_sxau", name=parts[0], price=parts[1], change=parts[2],
+                change_pct=parts[4], high=parts[5], low=parts[6],
+                time=sina_timestamp(parts[11], parts[12])
+            )])
             return {
                 "名称": parts[0],
                 "最新价": parts[1],
@@ -62,7 +81,7 @@ def get_boc_gold():
         # 这是一个示例，实际可能需要更复杂的解析
         url = "https://www.boc.cn/sourcedb/whpj/"
         headers = {"User-Agent": "Mozilla/5.0"}
-        response = requests.get(url, headers=headers, timeout=10)
+        response = RETRY.get(url, headers=headers, timeout=10)
         # 实际解析需要HTML解析器，这里简化处理
         return {"info": "请访问 https://www.boc.cn/sourcedb/whpj/ 查看"}
     except Exception as e:
@@ -86,11 +105,13 @@ if __name__ == "__main__":
         # 计算人民币价格
         try:
             price = float(sina.get('最新价', 0))
-            if price > 0:
-                cny_per_gram = price * 7.25 / 31.1035
-                print(f"   💱 约 ¥{cny_per_gram:.2f}/克 (按汇率7.25)")
-        except:
-            pass
+        except (TypeError, ValueError):
+            price = 0
+        rate = FX.rate() if price > 0 else None
+        if rate is not None:
+            print(f"   💱 约 ¥{price * rate / OUNCE_TO_GRAM:.2f}/克 (按实时汇率{rate:.4f})")
+        elif price > 0:
+            print("   💱 汇率获取失败，暂无人民币价格")
     else:
         print(f"   获取失败: {sina.get('error', '未知错误')}")
     
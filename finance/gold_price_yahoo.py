@@ -6,9 +6,14 @@
 安装：pip install yfinance
 """
 
+import os
 import sys
 from datetime import datetime
 
+# 同目录的实时汇率
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fx import default_fx
+
 def get_gold_price():
     """获取黄金价格"""
     try:
@@ -81,10 +86,9 @@ if __name__ == "__main__":
             print(f"   💰 最新: ${price:.2f}/盎司")
             
             # 计算人民币价格
-            USD_CNY = 7.25
-            OUNCE_TO_GRAM = 31.1035
-            cny_per_gram = price * USD_CNY / OUNCE_TO_GRAM
-            print(f"   💱 约 ¥{cny_per_gram:.2f}/克")
+            cny_per_gram = default_fx().usd_oz_to_cny_g(price)
+            if cny_per_gram is not None:
+                print(f"   💱 约 ¥{cny_per_gram:.2f}/克")
         
         if gold_data.get("最高"):
             print(f"   📈 最高: ${gold_data['最高']:.2f}")
@@ -5,110 +5,96 @@
 数据源：Yahoo Finance (无需安装 yfinance，直接调用API)
 """
 
-import requests
-import json
+import os
+import sys
 import re
 from datetime import datetime
 
-def get_yahoo_gold_price():
-    """直接从Yahoo Finance获取黄金价格"""
-    # GC=F 是 COMEX 黄金期货代码
-    symbol = "GC=F"
-    
-    # Yahoo Finance 的图表API
-    url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
-    
-    params = {
-        "interval": "1d",
-        "range": "1d"
+# 同目录的批量行情（内部共用 scraping/ 下的重试、熔断和连接池）
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fx import default_fx
+from quotes import fetch_quotes
+from quote_store import record_quotes
+
+FX = default_fx()
+
+# 三个代码（连同汇率 CNY=X）合并成一次 spark 批量请求
+SYMBOLS = {
+    "gold": "yahoo:GC=F",    # COMEX 黄金期货
+    "gld": "yahoo:GLD",      # SPDR 黄金 ETF
+    "silver": "yahoo:SI=F",  # COMEX 白银期货
+}
+
+def get_yahoo_quotes(keys=tuple(SYMBOLS)):
+    """一次批量请求获取多个代码，返回 {品种: 统一行情记录或 None}"""
+    quotes = fetch_quotes(FX.with_fx([SYMBOLS[key] for key in keys]), timeout=15)
+    FX.observe(quotes)
+    record_quotes(quotes.values())
+    return {key: quotes.get(SYMBOLS[key]) for key in keys}
+
+def _gold_fields(quote):
+    if not quote or quote["price"] is None:
+        return {"错误": "无法获取数据"}
+    return {
+        "最新价": quote["price"],
+        "昨收": quote["prev_close"],
+        "货币": quote["currency"],
+        "symbol": quote["code"],
+        "交易所": quote["exchange"]
     }
-    
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+def _gld_fields(quote):
+    if not quote:
+        return {}
+    return {
+        "最新价": quote["price"],
+        "昨收": quote["prev_close"],
+        "symbol": "GLD"
     }
-    
+
+def _silver_fields(quote):
+    if not quote:
+        return {}
+    return {
+        "最新价": quote["price"],
+        "symbol": "SI=F (白银期货)"
+    }
+
+def get_yahoo_gold_price():
+    """直接从Yahoo Finance获取黄金价格"""
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=15)
-        data = response.json()
-        
-        if "chart" in data and "result" in data["chart"] and data["chart"]["result"]:
-            result = data["chart"]["result"][0]
-            meta = result.get("meta", {})
-            
-            # 获取最新价格
-            regular_market_price = meta.get("regularMarketPrice")
-            previous_close = meta.get("previousClose")
-            
-            return {
-                "最新价": regular_market_price,
-                "昨收": previous_close,
-                "货币": meta.get("currency"),
-                "symbol": symbol,
-                "交易所": meta.get("exchangeName")
-            }
-        else:
-            return {"错误": "无法获取数据"}
-            
+        return _gold_fields(get_yahoo_quotes(["gold"])["gold"])
     except Exception as e:
         return {"错误": str(e)}
 
 def get_gld_etf():
     """获取黄金ETF(GLD)作为参考"""
-    symbol = "GLD"
-    url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
-    params = {"interval": "1d", "range": "1d"}
-    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
-    
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=15)
-        data = response.json()
-        
-        if "chart" in data and "result" in data["chart"] and data["chart"]["result"]:
-            result = data["chart"]["result"][0]
-            meta = result.get("meta", {})
-            return {
-                "最新价": meta.get("regularMarketPrice"),
-                "昨收": meta.get("previousClose"),
-                "symbol": "GLD"
-            }
+        return _gld_fields(get_yahoo_quotes(["gld"])["gld"])
     except Exception as e:
         return {"错误": str(e)}
-    return {}
 
 def get_silver_price():
     """获取白银价格作为参考"""
-    symbol = "SI=F"
-    url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
-    params = {"interval": "1d", "range": "1d"}
-    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
-    
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=15)
-        data = response.json()
-        
-        if "chart" in data and "result" in data["chart"] and data["chart"]["result"]:
-            result = data["chart"]["result"][0]
-            meta = result.get("meta", {})
-            return {
-                "最新价": meta.get("regularMarketPrice"),
-                "symbol": "SI=F (白银期货)"
-            }
-    except:
-        pass
-    return {}
+        return _silver_fields(get_yahoo_quotes(["silver"])["silver"])
+    except Exception:
+        return {}
 
 if __name__ == "__main__":
     print("=" * 65)
     print(f"🪙 黄金实时行情 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 65)
     
-    # 汇率
-    USD_CNY = 7.25
-    OUNCE_TO_GRAM = 31.1035
+    try:
+        quotes = get_yahoo_quotes()
+    except Exception as e:
+        quotes = {}
+        print(f"\n❌ 获取失败: {e}")
     
     # COMEX黄金
     print("\n📊 COMEX黄金期货 (GC=F)")
-    gold = get_yahoo_gold_price()
+    gold = _gold_fields(quotes.get("gold"))
     
     if "错误" in gold:
         print(f"   ❌ 获取失败: {gold['错误']}")
@@ -118,11 +104,12 @@ if __name__ == "__main__":
         change = price - prev if prev else 0
         change_pct = (change / prev * 100) if prev else 0
         
-        # 计算人民币价格
-        cny_per_gram = price * USD_CNY / OUNCE_TO_GRAM
+        # 计算人民币价格（汇率已随同一批请求取回）
+        cny_per_gram = FX.usd_oz_to_cny_g(price)
         
         print(f"   💰 美元/盎司: ${price:,.2f}")
-        print(f"   💱 约人民币/克: ¥{cny_per_gram:,.2f}")
+        if cny_per_gram is not None:
+            print(f"   💱 约人民币/克: ¥{cny_per_gram:,.2f}")
         
         if change >= 0:
             print(f"   📈 涨跌: +${change:.2f} (+{change_pct:.2f}%)")
@@ -133,13 +120,13 @@ if __name__ == "__main__":
             print(f"   📊 昨收: ${prev:,.2f}")
     
     # 黄金ETF
-    gld = get_gld_etf()
+    gld = _gld_fields(quotes.get("gld"))
     if gld and not gld.get("错误") and gld.get("最新价"):
         print(f"\n📊 SPDR黄金ETF (GLD)")
         print(f"   💰 价格: ${gld['最新价']:.2f}")
     
     # 白银
-    silver = get_silver_price()
+    silver = _silver_fields(quotes.get("silver"))
     if silver and silver.get("最新价"):
         print(f"\n📊 COMEX白银期货 (SI=F)")
         print(f"   💰 价格: ${silver['最新价']:.2f}/盎司")
@@ -148,5 +135,9 @@ if __name__ == "__main__":
     print("💡 说明：")
     print("   • 数据来源: Yahoo Finance")
     print("   • 银行纸黄金通常在国际金价基础上加10-20元/克溢价")
-    print("   • 人民币价格按汇率7.25估算")
+    rate = FX.rate()
+    if rate is not None:
+        print(f"   • 人民币价格按实时汇率 {rate:.4f}（{FX.source()}）估算")
+    else:
+        print("   • 汇率获取失败，未换算人民币价格")
     print("   • 本数据仅供参考，不构成投资建议")
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📐 行情指标
+- 基于 NumPy，对 代码 × 时间 的价格矩阵一次算完所有代码
+  均线 / 波动率 / 回撤 / RSI / COMEX 与上期所黄金价差（GC00Y vs au0）
+- IndicatorEngine 逐笔增量更新，新行情到来时不重算整段历史
+- load_matrix 从本地行情库按统一时间网格读出矩阵
+
+价格矩阵形状为 (代码数, 时间点数)，缺失为 NaN；一维数组按单个代码处理
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+OUNCE_TO_GRAM = 31.1035
+
+# (COMEX 黄金, 沪金, 美元兑人民币)
+SPREAD_SYMBOLS = ("eastmoney:101.GC00Y", "eastmoney:113.au0", "sina:fx_susdcny")
+
+def _as_matrix(prices) -> np.ndarray:
+    return np.atleast_2d(np.asarray(prices, dtype=float))
+
+def _windowed(x: np.ndarray, window: int, func) -> np.ndarray:
+    """对最后一维做长度为 window 的滑动窗口计算，前 window-1 个点为 NaN"""
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] >= window:
+        out[..., window - 1:] = func(sliding_window_view(x, window, axis=-1))
+    return out
+
+# ============ 批量计算 ============
+
+def sma(prices, window: int) -> np.ndarray:
+    """简单移动平均；窗口内有缺失时为 NaN"""
+    x = _as_matrix(prices)
+    return _windowed(x, window, lambda w: w.mean(axis=-1)).reshape(np.shape(prices))
+
+def log_returns(prices) -> np.ndarray:
+    """对数收益率，与价格等长，第一个点为 NaN"""
+    x = _as_matrix(prices)
+    out = np.full(x.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[:, 1:] = np.diff(np.log(x), axis=-1)
+    return out.reshape(np.shape(prices))
+
+def volatility(prices, window: int = 20, periods_per_year: float = None) -> np.ndarray:
+    """最近 window 个对数收益率的样本标准差；给出 periods_per_year 时年化"""
+    r = _as_matrix(log_returns(prices))
+    out = np.full(r.shape, np.nan)
+    out[:, 1:] = _windowed(r[:, 1:], window, lambda w: w.std(axis=-1, ddof=1))
+    if periods_per_year:
+        out *= np.sqrt(periods_per_year)
+    return out.reshape(np.shape(prices))
+
+def drawdown(prices) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    回撤
+
+    Returns:
+        (每个时间点相对历史最高价的回撤（≤ 0）, 每个代码的最大回撤)
+    """
+    x = _as_matrix(prices)
+    peak = np.fmax.accumulate(x, axis=-1)
+    with np.errstate(invalid="ignore"):
+        dd = x / peak - 1
+    max_dd = np.fmin.reduce(dd, axis=-1)
+    if np.ndim(prices) == 1:
+        return dd[0], max_dd[0]
+    return dd, max_dd
+
+def _linear_recurrence(d: np.ndarray, b: np.ndarray, chunk: int) -> np.ndarray:
+    """
+    沿最后一维求 y[t] = d[t] * y[t-1] + b[t]（y[-1] = 0）
+
+    闭式解 y[t] = P[t] * Σ b[j] / P[j]，P 为 d 的累积乘积；分块计算防止 P 下溢，块间只传递末值
+    """
+    out = np.empty(b.shape)
+    carry = np.zeros(b.shape[:-1])
+    for lo in range(0, b.shape[-1], chunk):
+        p = np.cumprod(d[:, lo:lo + chunk], axis=-1)
+        block = p * (carry[:, None] + np.cumsum(b[:, lo:lo + chunk] / p, axis=-1))
+        out[:, lo:lo + chunk] = block
+        carry = block[:, -1]
+    return out
+
+def rsi(prices, period: int = 14) -> np.ndarray:
+    """
+    Wilder RSI，整段向量化计算，结果与逐笔的 RsiState 一致
+
+    前 period 个变动取平均，之后是 alpha = 1/period 的 EMA；缺失点（NaN）不推进平滑，
+    下一个价格与最近的有效价格比较。两段合起来是一个线性递推，用累积乘积闭式求解
+    """
+    if period < 2:
+        raise ValueError("period 至少为 2")
+    x = _as_matrix(prices)
+    valid = ~np.isnan(x)
+
+    # 每个时间点之前最近的有效价格
+    cols = np.arange(x.shape[1])
+    last = np.maximum.accumulate(np.where(valid, cols, -1), axis=-1)
+    prev_idx = np.concatenate([np.full((x.shape[0], 1), -1), last[:, :-1]], axis=-1)
+    prev = np.take_along_axis(x, np.maximum(prev_idx, 0), axis=-1)
+    has_prev = valid & (prev_idx >= 0)
+
+    change = np.where(has_prev, x - prev, 0.0)
+    seen = np.cumsum(has_prev, axis=-1)
+    warm = has_prev & (seen <= period)
+    smooth = has_prev & (seen > period)
+
+    alpha = 1.0 / period
+    # 预热段 y += g/period（d=1），平滑段 y = (1-alpha)·y + alpha·g，没有新价格时不变
+    d = np.where(smooth, 1 - alpha, 1.0)
+    scale = np.where(warm, 1.0 / period, np.where(smooth, alpha, 0.0))
+    # (1-alpha)^chunk 不小于 1e-150
+    chunk = max(1, int(150 * np.log(10) / -np.log1p(-alpha)))
+    avg_gain = _linear_recurrence(d, scale * np.maximum(change, 0.0), chunk)
+    avg_loss = _linear_recurrence(d, scale * np.maximum(-change, 0.0), chunk)
+    return _rsi_value(avg_gain, avg_loss, seen, period).reshape(np.shape(prices))
+
+def _rsi_value(avg_gain, avg_loss, seen, period: int) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100 - 100 / (1 + avg_gain / avg_loss)
+    # 没有下跌时 RSI 为 100，完全不动时记为 50
+    out = np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), out)
+    return np.where(seen >= period, out, np.nan)
+
+def comex_shfe_spread(comex_usd_oz, shfe_cny_g, usd_cny) -> np.ndarray:
+    """COMEX 黄金（美元/盎司）折算成人民币/克后减去沪金（人民币/克），正值为外盘更贵"""
+    return np.asarray(comex_usd_oz, dtype=float) * usd_cny / OUNCE_TO_GRAM - np.asarray(shfe_cny_g, dtype=float)
+
+def compute(prices, sma_windows: Sequence[int] = (5, 20), vol_window: int = 20,
+            rsi_period: int = 14, spread: Tuple[int, int] = None, usd_cny=None) -> Dict[str, np.ndarray]:
+    """
+    一次算出全部指标，返回 {指标名: 与 prices 同形状的数组}（max_drawdown 每个代码一个值）
+
+    spread 为 (COMEX 行号, 沪金行号)，同时给出 usd_cny（标量或每个时间点一个值）时
+    另外返回 "spread"：每个时间点的 COMEX 与上期所价差（人民币/克）
+    """
+    result = {f"sma_{w}": sma(prices, w) for w in sma_windows}
+    result["volatility"] = volatility(prices, vol_window)
+    result["drawdown"], result["max_drawdown"] = drawdown(prices)
+    result["rsi"] = rsi(prices, rsi_period)
+    if spread is not None and usd_cny is not None:
+        x = _as_matrix(prices)
+        result["spread"] = comex_shfe_spread(x[spread[0]], x[spread[1]], usd_cny)
+    return result
+
+# ============ 增量计算 ============
+
+class RsiState:
+    """Wilder RSI 的滚动状态：前 period 个变动取平均，之后按 (n-1)/n 平滑；NaN 表示该代码本次没有新价格"""
+
+    def __init__(self, n: int, period: int = 14):
+        self.period = period
+        self.last = np.full(n, np.nan)
+        self.seen = np.zeros(n, dtype=int)
+        self.avg_gain = np.zeros(n)
+        self.avg_loss = np.zeros(n)
+
+    def update(self, prices) -> np.ndarray:
+        prices = np.asarray(prices, dtype=float)
+        valid = ~np.isnan(prices)
+        has_prev = valid & ~np.isnan(self.last)
+        change = np.where(has_prev, prices - np.nan_to_num(self.last), 0.0)
+        gain = np.maximum(change, 0.0)
+        loss = np.maximum(-change, 0.0)
+
+        warm = has_prev & (self.seen < self.period)
+        self.avg_gain[warm] += gain[warm] / self.period
+        self.avg_loss[warm] += loss[warm] / self.period
+        smooth = has_prev & (self.seen >= self.period)
+        self.avg_gain[smooth] = (self.avg_gain[smooth] * (self.period - 1) + gain[smooth]) / self.period
+        self.avg_loss[smooth] = (self.avg_loss[smooth] * (self.period - 1) + loss[smooth]) / self.period
+
+        self.seen[has_prev] += 1
+        self.last[valid] = prices[valid]
+        return self.value()
+
+    def value(self) -> np.ndarray:
+        return _rsi_value(self.avg_gain, self.avg_loss, self.seen, self.period)
+
+class IndicatorEngine:
+    """
+    增量指标引擎
+
+    每个代码保留最近几个价格的环形缓冲区，以及回撤和 RSI 的滚动状态；
+    update() 一次传入所有代码的最新价，所有指标对全部代码向量化更新
+
+    用法：
+        engine = IndicatorEngine(["eastmoney:101.GC00Y", "eastmoney:113.au0"],
+                                 spread=("eastmoney:101.GC00Y", "eastmoney:113.au0"))
+        engine.warm_up(matrix)                  # 可选：用历史矩阵预热
+        latest = engine.update({"eastmoney:101.GC00Y": 2650.1}, usd_cny=7.1)
+        latest["rsi"], latest["spread"]
+    """
+
+    def __init__(self, symbols: Iterable[str], sma_windows: Sequence[int] = (5, 20),
+                 vol_window: int = 20, rsi_period: int = 14, spread: Tuple[str, str] = None):
+        self.symbols: List[str] = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.sma_windows = tuple(sma_windows)
+        self.vol_window = vol_window
+        self.spread = spread
+        n = len(self.symbols)
+
+        self.size = max(max(self.sma_windows), vol_window + 1)
+        self._buffer = np.full((n, self.size), np.nan)
+        self._pos = np.zeros(n, dtype=int)
+        self._rows = np.arange(n)[:, None]
+        self.latest = np.full(n, np.nan)
+        self.peak = np.full(n, np.nan)
+        self.max_drawdown = np.full(n, np.nan)
+        self._rsi = RsiState(n, rsi_period)
+
+    def _vector(self, prices) -> np.ndarray:
+        if isinstance(prices, dict):
+            vector = np.full(len(self.symbols), np.nan)
+            for symbol, price in prices.items():
+                if symbol in self.index and price is not None:
+                    vector[self.index[symbol]] = price
+            return vector
+        return np.asarray(prices, dtype=float)
+
+    def _recent(self, window: int) -> np.ndarray:
+        """每个代码最近 window 个价格，(代码数, window)，从旧到新"""
+        cols = (self._pos[:, None] - window + np.arange(window)) % self.size
+        return self._buffer[self._rows, cols]
+
+    def update(self, prices, usd_cny: float = None) -> Dict[str, np.ndarray]:
+        """
+        推进一步
+
+        Args:
+            prices: {代码: 最新价} 或与 symbols 对齐的数组；没有新价格的代码不变
+            usd_cny: 汇率，给出且设置了 spread 时计算价差
+
+        Returns:
+            {指标名: 每个代码的最新值}，顺序与 symbols 一致；spread 为单个数值
+        """
+        prices = self._vector(prices)
+        valid = ~np.isnan(prices)
+
+        self._buffer[valid, self._pos[valid]] = prices[valid]
+        self._pos[valid] = (self._pos[valid] + 1) % self.size
+        self.latest[valid] = prices[valid]
+        self.peak = np.fmax(self.peak, prices)
+        with np.errstate(invalid="ignore"):
+            dd = self.latest / self.peak - 1
+        self.max_drawdown = np.fmin(self.max_drawdown, dd)
+
+        result = {"price": self.latest.copy()}
+        for window in self.sma_windows:
+            result[f"sma_{window}"] = self._recent(window).mean(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.diff(np.log(self._recent(self.vol_window + 1)), axis=1)
+        result["volatility"] = returns.std(axis=1, ddof=1)
+        result["drawdown"] = dd
+        result["max_drawdown"] = self.max_drawdown.copy()
+        result["rsi"] = self._rsi.update(prices)
+
+        if self.spread and usd_cny:
+            comex, shfe = (self.latest[self.index[s]] for s in self.spread)
+            result["spread"] = float(comex_shfe_spread(comex, shfe, usd_cny))
+        return result
+
+    def warm_up(self, matrix) -> Optional[Dict[str, np.ndarray]]:
+        """按时间顺序喂入历史矩阵 (代码数, 时间点数)，返回最后一步的指标"""
+        result = None
+        for column in _as_matrix(matrix).T:
+            result = self.update(column)
+        return result
+
+# ============ 从行情库读取 ============
+
+def asof(times: np.ndarray, values: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """按时间网格取每个时间点及之前的最新值（as-of join），之前没有数据为 NaN"""
+    idx = np.searchsorted(times, grid, side="right") - 1
+    out = np.full(len(grid), np.nan)
+    ok = idx >= 0
+    out[ok] = np.asarray(values)[idx[ok]]
+    return out
+
+def load_matrix(store, symbols: Sequence[str], start: float = None, end: float = None,
+                step: float = 60) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    从 QuoteStore 读出价格矩阵
+
+    Returns:
+        (时间网格, (代码数, 时间点数) 的价格矩阵)；各代码按 as-of 对齐到每 step 秒一个点
+    """
+    series = [store.read(symbol, start, end, columns=("time", "price")) for symbol in symbols]
+    times = [s["time"] for s in series if len(s["time"])]
+    if not times:
+        return np.empty(0), np.empty((len(symbols), 0))
+
+    first = start if start is not None else min(t[0] for t in times)
+    last = end if end is not None else max(t[-1] for t in times)
+    grid = np.arange(first, last + step, step)
+    matrix = np.vstack([asof(s["time"], s["price"], grid) for s in series])
+    return grid, matrix
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import time
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from quote_store import default_store
+
+    store = default_store()
+    symbols = sys.argv[1:] or store.symbols()
+    if not symbols:
+        print("⚠️ 行情库为空，先运行 quotes.py / gold_price*.py 抓取行情")
+        sys.exit(0)
+
+    grid, matrix = load_matrix(store, symbols, start=time.time() - 7 * 86400)
+    if not len(grid):
+        print("⚠️ 最近 7 天没有行情")
+        sys.exit(0)
+    spread, usd_cny = None, None
+    if all(symbol in symbols for symbol in SPREAD_SYMBOLS):
+        comex, shfe, fx = (symbols.index(symbol) for symbol in SPREAD_SYMBOLS)
+        spread, usd_cny = (comex, shfe), matrix[fx]
+    result = compute(matrix, spread=spread, usd_cny=usd_cny)
+    print(f"📐 最近 7 天，{len(grid)} 个时间点")
+    for i, symbol in enumerate(symbols):
+        print(f"{symbol:24} 价格 {matrix[i, -1]:>10.2f}  MA20 {result['sma_20'][i, -1]:>10.2f}  "
+              f"RSI {result['rsi'][i, -1]:>6.1f}  最大回撤 {result['max_drawdown'][i] * 100:>6.2f}%")
+    if "spread" in result:
+        print(f"💱 COMEX - 沪金价差: {result['spread'][-1]:+.2f} 元/克")
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🗄️ 本地行情库
+- 每次抓到的行情追加写入本地，按 代码 / 日期(UTC) / 字段 分列存储
+  ~/.cache/bear-toolbox/quotes/<代码>/<YYYY-MM-DD>/<字段>.f8（小端 float64，只追加）
+- SQLite 小索引记录每个代码每天的条数和时间范围
+- 多个进程可以同时写同一个库：追加时加文件锁，并在锁内重新读索引里的最新时间
+- 区间查询用 numpy memmap 直接映射列文件，不再重复下载历史
+- 写入只用标准库，没装 numpy 时抓取脚本照常落盘，读取时才需要 numpy
+"""
+
+import os
+import sqlite3
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence
+from urllib.parse import quote as url_quote
+
+try:
+    import numpy as np
+except ImportError:  # 只写不读时不需要 numpy
+    np = None
+
+try:
+    import fcntl
+except ImportError:  # Windows：只有进程内的锁
+    fcntl = None
+
+DEFAULT_ROOT = os.path.join(os.path.expanduser("~"), ".cache", "bear-toolbox", "quotes")
+
+# time: 行情时间（Unix 秒，缺失时用抓取时间）；fetched: 抓取时间
+COLUMNS = ("time", "fetched", "price", "change", "change_pct", "open", "high", "low", "prev_close")
+
+_PACK = struct.Struct("<d")
+NAN = float("nan")
+
+def _day(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d")
+
+class QuoteStore:
+    """
+    行情库
+
+    用法：
+        store = QuoteStore()
+        store.append(quote)                                  # quotes.make_quote 格式的记录
+        data = store.read("eastmoney:101.GC00Y", start=time.time() - 30 * 86400)
+        data["time"], data["price"]                           # numpy 数组
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        # 抓取脚本、聚合器、推送可能是同时运行的多个进程，追加时再加文件锁
+        self._lock_file = open(os.path.join(root, "append.lock"), "a")
+        self._db = sqlite3.connect(os.path.join(root, "index.sqlite"), timeout=10, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS quote_days (
+                symbol TEXT,
+                day TEXT,
+                rows INTEGER,
+                first_time REAL,
+                last_time REAL,
+                PRIMARY KEY (symbol, day)
+            )
+        """)
+        self._db.commit()
+
+    def _dir(self, symbol: str, day: str) -> str:
+        return os.path.join(self.root, url_quote(symbol, safe=""), day)
+
+    @contextmanager
+    def _append_lock(self):
+        """进程内的线程锁 + 跨进程的文件锁"""
+        with self._lock:
+            if fcntl:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _latest(self, symbol: str) -> Optional[float]:
+        """该代码已存的最新行情时间；每次从索引读，其他进程刚写入的也算（调用方持有锁）"""
+        row = self._db.execute("SELECT MAX(last_time) FROM quote_days WHERE symbol = ?", (symbol,)).fetchone()
+        return row[0]
+
+    def append(self, quote: Dict) -> bool:
+        """
+        追加一条行情，返回是否写入
+
+        行情时间不晚于已存最新时间的快照（休市时反复抓到同一笔）不重复写入
+        """
+        if quote.get("price") is None:
+            return False
+        symbol = quote["symbol"]
+        fetched = time.time()
+        ts = quote.get("time") or fetched
+        values = dict(quote, time=ts, fetched=fetched)
+        day = _day(ts)
+
+        with self._append_lock():
+            latest = self._latest(symbol)
+            if latest is not None and ts <= latest:
+                return False
+
+            path = self._dir(symbol, day)
+            os.makedirs(path, exist_ok=True)
+            for column in COLUMNS:
+                value = values.get(column)
+                with open(os.path.join(path, column + ".f8"), "ab") as f:
+                    f.write(_PACK.pack(NAN if value is None else float(value)))
+
+            self._db.execute("""
+                INSERT INTO quote_days VALUES (?, ?, 1, ?, ?)
+                ON CONFLICT(symbol, day) DO UPDATE SET rows = rows + 1, last_time = excluded.last_time
+            """, (symbol, day, ts, ts))
+            self._db.commit()
+        return True
+
+    def append_many(self, quotes: Iterable[Dict]) -> int:
+        return sum(self.append(quote) for quote in quotes)
+
+    def symbols(self) -> List[str]:
+        with self._lock:
+            rows = self._db.execute("SELECT DISTINCT symbol FROM quote_days ORDER BY symbol").fetchall()
+        return [row[0] for row in rows]
+
+    def days(self, symbol: str, start: float = None, end: float = None) -> List[str]:
+        """与 [start, end] 有交集的日期"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT day FROM quote_days WHERE symbol = ? AND last_time >= ? AND first_time <= ? ORDER BY day",
+                (symbol, start if start is not None else float("-inf"), end if end is not None else float("inf")),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def _map_day(self, symbol: str, day: str, columns: Sequence[str]) -> Dict:
+        path = self._dir(symbol, day)
+        # 追加中途被打断时各列长度可能差一条，取最短的
+        rows = min(os.path.getsize(os.path.join(path, c + ".f8")) for c in COLUMNS) // _PACK.size
+        if rows == 0:
+            return {c: np.empty(0) for c in columns}
+        return {
+            c: np.memmap(os.path.join(path, c + ".f8"), dtype="<f8", mode="r", shape=(rows,))
+            for c in columns
+        }
+
+    def read(self, symbol: str, start: float = None, end: float = None,
+             columns: Sequence[str] = COLUMNS) -> Dict[str, "np.ndarray"]:
+        """
+        读取 [start, end] 内的行情，返回 {字段: numpy 数组}（按时间升序）
+
+        只有一天且不需要裁剪时直接返回 memmap 视图，不复制数据
+        """
+        if np is None:
+            raise ImportError("读取行情库需要 numpy：pip install numpy")
+        columns = list(columns)
+        if "time" not in columns:
+            columns.insert(0, "time")
+
+        chunks = []
+        for day in self.days(symbol, start, end):
+            data = self._map_day(symbol, day, columns)
+            times = data["time"]
+            lo = 0 if start is None else int(np.searchsorted(times, start, "left"))
+            hi = len(times) if end is None else int(np.searchsorted(times, end, "right"))
+            if lo < hi:
+                chunks.append({c: a[lo:hi] for c, a in data.items()})
+
+        if not chunks:
+            return {c: np.empty(0) for c in columns}
+        if len(chunks) == 1:
+            return chunks[0]
+        return {c: np.concatenate([chunk[c] for chunk in chunks]) for c in columns}
+
+    def close(self):
+        self._db.close()
+        self._lock_file.close()
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+def default_store() -> QuoteStore:
+    """进程内共享的行情库（~/.cache/bear-toolbox/quotes/）"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = QuoteStore()
+        return _default_store
+
+def record_quotes(quotes: Iterable[Dict]) -> int:
+    """把抓到的行情写入默认行情库；写入失败只提示，不影响抓取脚本"""
+    try:
+        return default_store().append_many(quotes)
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️ 行情落盘失败: {e}")
+        return 0
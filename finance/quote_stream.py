@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📡 东方财富实时推送
+- 订阅 push2 的 SSE 推送（/api/qt/ulist/sse），一个长连接覆盖整个代码列表
+- 首条消息是全量快照，之后只推变化的字段（按列表位置编号），合并后回调变化的字段
+- 推送连不上时退回 ulist.np 批量轮询：有变化就缩短间隔，安静时拉长，并定期重试推送
+- 推到的新价格写入本地行情库；增量没带更新时间时用收到的时间，涨跌按新价格重算
+
+代码为东方财富 secid（市场号.代码），如 101.GC00Y / 122.XAU / 113.au0
+"""
+
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List
+
+import requests
+
+# 共用 scraping/ 下的连接池
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+from session_pool import default_sessions
+
+# 同目录的批量行情与本地行情库
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from quotes import HEADERS, EastMoneyProvider, fetch_quotes, make_quote, to_float
+from quote_store import record_quotes
+
+SSE_URL = "https://push2.eastmoney.com/api/qt/ulist/sse"
+
+# 长连接单独一个连接池，不占批量行情的连接
+SESSION = default_sessions().session("quote-stream")
+
+# push2 字段 -> 统一行情记录字段（f12 代码、f13 市场只用来确定 secid）
+FIELD_NAMES = {
+    "f2": "price", "f3": "change_pct", "f4": "change", "f14": "name", "f15": "high",
+    "f16": "low", "f17": "open", "f18": "prev_close", "f124": "time",
+}
+
+# 增量里没带时由价格和昨收重算的字段
+DERIVED_FIELDS = ("change", "change_pct")
+
+class StreamUnavailable(requests.exceptions.RequestException):
+    """服务端没有按 SSE 返回"""
+
+def _present(name: str, value) -> bool:
+    """缺失值（None、"-"、空串）不参与合并"""
+    if name == "name":
+        return value not in (None, "", "-")
+    return to_float(value) is not None
+
+def iter_sse_data(lines: Iterable[str]) -> Iterator[str]:
+    """按 SSE 格式切分事件，产出每个事件的 data（多行 data 以换行拼接，冒号后只去掉一个空格）；注释行和其他字段忽略"""
+    data: List[str] = []
+    for line in lines:
+        if not line:
+            if data:
+                yield "\n".join(data)
+                data = []
+        elif line.startswith("data:"):
+            value = line[5:]
+            data.append(value[1:] if value.startswith(" ") else value)
+    if data:
+        yield "\n".join(data)
+
+class QuoteStream:
+    """
+    行情订阅
+
+    on_update(code, changed, quote)：changed 为本次变化的字段 {字段: 新值}，quote 为合并后的完整行情记录
+
+    用法：
+        stream = QuoteStream(["101.GC00Y", "113.au0"], on_update=print)
+        stream.run()   # 阻塞，另一个线程调用 stream.stop() 结束
+    """
+
+    def __init__(self, codes: Iterable[str], on_update: Callable[[str, Dict, Dict], None],
+                 min_interval: float = 1, max_interval: float = 30, read_timeout: float = 60,
+                 retry_stream: float = 300):
+        self.codes = list(dict.fromkeys(codes))
+        self.on_update = on_update
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.read_timeout = read_timeout
+        self.retry_stream = retry_stream
+        self.interval = float(min_interval)
+        self.mode = "stream"
+        self.quotes: Dict[str, Dict] = {}
+        self._positions: Dict[str, str] = {}   # 推送里的列表位置 -> secid
+        self._stream_at = 0.0
+        self._messages = 0
+        self._response = None
+        self._stop = threading.Event()
+
+    def _apply(self, code: str, fields: Dict, received: float = None) -> bool:
+        """
+        合并一组字段（统一字段名），有变化时回调，返回是否有变化
+
+        缺失值忽略；time 取本次字段里的更新时间，没有则用收到的时间；
+        涨跌额 / 涨跌幅没带时按新的价格和昨收重算，不沿用旧值
+        """
+        fields = {name: value for name, value in fields.items() if _present(name, value)}
+        current = self.quotes.get(code) or make_quote("eastmoney", code)
+        values = {name: current[name] for name in FIELD_NAMES.values() if name not in DERIVED_FIELDS}
+        values.update(fields)
+        values["time"] = fields.get("time") or received or time.time()
+        merged = make_quote("eastmoney", code, **values)
+        changed = {
+            name: merged[name] for name in FIELD_NAMES.values()
+            if name != "time" and merged[name] != current[name]
+        }
+        if not changed:
+            return False
+        self.quotes[code] = merged
+        if "price" in changed:
+            record_quotes([merged])
+        self.on_update(code, changed, merged)
+        return True
+
+    def handle_message(self, payload: Dict) -> int:
+        """处理一条推送，返回有变化的代码数"""
+        diff = (payload.get("data") or {}).get("diff") or {}
+        items = diff.items() if isinstance(diff, dict) else enumerate(diff)
+        received = time.time()
+        count = 0
+        for position, item in items:
+            position = str(position)
+            if "f12" in item and "f13" in item:
+                self._positions[position] = f"{item['f13']}.{item['f12']}"
+            code = self._positions.get(position)
+            if code is None:
+                continue
+            fields = {FIELD_NAMES[k]: v for k, v in item.items() if k in FIELD_NAMES}
+            count += self._apply(code, fields, received)
+        return count
+
+    def stream(self) -> int:
+        """保持一个推送连接直到断开或 stop()，返回本次连接收到的消息数"""
+        params = {
+            "ut": "fa5fd1943c7b386f172d6893dbfba10b",
+            "fltt": "2",
+            "invt": "2",
+            "fields": EastMoneyProvider.FIELDS,
+            "secids": ",".join(self.codes),
+        }
+        headers = dict(HEADERS, Accept="text/event-stream")
+        self._messages = 0
+        with SESSION.get(SSE_URL, params=params, headers=headers, stream=True,
+                         timeout=(10, self.read_timeout)) as response:
+            response.raise_for_status()
+            content_type = response.headers.get("Content-Type", "")
+            if "text/event-stream" not in content_type:
+                raise StreamUnavailable(f"不是 SSE 响应: {content_type}")
+            # SSE 规定为 UTF-8；没写 charset 时 requests 会按 ISO-8859-1 解码，中文名称变成乱码
+            if "charset" not in content_type.lower():
+                response.encoding = "utf-8"
+            self._response = response
+            try:
+                if self._stop.is_set():
+                    return self._messages
+                # chunk_size=None：每收到一个分块就交出，推送不会卡在读缓冲里
+                for data in iter_sse_data(response.iter_lines(chunk_size=None, decode_unicode=True)):
+                    if self._stop.is_set():
+                        break
+                    try:
+                        payload = json.loads(data)
+                    except ValueError:
+                        continue
+                    self._messages += 1
+                    self.handle_message(payload)
+            except Exception:
+                # stop() 关掉连接时读取会报错，属于正常退出
+                if not self._stop.is_set():
+                    raise
+            finally:
+                self._response = None
+        return self._messages
+
+    def poll(self) -> int:
+        """ulist.np 批量请求一次，返回有变化的代码数"""
+        quotes = fetch_quotes([f"eastmoney:{code}" for code in self.codes])
+        return sum(
+            self._apply(quote["code"], {name: quote[name] for name in FIELD_NAMES.values()})
+            for quote in quotes.values()
+        )
+
+    def _reschedule(self, changed: int):
+        if changed:
+            interval = self.interval / 2
+        else:
+            interval = self.interval * 1.5
+        self.interval = min(self.max_interval, max(self.min_interval, interval))
+
+    def run(self):
+        while not self._stop.is_set():
+            if time.monotonic() >= self._stream_at:
+                self.mode = "stream"
+                error = None
+                try:
+                    self.stream()
+                except requests.exceptions.RequestException as e:
+                    error = e
+                # 本次连接收到过数据说明推送可用，只是断线（休市时长时间无推送会读超时），稍后重连
+                if not self._messages and not self._stop.is_set():
+                    print(f"⚠️ 推送不可用，改为轮询: {error or '连接没有推送数据'}", file=sys.stderr)
+                    self.mode = "poll"
+                    self._stream_at = time.monotonic() + self.retry_stream
+                    continue
+                self._stop.wait(1)
+                continue
+
+            self._reschedule(self.poll())
+            self._stop.wait(self.interval * random.uniform(0.9, 1.1))
+
+    def stop(self):
+        """结束 run()；推送模式下直接关掉连接，不用等下一条推送或读超时"""
+        self._stop.set()
+        response = self._response
+        if response is None:
+            return
+        # 只 close() 唤不醒阻塞在 recv 上的读线程，先 shutdown 套接字
+        sock = getattr(getattr(response.raw, "_connection", None), "sock", None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        response.close()
+
+if __name__ == "__main__":
+    import signal
+
+    codes = sys.argv[1:] or ["101.GC00Y", "122.XAU", "113.au0"]
+
+    def emit(code, changed, quote):
+        print(json.dumps({"code": code, "changed": changed, "price": quote["price"]}, ensure_ascii=False),
+              flush=True)
+
+    stream = QuoteStream(codes, on_update=emit)
+    signal.signal(signal.SIGTERM, lambda *_: stream.stop())
+    try:
+        stream.run()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📈 批量行情
+- 一次传入任意多个代码，按数据源分组，每个源合并成尽量少的批量请求
+  东方财富 ulist.np（secids=...）/ Yahoo spark（symbols=...）/ 新浪 hq.sinajs.cn（list=...）
+- 各数据源、各批次并发请求
+- 统一的行情记录格式（见 make_quote）
+
+代码写成 "数据源:代码"：
+    eastmoney:101.GC00Y   yahoo:GC=F   sina:fx_sxau
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+# 共用 scraping/ 下的重试、熔断和连接池
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+from retry import default_engine
+from session_pool import default_sessions
+
+RETRY = default_engine()
+SESSION = default_sessions().session("quotes")
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+}
+
+BEIJING = timezone(timedelta(hours=8))
+
+# Yahoo 代码的名称、货币、交易所，几乎不变，跨运行保存
+YAHOO_META_PATH = os.path.join(os.path.expanduser("~"), ".cache", "bear-toolbox", "yahoo_meta.json")
+
+QUOTE_FIELDS = (
+    "symbol", "provider", "code", "name", "price", "change", "change_pct",
+    "open", "high", "low", "prev_close", "currency", "exchange", "time",
+)
+
+def make_quote(provider: str, code: str, **fields) -> Dict:
+    """
+    统一的行情记录
+
+    symbol 为 "数据源:代码"；价格类字段为 float 或 None；time 为行情时间（Unix 秒）或 None；
+    change / change_pct 缺失时由 price 和 prev_close 算出
+    """
+    quote = dict.fromkeys(QUOTE_FIELDS)
+    quote.update(fields)
+    quote.update(symbol=f"{provider}:{code}", provider=provider, code=code)
+    for key in ("price", "change", "change_pct", "open", "high", "low", "prev_close", "time"):
+        quote[key] = to_float(quote[key])
+
+    price, prev = quote["price"], quote["prev_close"]
+    if price is not None and prev:
+        if quote["change"] is None:
+            quote["change"] = price - prev
+        if quote["change_pct"] is None:
+            quote["change_pct"] = (price - prev) / prev * 100
+    return quote
+
+def to_float(value) -> Optional[float]:
+    """东方财富缺失值为 "-"，新浪为空串，统一转成 None"""
+    if value is None:
+        return None
+    try:
+        return float(str(value).rstrip("%"))
+    except ValueError:
+        return None
+
+def chunked(items: List[str], size: int) -> Iterable[List[str]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+class EastMoneyProvider:
+    """东方财富 push2 ulist.np，代码为 secid（市场号.代码），如 101.GC00Y / 122.XAU / 113.au0"""
+
+    NAME = "eastmoney"
+    URL = "https://push2.eastmoney.com/api/qt/ulist.np/get"
+    BATCH_SIZE = 50
+    # f2 最新价 f3 涨跌幅 f4 涨跌额 f12 代码 f13 市场 f14 名称 f15 最高 f16 最低 f17 今开 f18 昨收 f124 更新时间
+    FIELDS = "f2,f3,f4,f12,f13,f14,f15,f16,f17,f18,f124"
+
+    def fetch(self, codes: List[str], timeout: float = 10) -> Dict[str, Dict]:
+        params = {
+            "ut": "fa5fd1943c7b386f172d6893dbfba10b",
+            "fltt": "2",
+            "invt": "2",
+            "fields": self.FIELDS,
+            "secids": ",".join(codes),
+        }
+        response = RETRY.get(self.URL, session=SESSION, params=params, headers=HEADERS, timeout=timeout)
+        data = response.json().get("data") or {}
+
+        # 按请求的代码作键：回显的 f13.f12 大小写等可能和请求的不一样
+        requested = {code.upper(): code for code in codes}
+        quotes = {}
+        for item in data.get("diff") or []:
+            echoed = f"{item.get('f13')}.{item.get('f12')}"
+            code = requested.get(echoed.upper(), echoed)
+            quotes[code] = make_quote(
+                self.NAME, code,
+                name=item.get("f14"),
+                price=item.get("f2"),
+                change=item.get("f4"),
+                change_pct=item.get("f3"),
+                open=item.get("f17"),
+                high=item.get("f15"),
+                low=item.get("f16"),
+                prev_close=item.get("f18"),
+                time=item.get("f124"),
+            )
+        return quotes
+
+class YahooProvider:
+    """
+    Yahoo Finance spark 接口，一次请求多个代码，如 GC=F / SI=F / GLD / CNY=X
+
+    新格式的 spark 不带名称、货币和交易所：缺的代码合并成一次 v7 quote 批量请求补上，
+    结果存到本地（~/.cache/bear-toolbox/yahoo_meta.json），之后的运行不再请求
+    """
+
+    NAME = "yahoo"
+    URL = "https://query1.finance.yahoo.com/v7/finance/spark"
+    QUOTE_URL = "https://query1.finance.yahoo.com/v7/finance/quote"
+    BATCH_SIZE = 20
+
+    def __init__(self, meta_path: str = YAHOO_META_PATH):
+        self.meta_path = meta_path
+        self._meta: Optional[Dict[str, Dict]] = None   # 代码 -> {name, currency, exchange}
+        self._meta_lock = threading.Lock()
+
+    def fetch(self, codes: List[str], timeout: float = 10) -> Dict[str, Dict]:
+        params = {"symbols": ",".join(codes), "range": "1d", "interval": "5m"}
+        response = RETRY.get(self.URL, session=SESSION, params=params, headers=HEADERS, timeout=timeout)
+        data = response.json()
+
+        quotes = {}
+        if "spark" in data:
+            # 旧格式：{"spark": {"result": [{"symbol", "response": [{"meta": {...}}]}]}}
+            for result in (data["spark"] or {}).get("result") or []:
+                meta = ((result.get("response") or [{}])[0]).get("meta") or {}
+                quotes[result["symbol"]] = self._from_meta(result["symbol"], meta)
+        else:
+            # 新格式：{"GC=F": {"symbol", "close": [...], "timestamp": [...], "chartPreviousClose"}}
+            metas = self._quote_meta([code for code, series in data.items() if not series.get("currency")], timeout)
+            for code, series in data.items():
+                closes = [c for c in series.get("close") or [] if c is not None]
+                timestamps = series.get("timestamp") or [None]
+                meta = metas.get(code) or {}
+                quotes[code] = make_quote(
+                    self.NAME, code,
+                    name=series.get("shortName") or meta.get("name"),
+                    price=closes[-1] if closes else None,
+                    prev_close=series.get("previousClose") or series.get("chartPreviousClose"),
+                    currency=series.get("currency") or meta.get("currency"),
+                    exchange=series.get("exchangeName") or meta.get("exchange"),
+                    time=timestamps[-1],
+                )
+        return quotes
+
+    def _quote_meta(self, codes: List[str], timeout: float) -> Dict[str, Dict]:
+        """
+        名称、货币、交易所
+
+        先查本地缓存，缺的代码合并成一次 v7 quote 请求；请求失败时这些代码返回空字典，下次再试
+        """
+        if not codes:
+            return {}
+        with self._meta_lock:
+            if self._meta is None:
+                self._meta = self._load_meta()
+            missing = [code for code in codes if code not in self._meta]
+
+        if missing:
+            try:
+                response = RETRY.get(self.QUOTE_URL, session=SESSION, params={"symbols": ",".join(missing)},
+                                     headers=HEADERS, timeout=timeout)
+                results = (response.json().get("quoteResponse") or {}).get("result") or []
+            except Exception:
+                results = []
+            fetched = {
+                item["symbol"]: {
+                    "name": item.get("shortName") or item.get("longName"),
+                    "currency": item.get("currency"),
+                    "exchange": item.get("exchange"),
+                }
+                for item in results if item.get("symbol")
+            }
+            if fetched:
+                with self._meta_lock:
+                    self._meta.update(fetched)
+                    self._save_meta()
+
+        with self._meta_lock:
+            return {code: self._meta.get(code) or {} for code in codes}
+
+    def _load_meta(self) -> Dict[str, Dict]:
+        try:
+            with open(self.meta_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_meta(self):
+        """原子替换写入（调用方持有锁）；写不了只是下次再请求"""
+        try:
+            os.makedirs(os.path.dirname(self.meta_path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.meta_path))
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._meta, f, ensure_ascii=False)
+            os.replace(tmp, self.meta_path)
+        except OSError:
+            pass
+
+    def _from_meta(self, code: str, meta: Dict) -> Dict:
+        return make_quote(
+            self.NAME, code,
+            name=meta.get("shortName"),
+            price=meta.get("regularMarketPrice"),
+            high=meta.get("regularMarketDayHigh"),
+            low=meta.get("regularMarketDayLow"),
+            prev_close=meta.get("previousClose") or meta.get("chartPreviousClose"),
+            currency=meta.get("currency"),
+            exchange=meta.get("exchangeName"),
+            time=meta.get("regularMarketTime"),
+        )
+
+class SinaProvider:
+    """
+    新浪 hq.sinajs.cn，list= 一次多个代码，如 fx_sxau
+
+    按外汇行情格式解析：名称,最新价,涨跌,-,涨跌幅,最高,最低,...,日期,时间
+    """
+
+    NAME = "sina"
+    URL = "https://hq.sinajs.cn/list={}"
+    BATCH_SIZE = 50
+
+    def fetch(self, codes: List[str], timeout: float = 10) -> Dict[str, Dict]:
+        headers = dict(HEADERS, Referer="https://finance.sina.com.cn")
+        response = RETRY.get(self.URL.format(",".join(codes)), session=SESSION, headers=headers, timeout=timeout)
+        response.encoding = "gbk"
+
+        quotes = {}
+        # 每行：var hq_str_fx_sxau="美元/盎司,2955.45,2945.30,0.00,0.34%,2958.20,2932.15,...,2025-02-25,08:59:52,0,0";
+        for line in response.text.splitlines():
+            if "var hq_str_" not in line or '="' not in line:
+                continue
+            code = line.split("var hq_str_", 1)[1].split("=", 1)[0]
+            parts = line.split('="', 1)[1].rstrip('";').split(",")
+            if len(parts) < 14:
+                continue
+            quotes[code] = make_quote(
+                self.NAME, code,
+                name=parts[0],
+                price=parts[1],
+                change=parts[2],
+                change_pct=parts[4],
+                high=parts[5],
+                low=parts[6],
+                time=sina_timestamp(parts[11], parts[12]),
+            )
+        return quotes
+
+def sina_timestamp(date: str, clock: str) -> Optional[float]:
+    """新浪行情的日期、时间（北京时间）-> Unix 秒，解析失败返回 None"""
+    try:
+        return datetime.strptime(f"{date} {clock}", "%Y-%m-%d %H:%M:%S").replace(tzinfo=BEIJING).timestamp()
+    except ValueError:
+        return None
+
+PROVIDERS = {
+    provider.NAME: provider
+    for provider in (EastMoneyProvider(), YahooProvider(), SinaProvider())
+}
+
+def group_symbols(symbols: Iterable[str]) -> Dict[str, List[str]]:
+    """把 "数据源:代码" 按数据源分组（去重，保持顺序）"""
+    groups: Dict[str, List[str]] = {}
+    for symbol in symbols:
+        provider, sep, code = symbol.partition(":")
+        if not sep or provider not in PROVIDERS:
+            raise ValueError(f"无法识别的代码: {symbol}（应为 {'/'.join(PROVIDERS)}:代码）")
+        codes = groups.setdefault(provider, [])
+        if code not in codes:
+            codes.append(code)
+    return groups
+
+def fetch_quotes(symbols: Iterable[str], timeout: float = 10) -> Dict[str, Dict]:
+    """
+    批量获取行情
+
+    Args:
+        symbols: "数据源:代码" 列表，如 ["eastmoney:101.GC00Y", "yahoo:GC=F", "sina:fx_sxau"]
+
+    Returns:
+        {symbol: 行情记录}；获取失败的代码不出现在结果中
+    """
+    batches = [
+        (name, codes)
+        for name, all_codes in group_symbols(symbols).items()
+        for codes in chunked(all_codes, PROVIDERS[name].BATCH_SIZE)
+    ]
+    if not batches:
+        return {}
+
+    quotes = {}
+    with ThreadPoolExecutor(max_workers=len(batches)) as executor:
+        futures = [(name, executor.submit(PROVIDERS[name].fetch, codes, timeout)) for name, codes in batches]
+        for name, future in futures:
+            try:
+                for quote in future.result().values():
+                    quotes[quote["symbol"]] = quote
+            except Exception as e:
+                print(f"❌ {name} 行情获取失败: {e}")
+    return quotes
+
+if __name__ == "__main__":
+    symbols = sys.argv[1:] or ["eastmoney:101.GC00Y", "eastmoney:122.XAU", "eastmoney:113.au0",
+                               "yahoo:GC=F", "sina:fx_sxau"]
+    for symbol, quote in fetch_quotes(symbols).items():
+        print(f"{symbol:24} {quote['price']!s:>12} {quote['change_pct'] or 0:+.2f}%  {quote['name'] or ''}")
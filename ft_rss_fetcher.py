@@ -1,15 +1,28 @@
 #!/usr/bin/env python3
 """
 FT (Financial Times) RSS 新闻获取器
-支持获取首页头条新闻
+支持获取首页头条新闻，--source all 并发获取所有源
+--daemon 常驻运行，按各源的更新频率自适应轮询，新条目以 JSONL 输出到 stdout 或 unix socket
 """
 
 import argparse
+import json
+import os
+import random
+import signal
+import socket
 import sys
-import urllib.request
+import threading
+import time
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scraping"))
+from http_cache import HttpCache, default_cache, requests_sender
+from session_pool import default_sessions
+from feed_store import FeedStore, dedup_items
+
 # FT RSS 源
 FT_RSS_FEEDS = {
     "home": "https://www.ft.com/rss/home",
@@ -20,56 +33,115 @@ FT_RSS_FEEDS = {
     "technology": "https://www.ft.com/rss/technology",
 }
 
-def fetch_rss(url, proxy=None):
-    """获取RSS内容"""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
-    
-    if proxy:
-        proxy_handler = urllib.request.ProxyHandler({
-            'http': proxy,
-            'https': proxy
-        })
-        opener = urllib.request.build_opener(proxy_handler)
-        urllib.request.install_opener(opener)
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+def fetch_rss(url, proxy=None, cache=None):
+    """
+    获取RSS内容
     
-    req = urllib.request.Request(url, headers=headers)
+    所有源共用一个 keep-alive 连接池，代理按请求传入，不修改全局 opener；
+    传入 cache 时每个源的 ETag / Last-Modified 存在磁盘缓存里，过期后发条件请求，304 不重新下载
+    """
+    session = default_sessions().session("rss")
+    proxies = {'http': proxy, 'https': proxy} if proxy else None
+    send = requests_sender(session.get, proxies=proxies, timeout=30)
     
     try:
-        with urllib.request.urlopen(req, timeout=30) as response:
-            return response.read()
+        if cache is None:
+            status, _, body = send(url, HEADERS)
+            return body if status == 200 else None
+        response = cache.fetch(url, send, HEADERS)
+        return response.content if response.status_code == 200 else None
     except Exception as e:
         print(f"Error fetching RSS: {e}", file=sys.stderr)
         return None
 
-def parse_rss(xml_content):
-    """解析RSS XML内容"""
-    if not xml_content:
-        return []
+def fetch_feeds(sources, proxy=None, cache=None):
+    """并发获取多个源，返回 {源名: XML 内容或 None}（按 sources 顺序）"""
+    with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+        futures = {name: executor.submit(fetch_rss, FT_RSS_FEEDS[name], proxy, cache) for name in sources}
+        return {name: future.result() for name, future in futures.items()}
+
+# RSS 2.0 / RSS 1.0 (RDF) / Atom 的条目元素和字段名（不含命名空间）
+ITEM_TAGS = ('item', 'entry')
+FIELD_TAGS = {
+    'title': ('title',),
+    'link': ('link',),
+    'guid': ('guid', 'id'),
+    'description': ('description', 'summary', 'encoded', 'content'),
+    'pub_date': ('pubDate', 'published', 'date', 'updated'),
+}
+CHUNK_SIZE = 64 * 1024
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def _item_fields(elem):
+    """从一个 item / entry 元素取出字段，同一字段取优先级最高的子元素"""
+    found = {}
+    for child in elem:
+        name = _local(child.tag)
+        if name == 'link' and child.get('href') is not None:
+            # Atom: <link rel="alternate" href="..."/>
+            if child.get('rel', 'alternate') == 'alternate':
+                found.setdefault('link', child.get('href'))
+            continue
+        found.setdefault(name, (child.text or '').strip())
+    
+    item = {}
+    for field, names in FIELD_TAGS.items():
+        item[field] = next((found[name] for name in names if found.get(name)), '')
+    # RSS 1.0 的条目标识在 rdf:about 属性上
+    if not item['guid']:
+        item['guid'] = next((v for k, v in elem.attrib.items() if _local(k) == 'about'), '')
+    item['title'] = item['title'] or 'N/A'
+    return item
+
+def iter_rss_items(xml_content, limit=None):
+    """
+    流式解析 RSS 2.0 / RSS 1.0 / Atom，逐条产出
+    
+    xml_content 可以是字节串、字符串或字节块迭代器；
+    每条处理完就从树上摘掉，内存占用与 feed 大小无关；产出 limit 条后不再解析（limit=0 不产出）
+    """
+    if not xml_content or (limit is not None and limit <= 0):
+        return
+    if isinstance(xml_content, (str, bytes)):
+        data = xml_content.encode('utf-8') if isinstance(xml_content, str) else xml_content
+        chunks = (data[i:i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE))
+    else:
+        chunks = xml_content
     
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    stack = []
+    count = 0
     try:
-        root = ET.fromstring(xml_content)
-        
-        # 处理RSS 2.0格式
-        items = []
-        for item in root.findall('.//item'):
-            title = item.find('title')
-            link = item.find('link')
-            description = item.find('description')
-            pub_date = item.find('pubDate')
-            
-            items.append({
-                'title': title.text if title is not None else 'N/A',
-                'link': link.text if link is not None else '',
-                'description': description.text if description is not None else '',
-                'pub_date': pub_date.text if pub_date is not None else ''
-            })
-        
-        return items
+        for chunk in chunks:
+            parser.feed(chunk)
+            for event, elem in parser.read_events():
+                if event == 'start':
+                    stack.append(elem)
+                    continue
+                stack.pop()
+                if _local(elem.tag) not in ITEM_TAGS:
+                    continue
+                
+                yield _item_fields(elem)
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+                elem.clear()
+                if stack:
+                    stack[-1].remove(elem)
+        parser.close()
     except Exception as e:
         print(f"Error parsing RSS: {e}", file=sys.stderr)
-        return []
+
+def parse_rss(xml_content, limit=None):
+    """解析RSS XML内容（RSS 2.0 / RSS 1.0 / Atom），最多 limit 条"""
+    return list(iter_rss_items(xml_content, limit))
 
 def format_output(items, format_type='text', limit=5):
     """格式化输出"""
@@ -107,37 +179,218 @@ def format_output(items, format_type='text', limit=5):
                 lines.append(f"时间: {item['pub_date']}")
         return "\n".join(lines)
 
+# ============ 常驻模式 ============
+
+class JsonlSink:
+    """新条目逐行写成 JSON"""
+    
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+    
+    def __call__(self, items):
+        for item in items:
+            self.stream.write(json.dumps(item, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+class UnixSocketSink:
+    """
+    在本地 unix socket 上监听，新条目以 JSONL 广播给所有已连接的客户端
+    
+    客户端示例：socat - UNIX-CONNECT:/tmp/ft_rss.sock
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        if os.path.exists(path):
+            os.unlink(path)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(path)
+        self._server.listen()
+        self._clients = []
+        self._lock = threading.Lock()
+        threading.Thread(target=self._accept, name="rss-socket", daemon=True).start()
+    
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            with self._lock:
+                self._clients.append(conn)
+    
+    def __call__(self, items):
+        data = "".join(json.dumps(item, ensure_ascii=False) + "\n" for item in items).encode("utf-8")
+        with self._lock:
+            for conn in list(self._clients):
+                try:
+                    conn.sendall(data)
+                except OSError:
+                    # 客户端已断开
+                    self._clients.remove(conn)
+                    conn.close()
+    
+    def close(self):
+        self._server.close()
+        with self._lock:
+            for conn in self._clients:
+                conn.close()
+            self._clients.clear()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+class FeedWatcher:
+    """
+    常驻轮询多个源，新条目交给 on_items 回调
+    
+    每个源有自己的轮询间隔：本轮有新条目则间隔减半，没有则放大 1.5 倍，
+    限制在 [min_interval, max_interval] 之间并加少量随机抖动；
+    繁忙的源轮询更勤，安静的源少打扰，总请求量不变时新闻到达更快
+    
+    用法：
+        watcher = FeedWatcher(["home", "markets"], on_items=JsonlSink())
+        watcher.run()   # 阻塞，另一个线程调用 watcher.stop() 结束
+    """
+    
+    def __init__(self, sources, on_items, proxy=None, cache=None, store=None, limit=None,
+                 interval=300, min_interval=60, max_interval=3600):
+        self.sources = list(sources)
+        self.on_items = on_items
+        self.proxy = proxy
+        # 不按 host 给默认 TTL，每次轮询都发条件请求（服务端给了 max-age 时仍遵守）
+        self.cache = cache if cache is not None else HttpCache(default_ttl=0)
+        # FeedStore 有 __len__，空库为假值，不能用 or
+        self.store = store if store is not None else FeedStore()
+        # 默认解析整个 feed 再去重：两次轮询之间更新再多也不会漏推
+        self.limit = limit
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.intervals = {name: float(interval) for name in self.sources}
+        self.next_poll = {name: 0.0 for name in self.sources}
+        self._stop = threading.Event()
+    
+    def poll(self, names):
+        """轮询一批源，推送新条目，返回 {源名: 新条目数}（获取失败为 None）"""
+        contents = fetch_feeds(names, self.proxy, self.cache)
+        counts = {}
+        for name, xml_content in contents.items():
+            if xml_content is None:
+                counts[name] = None
+                continue
+            items = [dict(item, feed=name) for item in iter_rss_items(xml_content, self.limit)]
+            new_items = self.store.add_new(items, feed=name)
+            counts[name] = len(new_items)
+            if new_items:
+                self.on_items(new_items)
+        return counts
+    
+    def _reschedule(self, name, new_count):
+        if new_count:
+            interval = self.intervals[name] / 2
+        else:
+            interval = self.intervals[name] * 1.5
+        interval = min(self.max_interval, max(self.min_interval, interval))
+        self.intervals[name] = interval
+        self.next_poll[name] = time.monotonic() + interval * random.uniform(0.9, 1.1)
+    
+    def run(self):
+        last_prune = 0.0
+        while not self._stop.is_set():
+            now = time.monotonic()
+            due = [name for name in self.sources if self.next_poll[name] <= now]
+            if due:
+                for name, new_count in self.poll(due).items():
+                    self._reschedule(name, new_count)
+                    print(f"🔄 {name}: {new_count if new_count is not None else '获取失败'}，"
+                          f"下次 {self.intervals[name]:.0f}s 后", file=sys.stderr)
+            if now - last_prune > 3600:
+                self.store.prune()
+                last_prune = now
+            self._stop.wait(max(0.0, min(self.next_poll.values()) - time.monotonic()))
+    
+    def stop(self):
+        self._stop.set()
+
+def run_daemon(args, sources, proxy):
+    sink = UnixSocketSink(args.socket) if args.socket else JsonlSink()
+    watcher = FeedWatcher(sources, sink, proxy=proxy, interval=args.interval,
+                          min_interval=args.min_interval, max_interval=args.max_interval)
+    signal.signal(signal.SIGTERM, lambda *_: watcher.stop())
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.socket:
+            sink.close()
+
 def main():
     parser = argparse.ArgumentParser(description='FT RSS 新闻获取器')
-    parser.add_argument('--source', default='home', choices=list(FT_RSS_FEEDS.keys()),
-                        help='RSS源类型')
+    parser.add_argument('--source', default='home',
+                        help=f'RSS源类型：{", ".join(FT_RSS_FEEDS)}，多个用逗号分隔，all 为全部')
     parser.add_argument('--limit', type=int, default=5,
-                        help='获取新闻数量')
+                        help='每个源获取新闻数量（常驻模式不限，整个 feed 去重后推送）')
     parser.add_argument('--format', default='text', choices=['text', 'markdown', 'qq'],
                         help='输出格式')
     parser.add_argument('--proxy', default=None,
                         help='代理服务器地址')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='不使用磁盘缓存，每次完整下载')
+    parser.add_argument('--new-only', action='store_true',
+                        help='只输出之前没推送过的新闻')
+    parser.add_argument('--daemon', action='store_true',
+                        help='常驻运行，自适应轮询，新条目以 JSONL 输出')
+    parser.add_argument('--interval', type=float, default=300,
+                        help='常驻模式的初始轮询间隔（秒）')
+    parser.add_argument('--min-interval', type=float, default=60,
+                        help='常驻模式的最短轮询间隔（秒）')
+    parser.add_argument('--max-interval', type=float, default=3600,
+                        help='常驻模式的最长轮询间隔（秒）')
+    parser.add_argument('--socket', default=None,
+                        help='常驻模式下输出到该 unix socket，而不是 stdout')
     
     args = parser.parse_args()
     
     # 从环境变量获取代理
     proxy = args.proxy or os.environ.get('HTTP_PROXY') or os.environ.get('http_proxy') or 'http://127.0.0.1:7890'
     
-    url = FT_RSS_FEEDS.get(args.source, FT_RSS_FEEDS['home'])
+    sources = list(FT_RSS_FEEDS) if args.source == 'all' else args.source.split(',')
+    unknown = [name for name in sources if name not in FT_RSS_FEEDS]
+    if unknown:
+        parser.error(f"未知的RSS源: {', '.join(unknown)}")
     
-    xml_content = fetch_rss(url, proxy)
-    if not xml_content:
+    if args.daemon:
+        run_daemon(args, sources, proxy)
+        return
+    
+    cache = None if args.no_cache else default_cache()
+    contents = fetch_feeds(sources, proxy, cache)
+    if not any(contents.values()):
         print("无法获取RSS内容，请检查网络连接", file=sys.stderr)
         sys.exit(1)
     
-    items = parse_rss(xml_content)
+    # 每个源取前 limit 条，同一条新闻出现在多个源时只保留一次
+    items = []
+    for name, xml_content in contents.items():
+        if xml_content is None:
+            print(f"⚠️ {name}: 获取失败", file=sys.stderr)
+            continue
+        items.extend(dict(item, feed=name) for item in iter_rss_items(xml_content, args.limit))
     if not items:
         print("无法解析RSS内容", file=sys.stderr)
         sys.exit(1)
+    items = dedup_items(items)
+    
+    if args.new_only:
+        store = FeedStore()
+        store.prune()
+        items = store.add_new(items)
+        if not items:
+            # 没有新条目不算错误，cron 调用时直接静默退出
+            return
     
-    output = format_output(items, args.format, args.limit)
+    output = format_output(items, args.format, len(items))
     print(output)
 
 if __name__ == '__main__':
-    import os
     main()
@@ -9,8 +9,25 @@ import requests
 import random
 import time
 import json
-from urllib.parse import urlencode, urlparse
-from typing import Optional, Dict, List
+import asyncio
+import codecs
+import functools
+import os
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
+from html.parser import HTMLParser
+from urllib.parse import urlencode, urlparse, parse_qs
+from typing import Optional, Dict, List, Iterable, Iterator, AsyncIterator, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from rate_limiter import HostRateLimiter
+from http_cache import HttpCache, default_cache, requests_sender
+from proxy_pool import ProbeCache, ProxyPool, default_pool
+from retry import RetryEngine, default_engine
+from body_stream import BodyStream, DEFAULT_MAX_BYTES, DEFAULT_ALLOWED_TYPES
 
 # ============ 1. 浏览器指纹伪装 ============
 
@@ -67,9 +84,17 @@ def get_random_headers(accept_type: str = "html", referer: str = None) -> Dict[s
 # ============ 2. 代理配置 ============
 
 class ProxyManager:
-    """代理管理器"""
+    """
+    代理管理器（背后是带后台健康检查的 ProxyPool）
     
-    def __init__(self):
+    代理池在第一次选代理时才创建并启动后台探测：不用代理的请求器不付这份开销；
+    proxies 为 None 时用本地 Clash/Mihomo 的共享代理池，为空列表表示不配置代理（始终直连）
+    """
+    
+    def __init__(self, pool: ProxyPool = None, proxies: List[str] = None):
+        self._pool = pool
+        self._pool_lock = threading.Lock()
+        self.proxy_urls = proxies
         self.proxies = {
             "http": "http://127.0.0.1:7890",
             "https": "http://127.0.0.1:7890",
@@ -79,65 +104,113 @@ class ProxyManager:
             "https": "socks5://127.0.0.1:7891",
         }
     
+    @property
+    def pool(self) -> Optional[ProxyPool]:
+        """首次用到时创建代理池；没有配置代理时为 None"""
+        if self._pool is None and self.proxy_urls != []:
+            with self._pool_lock:
+                if self._pool is None:
+                    if self.proxy_urls is None:
+                        self._pool = default_pool()
+                    else:
+                        self._pool = ProxyPool(self.proxy_urls, probe_cache=ProbeCache()).start()
+        return self._pool
+    
     def get_proxy(self, use_socks: bool = False) -> Dict[str, str]:
-        return self.socks_proxies if use_socks else self.proxies
+        """按权重选一个健康代理；池中没有健康代理时返回默认配置"""
+        return self.pick(use_socks) or (self.socks_proxies if use_socks else self.proxies)
+    
+    def pick(self, use_socks: bool = False) -> Optional[Dict[str, str]]:
+        """按权重选一个健康代理，没有则返回 None（直连）"""
+        pool = self.pool
+        url = pool.choose(socks=use_socks) if pool else None
+        return {"http": url, "https": url} if url else None
+    
+    def report(self, proxies: Optional[Dict[str, str]], ok: bool):
+        """反馈业务请求结果，代理出错时立即移出轮换"""
+        # 代理来自池中，池一定已创建；不为反馈而新建代理池
+        if proxies and self._pool is not None:
+            self._pool.record(proxies["https"], ok)
     
     def test_proxy(self) -> bool:
-        """测试代理是否可用"""
-        try:
-            response = requests.get(
-                "https://www.google.com/robots.txt",
-                proxies=self.proxies,
-                timeout=5
-            )
-            return response.status_code == 200
-        except:
-            return False
+        """代理是否可用（返回后台探测的缓存结果，不阻塞）"""
+        pool = self.pool
+        return pool is not None and pool.choose() is not None
 
 # ============ 3. 智能请求类 ============
 
-class StealthRequester:
+class RequestSender:
+    """
+    同步/异步请求器共用的发送逻辑（限速、选代理、重试、熔断）
+    
+    子类需提供 session、use_proxy、proxy_manager、retry、limiter 属性
+    """
+    
+    def _random_delay(self, url: str):
+        """按 host 的令牌桶延迟（带 jitter），模拟人类行为"""
+        self.limiter.acquire(url)
+    
+    def _send(self, method: str, url: str, retry_unsafe: bool = False, paced: bool = False,
+              **kwargs) -> requests.Response:
+        """
+        发送请求：每次尝试都先按 host 限速，再按权重重新选择代理，代理错误反馈给代理池，失败按策略重试
+        POST 等非幂等请求默认只发一次，retry_unsafe=True 时才重试
+        paced=True 表示调用方已为第一次尝试取过令牌（AsyncRequester 在事件循环里等待），重试仍要限速
+        """
+        kwargs.setdefault("timeout", 15)
+        skip_delay = paced
+        
+        def send():
+            nonlocal skip_delay
+            if skip_delay:
+                skip_delay = False
+            else:
+                self._random_delay(url)
+            proxies = self.proxy_manager.pick() if self.use_proxy else None
+            options = dict(kwargs)
+            if proxies:
+                options.setdefault("proxies", proxies)
+            try:
+                return self.session.request(method, url, **options)
+            except requests.exceptions.ProxyError:
+                self.proxy_manager.report(proxies, ok=False)
+                raise
+        
+        return self.retry.call(url, send, self.retry.max_attempts(method, retry_unsafe))
+    
+    def _get_referer(self, url: str) -> str:
+        """生成合理的 Referer"""
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}/"
+
+class StealthRequester(RequestSender):
     """
     智能请求器 - 自动处理反爬
     
     功能：
     - 自动轮换 User-Agent
-    - 智能延迟
+    - 智能延迟（按 host 限速，不同站点互不等待）
     - Cookie 持久化
-    - 自动重试
+    - 自动重试（指数退避、Retry-After、按 host 熔断）
     - 代理支持
     """
     
-    def __init__(self, use_proxy: bool = True, delay: tuple = (1, 3)):
+    def __init__(self, use_proxy: bool = True, delay: tuple = (1, 3),
+                 limiter: HostRateLimiter = None, retry: RetryEngine = None):
         self.session = requests.Session()
         self.use_proxy = use_proxy
         self.delay_range = delay
+        self.limiter = limiter or HostRateLimiter.from_delay(delay)
+        self.retry = retry or default_engine()
         self.proxy_manager = ProxyManager()
-        self.last_request_time = 0
-        
-        if use_proxy and self.proxy_manager.test_proxy():
-            self.session.proxies.update(self.proxy_manager.get_proxy())
-    
-    def _random_delay(self):
-        """随机延迟，模拟人类行为"""
-        min_delay, max_delay = self.delay_range
-        # 添加 jitter 避免规律性
-        delay = random.uniform(min_delay, max_delay)
-        # 确保请求间隔
-        elapsed = time.time() - self.last_request_time
-        if elapsed < delay:
-            time.sleep(delay - elapsed)
-        self.last_request_time = time.time()
     
     def get(self, url: str, headers: Dict = None, **kwargs) -> requests.Response:
         """智能 GET 请求"""
-        self._random_delay()
-        
         if headers is None:
             headers = get_random_headers(referer=self._get_referer(url))
         
         try:
-            response = self.session.get(url, headers=headers, timeout=15, **kwargs)
+            response = self._send("GET", url, headers=headers, **kwargs)
             return response
         except requests.exceptions.RequestException as e:
             print(f"❌ 请求失败: {e}")
@@ -145,29 +218,197 @@ class StealthRequester:
     
     def post(self, url: str, data=None, json=None, headers: Dict = None, **kwargs) -> requests.Response:
         """智能 POST 请求"""
-        self._random_delay()
-        
         if headers is None:
             headers = get_random_headers(accept_type="api", referer=self._get_referer(url))
             headers["Content-Type"] = "application/x-www-form-urlencoded" if data else "application/json"
             headers["X-Requested-With"] = "XMLHttpRequest"
         
         try:
-            response = self.session.post(url, data=data, json=json, headers=headers, timeout=15, **kwargs)
+            response = self._send("POST", url, data=data, json=json, headers=headers, **kwargs)
             return response
         except requests.exceptions.RequestException as e:
             print(f"❌ 请求失败: {e}")
             raise
     
-    def _get_referer(self, url: str) -> str:
-        """生成合理的 Referer"""
-        parsed = urlparse(url)
-        return f"{parsed.scheme}://{parsed.netloc}/"
+    def download(self, url: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 allowed_types: Optional[Tuple[str, ...]] = DEFAULT_ALLOWED_TYPES,
+                 truncate: bool = False, **kwargs) -> BodyStream:
+        """
+        限长流式 GET
+        
+        下载前检查 Content-Type 白名单和 Content-Length，边读边计数，超过 max_bytes 即停止；
+        返回的 BodyStream 可 .read() 取字节、.text() 取文本，或直接当文件对象读
+        
+        Raises:
+            ContentTypeRejected / BodyTooLarge（truncate=False 时）
+        """
+        response = self.get(url, stream=True, **kwargs)
+        return BodyStream(response, max_bytes, allowed_types, truncate)
+    
+    def _fetch_one(self, url: str, **kwargs) -> Tuple[str, Optional[requests.Response], Optional[Exception]]:
+        # 重试只在 _send 的 RetryEngine 里做一层
+        try:
+            return url, self.get(url, **kwargs), None
+        except requests.exceptions.RequestException as e:
+            return url, None, e
+    
+    def fetch_many(self, urls: Iterable[str], concurrency: int = 4, ordered: bool = False,
+                   timeout: float = 15, **kwargs) -> Iterator[Tuple]:
+        """
+        批量 GET，结果边完成边产出
+        
+        urls 可以是生成器；在途请求不超过 concurrency 个，已产出的响应不会被保留，
+        十万级 URL 也不会把所有响应体堆在内存里（大文件可再传 stream=True）
+        
+        Args:
+            ordered: True 按输入顺序产出，False 按完成顺序产出
+            timeout: 单个请求超时（秒）；失败重试按 self.retry 的策略
+        
+        Yields:
+            (url, response, error) - 成功时 error 为 None，失败时 response 为 None
+        """
+        url_iter = iter(urls)
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        submit = lambda url: executor.submit(self._fetch_one, url, timeout=timeout, **kwargs)
+        
+        try:
+            if ordered:
+                window = deque(submit(url) for _, url in zip(range(concurrency), url_iter))
+                while window:
+                    result = window.popleft().result()
+                    url = next(url_iter, None)
+                    if url is not None:
+                        window.append(submit(url))
+                    yield result
+            else:
+                pending = {submit(url) for _, url in zip(range(concurrency), url_iter)}
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        url = next(url_iter, None)
+                        if url is not None:
+                            pending.add(submit(url))
+                        yield future.result()
+        finally:
+            # 调用方提前 break 时丢弃尚未开始的请求
+            executor.shutdown(wait=False, cancel_futures=True)
     
     def close(self):
         """关闭会话"""
         self.session.close()
 
+class AsyncRequester(RequestSender):
+    """
+    异步请求器 - StealthRequester 的 asyncio 版本
+    
+    功能：
+    - 与 StealthRequester 相同的 get/post 接口（返回 requests.Response）
+    - 共享连接池，请求在线程池中执行，不阻塞事件循环
+    - 按 host 限制并发数
+    - 按 host 的令牌桶限速，访问 A 站不会拖慢 B 站
+    
+    用法：
+        async with AsyncRequester() as requester:
+            responses = await asyncio.gather(*(requester.get(u) for u in urls))
+    """
+    
+    def __init__(self, use_proxy: bool = True, delay: tuple = (1, 3),
+                 per_host: int = 2, max_connections: int = 64,
+                 limiter: HostRateLimiter = None, retry: RetryEngine = None):
+        self.session = requests.Session()
+        # pool_connections: 缓存多少个 host 的连接池; pool_maxsize: 每个 host 的连接数
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=per_host)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.use_proxy = use_proxy
+        self.delay_range = delay
+        self.per_host = per_host
+        self.limiter = limiter or HostRateLimiter.from_delay(delay)
+        self.retry = retry or default_engine()
+        self.proxy_manager = ProxyManager()
+        self._executor = ThreadPoolExecutor(max_workers=max_connections)
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    async def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        host = urlparse(url).netloc
+        semaphore = self._host_semaphores.setdefault(host, asyncio.Semaphore(self.per_host))
+        
+        async with semaphore:
+            await self.limiter.acquire_async(host)
+            call = functools.partial(self._send, method, url, paced=True, **kwargs)
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+            except requests.exceptions.RequestException as e:
+                print(f"❌ 请求失败: {e}")
+                raise
+    
+    async def get(self, url: str, headers: Dict = None, **kwargs) -> requests.Response:
+        """异步 GET 请求"""
+        if headers is None:
+            headers = get_random_headers(referer=self._get_referer(url))
+        
+        return await self._request("GET", url, headers=headers, **kwargs)
+    
+    async def post(self, url: str, data=None, json=None, headers: Dict = None, **kwargs) -> requests.Response:
+        """异步 POST 请求"""
+        if headers is None:
+            headers = get_random_headers(accept_type="api", referer=self._get_referer(url))
+            headers["Content-Type"] = "application/x-www-form-urlencoded" if data else "application/json"
+            headers["X-Requested-With"] = "XMLHttpRequest"
+        
+        return await self._request("POST", url, data=data, json=json, headers=headers, **kwargs)
+    
+    async def _fetch_one(self, url: str, **kwargs) -> Tuple[str, Optional[requests.Response], Optional[Exception]]:
+        try:
+            return url, await self.get(url, **kwargs), None
+        except requests.exceptions.RequestException as e:
+            return url, None, e
+    
+    async def fetch_many(self, urls: Iterable[str], concurrency: int = 16, ordered: bool = False,
+                         timeout: float = 15, **kwargs) -> AsyncIterator[Tuple]:
+        """
+        批量 GET 的异步迭代器，参数和产出与 StealthRequester.fetch_many 相同
+        
+        用法：
+            async for url, response, error in requester.fetch_many(urls, concurrency=32):
+                ...
+        """
+        url_iter = iter(urls)
+        spawn = lambda url: asyncio.ensure_future(self._fetch_one(url, timeout=timeout, **kwargs))
+        pending = deque(spawn(url) for _, url in zip(range(concurrency), url_iter))
+        
+        try:
+            if ordered:
+                while pending:
+                    result = await pending.popleft()
+                    url = next(url_iter, None)
+                    if url is not None:
+                        pending.append(spawn(url))
+                    yield result
+            else:
+                pending = set(pending)
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        url = next(url_iter, None)
+                        if url is not None:
+                            pending.add(spawn(url))
+                        yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def close(self):
+        """关闭会话和线程池"""
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
 # ============ 4. 特定网站适配器 ============
 
 class XiaohongshuAdapter:
@@ -209,10 +450,11 @@ class XiaohongshuAdapter:
             return None
 
 class FinancialTimesAdapter:
-    """Financial Times 适配器"""
+    """Financial Times 适配器（文章走磁盘缓存 + 条件请求）"""
     
-    def __init__(self, stealth: StealthRequester = None):
+    def __init__(self, stealth: StealthRequester = None, use_cache: bool = True, cache: HttpCache = None):
         self.stealth = stealth or StealthRequester()
+        self.cache = (cache or default_cache()) if use_cache else None
     
     def get_article(self, url: str) -> Optional[str]:
         """获取文章内容"""
@@ -220,7 +462,10 @@ class FinancialTimesAdapter:
             headers = get_random_headers()
             headers["Referer"] = "https://www.ft.com/"
             
-            response = self.stealth.get(url, headers=headers)
+            if self.cache is not None:
+                response = self.cache.fetch(url, requests_sender(self.stealth.get), headers)
+            else:
+                response = self.stealth.get(url, headers=headers)
             
             if response.status_code == 200:
                 return response.text
@@ -235,16 +480,212 @@ class FinancialTimesAdapter:
             print(f"❌ 获取 FT 文章失败: {e}")
             return None
 
+class DuckDuckGoResultParser(HTMLParser):
+    """
+    DuckDuckGo HTML 结果的单遍增量解析器
+    
+    按块 feed()，每条结果的 标题 / 链接 / 摘要 / 显示网址 在一次扫描中取出，
+    凑够 max_results 条后 done 置为 True，调用方即可停止读取剩余页面；
+    读完整页时 next_form 为翻页表单的参数（q / s / dc / vqd ...），没有下一页则为 None
+    """
+    
+    # class 名 -> 结果字段
+    FIELDS = {"result__a": "title", "result__snippet": "snippet", "result__url": "display_url"}
+    
+    def __init__(self, max_results: int = 10):
+        super().__init__(convert_charrefs=True)
+        self.max_results = max_results
+        self.results: List[Dict] = []
+        self.done = False
+        self.next_form: Optional[Dict[str, str]] = None
+        self._form: Optional[Dict[str, str]] = None
+        self._form_submit = ""
+        self._current: Optional[Dict] = None
+        self._field: Optional[str] = None
+        self._field_tag: Optional[str] = None
+        self._depth = 0
+        self._text: List[str] = []
+    
+    @staticmethod
+    def _real_url(href: str) -> str:
+        """DDG 跳转链接 //duckduckgo.com/l/?uddg=<真实地址> 还原为真实地址"""
+        if href.startswith("//"):
+            href = "https:" + href
+        if "uddg=" in href:
+            target = parse_qs(urlparse(href).query).get("uddg")
+            if target:
+                return target[0]
+        return href
+    
+    def _flush(self):
+        if self._current and self._current.get("url") and not self.done:
+            self.results.append({"index": len(self.results) + 1, **self._current})
+            self.done = len(self.results) >= self.max_results
+        self._current = None
+    
+    def _form_tag(self, tag: str, attrs: Dict):
+        """记录页面底部翻页表单的隐藏参数"""
+        if tag == "form":
+            self._form, self._form_submit = {}, ""
+        elif tag == "input" and self._form is not None:
+            if attrs.get("type") == "submit":
+                self._form_submit = attrs.get("value") or ""
+            elif attrs.get("name"):
+                self._form[attrs["name"]] = attrs.get("value") or ""
+    
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if self._field is not None:
+            if tag == self._field_tag:
+                self._depth += 1
+            return
+        
+        attrs = dict(attrs)
+        if tag in ("form", "input"):
+            self._form_tag(tag, attrs)
+            return
+        classes = (attrs.get("class") or "").split()
+        field = next((self.FIELDS[c] for c in classes if c in self.FIELDS), None)
+        if field is None:
+            return
+        
+        if field == "title":
+            # 新结果开始，上一条结果完整了（广告链接跳过）
+            self._flush()
+            href = attrs.get("href") or ""
+            if "duckduckgo.com/y.js" in href:
+                return
+            self._current = {"title": "", "url": self._real_url(href), "snippet": "", "display_url": ""}
+        elif self._current is None:
+            return
+        
+        self._field, self._field_tag, self._depth = field, tag, 1
+        self._text = []
+    
+    def handle_endtag(self, tag):
+        if tag == "form" and self._form is not None:
+            # 翻页表单带 s（偏移）参数；“上一页”表单排除
+            if "s" in self._form and self._form_submit.lower() not in ("previous", "上一页"):
+                self.next_form = self._form
+            self._form = None
+            return
+        if self._field is None or tag != self._field_tag:
+            return
+        self._depth -= 1
+        if self._depth:
+            return
+        
+        self._current[self._field] = " ".join("".join(self._text).split())
+        finished_snippet = self._field == "snippet"
+        self._field = None
+        # 摘要是每条结果的最后一个字段
+        if finished_snippet:
+            self._flush()
+    
+    def handle_data(self, data):
+        if self._field is not None:
+            self._text.append(data)
+    
+    def close(self):
+        super().close()
+        self._flush()
+
+def _feed_duckduckgo(chunks, max_results: int, encoding: str) -> DuckDuckGoResultParser:
+    if isinstance(chunks, (str, bytes)):
+        chunks = [chunks]
+    
+    parser = DuckDuckGoResultParser(max_results)
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk) if isinstance(chunk, bytes) else chunk)
+        if parser.done:
+            break
+    else:
+        parser.close()
+    return parser
+
+def parse_duckduckgo_results(chunks, max_results: int = 10, encoding: str = "utf-8") -> List[Dict]:
+    """
+    从 HTML 块流中解析 DuckDuckGo 结果，凑够 max_results 条即停止
+    
+    chunks 可以是完整字符串、字符串块或字节块（如 response.iter_content()）
+    """
+    return _feed_duckduckgo(chunks, max_results, encoding).results
+
+def iter_duckduckgo(post, data: Dict, max_results: int = None, max_pages: int = 10) -> Iterator[Dict]:
+    """
+    DuckDuckGo HTML 搜索的分页结果流
+    
+    按页面底部的翻页表单（s / dc / vqd 等参数）惰性翻页；
+    当前页解析完立即在后台预取下一页，调用方消费当前页时下一页已在路上
+    
+    Args:
+        post: post(data) -> 以 stream=True 发出的 requests.Response
+        data: 第一页的表单参数（q / kl ...）
+        max_results: 最多产出条数，None 不限
+        max_pages: 最多翻页数
+    
+    Raises:
+        第一页的请求或解析错误原样抛出；之后的翻页失败只结束翻页，已产出的结果不受影响
+    """
+    def fetch_page(form: Dict, limit: float):
+        response = post(form)
+        with response:
+            parser = _feed_duckduckgo(
+                response.iter_content(chunk_size=8192), limit, response.encoding or "utf-8"
+            )
+        # 本页已凑够所需条数时不需要下一页
+        return parser.results, None if parser.done else parser.next_form
+    
+    seen = set()
+    count = 0
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        future = executor.submit(fetch_page, data, max_results or float("inf"))
+        for page in range(max_pages):
+            try:
+                results, next_form = future.result()
+            except Exception as e:
+                if page == 0:
+                    raise
+                print(f"❌ 翻页失败（第 {page + 1} 页）: {e}")
+                return
+            if next_form and page + 1 < max_pages:
+                remaining = max_results - count if max_results else float("inf")
+                future = executor.submit(fetch_page, next_form, remaining)
+            else:
+                future = None
+            
+            for item in results:
+                if item["url"] in seen:
+                    continue
+                seen.add(item["url"])
+                count += 1
+                yield dict(item, index=count)
+                if max_results and count >= max_results:
+                    return
+            
+            if future is None:
+                return
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
 class DuckDuckGoAdapter:
     """DuckDuckGo 搜索适配器"""
     
+    URL = "https://html.duckduckgo.com/html/"
+    
     def __init__(self, stealth: StealthRequester = None):
         self.stealth = stealth or StealthRequester()
     
     def search(self, query: str, max_results: int = 10) -> List[Dict]:
-        """搜索"""
-        url = "https://html.duckduckgo.com/html/"
+        """
+        搜索
         
+        Returns:
+            [{"index", "title", "url", "snippet", "display_url"}]
+        """
         headers = get_random_headers()
         headers["Origin"] = "https://html.duckduckgo.com"
         headers["Referer"] = "https://html.duckduckgo.com/"
@@ -256,40 +697,39 @@ class DuckDuckGoAdapter:
         }
         
         try:
-            response = self.stealth.post(url, data=data, headers=headers)
-            return self._parse_results(response.text, max_results)
+            # 流式读取，解析够 max_results 条后不再下载剩余页面
+            # 搜索表单重放没有副作用，允许重试
+            response = self.stealth.post(self.URL, data=data, headers=headers, stream=True, retry_unsafe=True)
+            try:
+                return self._parse_results(response, max_results)
+            finally:
+                response.close()
         except Exception as e:
             print(f"❌ 搜索失败: {e}")
             return []
     
-    def _parse_results(self, html: str, max_results: int) -> List[Dict]:
-        """解析搜索结果"""
-        import re
-        from html import unescape
-        
-        results = []
-        
-        # DuckDuckGo HTML 格式 1
-        pattern1 = r'<a[^>]*class="result__a"[^>]*href="([^"]+)"[^>]*>([^<]+)</a>'
-        matches = re.findall(pattern1, html)
-        
-        # DuckDuckGo HTML 格式 2 (新版)
-        pattern2 = r'<a[^>]*rel="nofollow"[^>]*href="([^"]+)"[^>]*>([^<]+)</a>'
-        matches2 = re.findall(pattern2, html)
-        matches.extend(matches2)
+    def iter_search(self, query: str, max_results: int = None, max_pages: int = 10) -> Iterator[Dict]:
+        """
+        分页搜索结果流，按需翻页并预取下一页；第一页失败时抛出异常
         
-        for i, (link, title) in enumerate(matches[:max_results]):
-            # HTML 解码
-            title = unescape(title)
-            title = title.replace('<b>', '').replace('</b>', '')
-            
-            results.append({
-                "index": i + 1,
-                "title": title.strip(),
-                "url": link
-            })
+        用法：
+            for item in ddg.iter_search("gold price", max_results=100):
+                print(item["title"], item["url"])
+        """
+        headers = get_random_headers()
+        headers["Origin"] = "https://html.duckduckgo.com"
+        headers["Referer"] = "https://html.duckduckgo.com/"
+        data = {"q": query, "kl": "zh-cn", "df": ""}
         
-        return results
+        post = lambda form: self.stealth.post(self.URL, data=form, headers=headers, stream=True,
+                                              retry_unsafe=True)
+        return iter_duckduckgo(post, data, max_results, max_pages)
+    
+    def _parse_results(self, response: requests.Response, max_results: int) -> List[Dict]:
+        """解析搜索结果"""
+        return parse_duckduckgo_results(
+            response.iter_content(chunk_size=8192), max_results, response.encoding or "utf-8"
+        )
 
 # ============ 5. 使用示例 ============
 
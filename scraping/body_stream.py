@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📥 限长流式下载
+- stream=True 分块读取响应体，超过 max_bytes 立即停止（报错或截断）
+- 下载前检查 Content-Type 白名单和 Content-Length，PDF / 视频等直接拒绝
+- 只用第一块数据嗅探编码（HTTP 头 > BOM > <meta charset> / XML 声明）
+- 调用方可以取字节、文本，或当作只读文件对象逐步读取
+"""
+
+import codecs
+import io
+import re
+from typing import Iterator, Optional, Tuple
+
+import requests
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+# 以 / 结尾的条目按前缀匹配
+DEFAULT_ALLOWED_TYPES = (
+    "text/",
+    "application/xhtml+xml",
+    "application/xml",
+    "application/rss+xml",
+    "application/atom+xml",
+    "application/json",
+)
+
+META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)""", re.I)
+XML_ENCODING = re.compile(rb"""<\?xml[^>]+encoding\s*=\s*["']([\w.:-]+)""", re.I)
+
+# 网页常把 GBK/GB18030 内容标成 gb2312，按超集解码
+CHARSET_ALIASES = {"gb2312": "gb18030", "gbk": "gb18030", "x-gbk": "gb18030"}
+
+class BodyTooLarge(requests.exceptions.RequestException):
+    """响应体超过 max_bytes"""
+
+class ContentTypeRejected(requests.exceptions.RequestException):
+    """Content-Type 不在白名单中"""
+
+def media_type(headers) -> str:
+    return (headers.get("Content-Type") or "").split(";")[0].strip().lower()
+
+def type_allowed(content_type: str, allowed_types: Optional[Tuple[str, ...]]) -> bool:
+    """allowed_types 为 None 或响应没有 Content-Type 时放行"""
+    if not allowed_types or not content_type:
+        return True
+    return any(content_type.startswith(t) if t.endswith("/") else content_type == t for t in allowed_types)
+
+def _valid_charset(name: str) -> Optional[str]:
+    name = name.strip().strip("\"'").lower()
+    name = CHARSET_ALIASES.get(name, name)
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+def sniff_charset(headers, head: bytes, default: str = "utf-8") -> str:
+    """由 HTTP 头和响应体开头的一段字节判断编码"""
+    for part in (headers.get("Content-Type") or "").split(";")[1:]:
+        key, _, value = part.strip().partition("=")
+        charset = _valid_charset(value) if key.lower() == "charset" else None
+        if charset:
+            return charset
+
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+
+    for pattern in (META_CHARSET, XML_ENCODING):
+        match = pattern.search(head[:4096])
+        charset = _valid_charset(match.group(1).decode("ascii", "ignore")) if match else None
+        if charset:
+            return charset
+    return default
+
+class BodyStream(io.RawIOBase):
+    """
+    限长的响应体读取器（只读文件对象）
+
+    用法：
+        body = BodyStream(session.get(url, stream=True), max_bytes=2 * 1024 * 1024)
+        data = body.read()            # 字节
+        text = body.text()            # 按嗅探的编码解码
+        for chunk in body.iter_chunks(): ...
+        shutil.copyfileobj(body, f)   # 当文件对象用
+
+    truncate=False 时超过 max_bytes 抛 BodyTooLarge；True 时读到上限即停止，truncated 置为 True
+    """
+
+    def __init__(self, response: requests.Response, max_bytes: int = DEFAULT_MAX_BYTES,
+                 allowed_types: Optional[Tuple[str, ...]] = DEFAULT_ALLOWED_TYPES,
+                 truncate: bool = False, chunk_size: int = CHUNK_SIZE):
+        super().__init__()
+        self.response = response
+        self.url = response.url
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.max_bytes = max_bytes
+        self.truncate = truncate
+        self.truncated = False
+        self.bytes_read = 0
+        self.content_type = media_type(response.headers)
+
+        if response.status_code == 200 and not type_allowed(self.content_type, allowed_types):
+            response.close()
+            raise ContentTypeRejected(f"不接受的 Content-Type: {self.content_type} ({self.url})")
+
+        length = response.headers.get("Content-Length", "")
+        if not truncate and length.isdigit() and int(length) > max_bytes:
+            response.close()
+            raise BodyTooLarge(f"响应体 {int(length)} 字节，超过上限 {max_bytes} ({self.url})")
+
+        self._chunks = response.iter_content(chunk_size)
+        self._finished = False
+        # 只用第一块嗅探编码
+        self._buffer = self._next_chunk()
+        self.encoding = sniff_charset(response.headers, self._buffer)
+
+    def _next_chunk(self) -> bytes:
+        if self._finished:
+            return b""
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            remaining = self.max_bytes - self.bytes_read
+            if len(chunk) > remaining:
+                if not self.truncate:
+                    self.close()
+                    raise BodyTooLarge(f"响应体超过上限 {self.max_bytes} 字节 ({self.url})")
+                chunk = chunk[:remaining]
+                self.truncated = True
+                self._finish()
+            self.bytes_read += len(chunk)
+            return chunk
+        self._finish()
+        return b""
+
+    def _finish(self):
+        self._finished = True
+        self.response.close()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if not self._buffer:
+            self._buffer = self._next_chunk()
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+    def iter_chunks(self) -> Iterator[bytes]:
+        """逐块产出剩余的响应体"""
+        while True:
+            chunk, self._buffer = self._buffer or self._next_chunk(), b""
+            if not chunk:
+                return
+            yield chunk
+
+    def text(self) -> str:
+        return self.read().decode(self.encoding, errors="replace")
+
+    def close(self):
+        if not self.closed:
+            self.response.close()
+        super().close()
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📰 正文提取
+- 一遍流式解析 HTML，同时取出 标题 / 正文 / 发布时间 / canonical URL / 正文中的链接
+- 类似 Readability：按段落文本量给父容器打分，取得分最高的容器作为正文
+- 跳过脚本、导航、页眉页脚、侧栏、评论等模板内容
+- 超过 max_bytes 即停止解码，超大页面不会整页读入内存
+"""
+
+import codecs
+import re
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional, Union
+from urllib.parse import urljoin, urldefrag
+
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024
+
+# 整个子树都跳过的标签
+SKIP_TAGS = {
+    "script", "style", "noscript", "template", "svg", "iframe", "form", "button",
+    "select", "nav", "header", "footer", "aside",
+}
+# 文本块
+BLOCK_TAGS = {"p", "h1", "h2", "h3", "h4", "h5", "h6", "li", "pre", "blockquote", "td", "dd", "figcaption"}
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+# 行内标签：不打断容器里直接写的文字
+INLINE_TAGS = {
+    "a", "abbr", "b", "bdi", "cite", "code", "em", "font", "i", "kbd", "mark", "q", "s",
+    "small", "span", "strong", "sub", "sup", "time", "u", "var",
+}
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "param", "source", "track", "wbr",
+}
+
+# class / id 命中 UNLIKELY 且不命中 MAYBE 的元素视为模板内容
+UNLIKELY = re.compile(
+    r"comment|sidebar|footer|header|menu|nav|share|social|related|recommend|"
+    r"advert|sponsor|\bads?\b|cookie|banner|popup|modal|subscribe|breadcrumb|pagination", re.I
+)
+MAYBE = re.compile(r"article|body|column|content|main", re.I)
+POSITIVE = re.compile(r"article|content|entry|post|story|text|main|body", re.I)
+NEGATIVE = re.compile(r"comment|meta|footer|footnote|promo|related|sidebar|widget|hidden", re.I)
+
+DATE_META = {
+    "article:published_time", "og:published_time", "pubdate", "publishdate", "date",
+    "dc.date", "dc.date.issued", "parsely-pub-date", "article.published", "datepublished",
+}
+LD_DATE = re.compile(r'"datePublished"\s*:\s*"([^"]+)"')
+
+class ArticleExtractor(HTMLParser):
+    """
+    正文提取解析器，按块 feed()，结束后调用 result()
+
+    每个元素分配一个节点号，段落文本按 Readability 的规则计分：
+    父容器得满分，祖父容器得一半；最后取 得分 + class 权重 最高的容器
+    直接写在 <div> 等容器里的文字（不在 <p> 中）作为该容器自己的文本块
+    """
+
+    def __init__(self, url: str = ""):
+        super().__init__(convert_charrefs=True)
+        self.url = url
+        self.meta: Dict[str, str] = {}
+        self.title = ""
+        self.h1 = ""
+        self.canonical = ""
+        self.published = ""
+
+        self._stack: List[tuple] = []        # (tag, 节点号)
+        self._parents: Dict[int, Optional[int]] = {}
+        self._weights: Dict[int, float] = {}
+        self._scores: Dict[int, float] = {}
+        self._next_id = 0
+
+        self._skip_tag: Optional[str] = None
+        self._skip_depth = 0
+        self._block: Optional[Dict] = None
+        self._blocks: List[Dict] = []
+        self._links: List[tuple] = []        # (节点号, url, 文本)
+        self._link: Optional[Dict] = None
+        self._in_title = False
+        self._ld_json: Optional[List[str]] = None
+
+    # ---------- 解析 ----------
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth += 1
+            return
+
+        attrs = dict(attrs)
+        if tag in ("meta", "link"):
+            self._head_tag(tag, attrs)
+            return
+        if tag == "title":
+            self._in_title = True
+            return
+        if tag == "script" and attrs.get("type") == "application/ld+json":
+            self._ld_json = []
+            return
+        if tag == "time" and not self.published and attrs.get("datetime"):
+            self.published = attrs["datetime"]
+
+        marker = f"{attrs.get('class') or ''} {attrs.get('id') or ''}"
+        if tag in SKIP_TAGS or (tag not in ("html", "body", "article", "main")
+                                and UNLIKELY.search(marker) and not MAYBE.search(marker)):
+            self._skip_tag, self._skip_depth = tag, 1
+            return
+        if tag in VOID_TAGS:
+            if tag == "br" and self._block is not None:
+                self._block["text"].append("\n")
+            return
+
+        if tag in BLOCK_TAGS:
+            # <p> 可以省略结束标签，遇到下一个块时隐式结束
+            if self._stack and self._stack[-1][0] == "p":
+                self.handle_endtag("p")
+            if self._block is not None:
+                self._flush()
+        elif tag not in INLINE_TAGS and self._block is not None and self._block["implicit"]:
+            # 容器直接文字遇到嵌套的块级元素就结束
+            self._flush()
+
+        node = self._next_id
+        self._next_id += 1
+        parent = self._stack[-1][1] if self._stack else None
+        self._parents[node] = parent
+        self._weights[node] = self._class_weight(tag, marker)
+        self._stack.append((tag, node))
+
+        if tag in BLOCK_TAGS:
+            self._block = {"tag": tag, "node": node, "text": [], "link_chars": 0, "implicit": False}
+        elif tag == "a" and attrs.get("href"):
+            self._link = {"href": attrs["href"], "node": node, "text": []}
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth -= 1
+                if self._skip_depth == 0:
+                    self._skip_tag = None
+            return
+        if tag == "title":
+            self._in_title = False
+            return
+        if tag == "script" and self._ld_json is not None:
+            match = LD_DATE.search("".join(self._ld_json))
+            if match and not self.published:
+                self.published = match.group(1)
+            self._ld_json = None
+            return
+
+        # 容错：只在栈中有对应开始标签时出栈
+        if not any(t == tag for t, _ in self._stack):
+            return
+        while self._stack:
+            open_tag, node = self._stack.pop()
+            if self._block is not None and self._block["node"] == node:
+                self._flush()
+            if self._link is not None and self._link["node"] == node:
+                self._end_link()
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self._ld_json is not None:
+            self._ld_json.append(data)
+            return
+        if self._in_title:
+            self.title += data
+            return
+        if self._skip_tag is not None:
+            return
+        if self._link is not None:
+            self._link["text"].append(data)
+        if self._block is None and data.strip():
+            self._start_implicit()
+        if self._block is not None:
+            self._block["text"].append(data)
+            if self._link is not None:
+                self._block["link_chars"] += len(data.strip())
+
+    def _start_implicit(self):
+        """不在块标签里的文字：归到最近的非行内容器"""
+        for tag, node in reversed(self._stack):
+            if tag not in INLINE_TAGS:
+                self._block = {"tag": tag, "node": node, "text": [], "link_chars": 0, "implicit": True}
+                return
+
+    def _head_tag(self, tag: str, attrs: Dict):
+        if tag == "link":
+            if "canonical" in (attrs.get("rel") or "").lower().split() and attrs.get("href"):
+                self.canonical = self.canonical or attrs["href"]
+            return
+        key = (attrs.get("property") or attrs.get("name") or attrs.get("itemprop") or "").lower()
+        content = attrs.get("content")
+        if not key or content is None:
+            return
+        self.meta.setdefault(key, content)
+        if key in DATE_META and not self.published:
+            self.published = content
+
+    def _class_weight(self, tag: str, marker: str) -> float:
+        weight = 0.0
+        if tag in ("article", "main"):
+            weight += 25
+        if POSITIVE.search(marker):
+            weight += 25
+        if NEGATIVE.search(marker):
+            weight -= 25
+        return weight
+
+    def _end_link(self):
+        link, self._link = self._link, None
+        self._links.append((link["node"], link["href"], " ".join("".join(link["text"]).split())))
+
+    def _flush(self):
+        block, self._block = self._block, None
+        text = "\n".join(" ".join(line.split()) for line in "".join(block["text"]).split("\n"))
+        text = text.strip()
+        if not text:
+            return
+        if block["tag"] == "h1" and not self.h1:
+            self.h1 = text
+        block["text"] = text
+        self._blocks.append(block)
+
+        # Readability 计分：逗号数 + 每 100 字 1 分（最多 3 分）
+        if block["tag"] in HEADING_TAGS or len(text) < 25:
+            return
+        score = 1 + text.count(",") + text.count("，") + min(len(text) / 100, 3)
+        # 容器直接文字算容器自己的分，段落算父容器的分
+        parent = block["node"] if block["implicit"] else self._parents.get(block["node"])
+        if parent is not None:
+            self._scores[parent] = self._scores.get(parent, 0) + score
+            grandparent = self._parents.get(parent)
+            if grandparent is not None:
+                self._scores[grandparent] = self._scores.get(grandparent, 0) + score / 2
+
+    # ---------- 结果 ----------
+
+    def _ancestors(self, node: int) -> set:
+        chain = set()
+        while node is not None:
+            chain.add(node)
+            node = self._parents.get(node)
+        return chain
+
+    def result(self) -> Dict:
+        if self._block is not None:
+            self._flush()
+
+        best = None
+        if self._scores:
+            best = max(self._scores, key=lambda n: self._scores[n] + self._weights.get(n, 0))
+
+        paragraphs = []
+        for block in self._blocks:
+            if best is not None and best not in self._ancestors(block["node"]):
+                continue
+            # 链接文字占一半以上的块多半是导航或推荐列表
+            if block["tag"] not in HEADING_TAGS and block["link_chars"] > len(block["text"]) / 2:
+                continue
+            paragraphs.append(block["text"])
+
+        links, seen = [], set()
+        for node, href, text in self._links:
+            if best is not None and best not in self._ancestors(node):
+                continue
+            href = urldefrag(urljoin(self.url, href.strip()))[0]
+            if not href.startswith(("http://", "https://")) or href in seen:
+                continue
+            seen.add(href)
+            links.append({"url": href, "text": text})
+
+        canonical = self.canonical or self.meta.get("og:url") or ""
+        return {
+            "url": self.url,
+            "canonical_url": urljoin(self.url, canonical) if canonical else self.url,
+            "title": (self.meta.get("og:title") or " ".join(self.title.split()) or self.h1).strip(),
+            "published": self.published.strip() or None,
+            "text": "\n\n".join(paragraphs),
+            "links": links,
+        }
+
+def extract_article(chunks: Union[str, bytes, Iterable], url: str = "", encoding: str = "utf-8",
+                    max_bytes: int = DEFAULT_MAX_BYTES) -> Dict:
+    """
+    从 HTML 块流中提取正文
+
+    chunks 可以是完整字符串、字节串，或字节块 / 字符串块的迭代器（如 response.iter_content()）
+    读满 max_bytes 后停止解码，结果中 truncated 为 True
+
+    Returns:
+        {"url", "canonical_url", "title", "published", "text", "links", "truncated", "bytes"}
+    """
+    if isinstance(chunks, (str, bytes)):
+        chunks = [chunks]
+
+    # 响应头里的字符集可能写错，解码和字符串块编码都用同一个规范化后的名字
+    try:
+        encoding = codecs.lookup(encoding or "utf-8").name
+    except LookupError:
+        encoding = "utf-8"
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+
+    parser = ArticleExtractor(url)
+    size = 0
+    truncated = False
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode(encoding, errors="replace")
+        if size + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - size]
+            truncated = True
+        size += len(chunk)
+        parser.feed(decoder.decode(chunk))
+        if truncated:
+            break
+    else:
+        parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+
+    result = parser.result()
+    result["truncated"] = truncated
+    result["bytes"] = size
+    return result
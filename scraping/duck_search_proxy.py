@@ -5,10 +5,14 @@
 使用本地 Clash/Mihomo 代理
 """
 
-import requests
 import sys
 import os
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from proxy_pool import default_pool
+from retry import default_engine
+from anti_spider_tools import iter_duckduckgo
+
 # 代理设置 - 只影响当前脚本，不影响系统其他部分
 PROXY_HTTP = "http://127.0.0.1:7890"
 PROXY_SOCKS = "socks5://127.0.0.1:7891"
@@ -19,7 +23,7 @@ proxies = {
 }
 
 def duckduckgo_search(query, max_results=10):
-    """使用 DuckDuckGo 搜索（带代理）"""
+    """使用 DuckDuckGo 搜索（带代理），结果超过一页时自动翻页"""
     try:
         # 使用 DuckDuckGo HTML 版
         url = "https://html.duckduckgo.com/html/"
@@ -31,30 +35,18 @@ def duckduckgo_search(query, max_results=10):
             "kl": "zh-cn"
         }
         
-        response = requests.post(
+        post = lambda form: default_engine().post(
             url, 
             headers=headers, 
-            data=data, 
+            data=form, 
             proxies=proxies,
-            timeout=15
+            timeout=15,
+            stream=True,
+            retry_unsafe=True   # 搜索表单重放没有副作用
         )
         
-        results = []
-        html = response.text
-        
-        import re
-        pattern = r'<a rel="nofollow" class="result__a" href="([^"]+)">([^<]+)</a>'
-        matches = re.findall(pattern, html)
-        
-        for i, (link, title) in enumerate(matches[:max_results]):
-            title = title.replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>')
-            results.append({
-                "index": i + 1,
-                "title": title,
-                "url": link
-            })
-        
-        return results
+        # 单遍流式解析，够 max_results 条就停止下载；不够时翻页并预取
+        return list(iter_duckduckgo(post, data, max_results))
         
     except Exception as e:
         return [{"error": str(e)}]
@@ -76,20 +68,14 @@ def format_results(results):
     for item in results:
         print(f"\n{item['index']}. {item['title']}")
         print(f"   {item['url']}")
+        if item.get('snippet'):
+            print(f"   {item['snippet']}")
     
     print("\n" + "-" * 70)
 
 def test_proxy():
-    """测试代理是否可用"""
-    try:
-        response = requests.get(
-            "https://www.google.com/robots.txt",
-            proxies=proxies,
-            timeout=5
-        )
-        return response.status_code == 200
-    except:
-        return False
+    """测试代理是否可用（读取代理池缓存的健康状态，不阻塞）"""
+    return default_pool().is_healthy(PROXY_HTTP)
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
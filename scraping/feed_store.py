@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🗃️ RSS 条目索引
+- 记录推送过的条目，只保存 8 字节键（guid/link 的哈希）、来源和首次出现时间
+- 同一条新闻出现在多个源（home / world ...）时只算一次
+- 按首次出现时间清理旧记录，索引大小有上限
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List
+
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".cache", "bear-toolbox", "feed_items.sqlite")
+
+def item_key(item: Dict) -> int:
+    """条目键：guid > link > title 的哈希，取 8 字节作为有符号整数（SQLite INTEGER PRIMARY KEY）"""
+    ident = (item.get("guid") or item.get("link") or item.get("title") or "").strip()
+    digest = hashlib.blake2b(ident.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+def dedup_items(items: Iterable[Dict]) -> List[Dict]:
+    """按条目键去重，保留第一次出现的"""
+    seen = set()
+    unique = []
+    for item in items:
+        key = item_key(item)
+        if key not in seen:
+            seen.add(key)
+            unique.append(item)
+    return unique
+
+class FeedStore:
+    """
+    已推送条目的索引
+
+    用法：
+        store = FeedStore(max_age=30 * 86400)
+        new_items = store.add_new(items, feed="home")   # 只返回没见过的条目，并记为已见
+        store.prune()                                   # 清理超过 max_age 的记录
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, max_age: float = 30 * 86400):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS feed_items (
+                key INTEGER PRIMARY KEY,
+                feed TEXT,
+                first_seen REAL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_first_seen ON feed_items(first_seen)")
+        self._db.commit()
+
+    def add_new(self, items: Iterable[Dict], feed: str = "") -> List[Dict]:
+        """记录条目，返回其中首次出现的（保持原顺序，跨源和同批内重复的只返回一次）"""
+        now = time.time()
+        new_items = []
+        with self._lock:
+            for item in items:
+                cursor = self._db.execute(
+                    "INSERT OR IGNORE INTO feed_items VALUES (?, ?, ?)",
+                    (item_key(item), item.get("feed") or feed, now),
+                )
+                if cursor.rowcount:
+                    new_items.append(item)
+            self._db.commit()
+        return new_items
+
+    def seen(self, item: Dict) -> bool:
+        with self._lock:
+            row = self._db.execute("SELECT 1 FROM feed_items WHERE key = ?", (item_key(item),)).fetchone()
+        return row is not None
+
+    def first_seen(self, item: Dict) -> float:
+        """首次出现时间，没见过返回 0"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT first_seen FROM feed_items WHERE key = ?", (item_key(item),)
+            ).fetchone()
+        return row[0] if row else 0.0
+
+    def prune(self, max_age: float = None) -> int:
+        """删除首次出现早于 max_age 秒前的记录，返回删除条数"""
+        cutoff = time.time() - (max_age if max_age is not None else self.max_age)
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM feed_items WHERE first_seen < ?", (cutoff,))
+            self._db.commit()
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM feed_items").fetchone()[0]
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+💾 磁盘 HTTP 响应缓存
+- SQLite 存储，响应体 zlib 压缩
+- 按 LRU 和总字节数淘汰
+- 遵守 Cache-Control / Expires，可按 host 配置默认 TTL
+- 过期后带 If-None-Match / If-Modified-Since 重新验证，304 视为命中
+- 只按 URL 缓存：Vary 依赖 Accept-Encoding 以外请求头的响应不缓存
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "bear-toolbox", "http_cache.sqlite")
+
+# send(url, headers) -> (status_code, response_headers, body)
+Sender = Callable[[str, Dict[str, str]], Tuple[int, Dict[str, str], bytes]]
+
+# 缓存的是已解压的响应体，这些描述传输编码和长度的响应头不能随之保存
+BODY_FRAMING_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+# 缓存只按 URL 存一份，请求头（如轮换的 User-Agent）不同就可能拿到不同内容；
+# Vary 里只有这些请求头时才缓存（响应体已解压，Accept-Encoding 不影响内容）
+VARY_IGNORED = {"accept-encoding"}
+
+class CachedResponse:
+    """缓存返回的响应，接口与 requests.Response 常用部分一致"""
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes, from_cache: bool):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.from_cache = from_cache
+
+    @property
+    def encoding(self) -> str:
+        content_type = _header(self.headers, "Content-Type") or ""
+        for part in content_type.split(";"):
+            key, _, value = part.strip().partition("=")
+            if key.lower() == "charset" and value:
+                return value.strip('"\'')
+        return "utf-8"
+
+    @property
+    def text(self) -> str:
+        try:
+            return self.content.decode(self.encoding, errors="replace")
+        except LookupError:
+            return self.content.decode("utf-8", errors="replace")
+
+def _header(headers: Dict[str, str], name: str) -> Optional[str]:
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+def _cache_control(headers: Dict[str, str]) -> Dict[str, Optional[str]]:
+    directives = {}
+    for part in (_header(headers, "Cache-Control") or "").split(","):
+        key, _, value = part.strip().partition("=")
+        if key:
+            directives[key.lower()] = value.strip('"') or None
+    return directives
+
+class HttpCache:
+    """
+    磁盘 HTTP 缓存
+
+    用法：
+        cache = HttpCache(host_ttls={"www.ft.com": 600})
+        resp = cache.fetch(url, requests_sender(session.get, timeout=15))
+        print(resp.from_cache, resp.text)
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = 200 * 1024 * 1024,
+                 default_ttl: float = 300, host_ttls: Dict[str, float] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.host_ttls = {host.lower(): ttl for host, ttl in (host_ttls or {}).items()}
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                size INTEGER,
+                expires REAL,
+                last_access REAL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON entries(last_access)")
+        self._db.commit()
+
+    def _ttl(self, url: str, headers: Dict[str, str]) -> Optional[float]:
+        """计算新鲜期（秒），None 表示不缓存"""
+        directives = _cache_control(headers)
+        if "no-store" in directives:
+            return None
+        vary = {name.strip().lower() for name in (_header(headers, "Vary") or "").split(",") if name.strip()}
+        if vary - VARY_IGNORED:
+            return None
+        if "no-cache" in directives:
+            return 0
+        for key in ("s-maxage", "max-age"):
+            if (directives.get(key) or "").isdigit():
+                return float(directives[key])
+
+        expires = _header(headers, "Expires")
+        if expires:
+            try:
+                return max(0.0, parsedate_to_datetime(expires).timestamp() - time.time())
+            except (TypeError, ValueError):
+                return 0
+
+        host = urlparse(url).netloc.lower()
+        return self.host_ttls.get(host, self.default_ttl)
+
+    def get(self, url: str) -> Optional[Dict]:
+        """读取缓存条目（不论是否过期），并更新 LRU 时间"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, headers, body, expires FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE entries SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+
+        status, headers, body, expires = row
+        return {
+            "status": status,
+            "headers": json.loads(headers),
+            "body": zlib.decompress(body),
+            "expires": expires,
+        }
+
+    def store(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        """写入缓存，遵守 Cache-Control: no-store；Vary 依赖其他请求头的响应不缓存"""
+        ttl = self._ttl(url, headers)
+        if ttl is None:
+            return
+
+        compressed = zlib.compress(body, 6)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, status, json.dumps(dict(headers)), compressed, len(compressed), now + ttl, now),
+            )
+            self._evict()
+            self._db.commit()
+
+    def revalidated(self, url: str, entry: Dict, headers: Dict[str, str]) -> Dict:
+        """304 后刷新新鲜期，并合并新的校验头"""
+        merged = dict(entry["headers"])
+        for key in ("ETag", "Last-Modified", "Cache-Control", "Expires", "Date"):
+            value = _header(headers, key)
+            if value is not None:
+                merged = {k: v for k, v in merged.items() if k.lower() != key.lower()}
+                merged[key] = value
+
+        ttl = self._ttl(url, merged)
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET headers = ?, expires = ?, last_access = ? WHERE url = ?",
+                (json.dumps(merged), time.time() + (ttl or 0), time.time(), url),
+            )
+            self._db.commit()
+        return dict(entry, headers=merged)
+
+    def _evict(self):
+        """超过字节上限时按 LRU 淘汰（调用方持有锁）"""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self._db.execute(
+            "SELECT url, size FROM entries ORDER BY last_access ASC"
+        ).fetchall():
+            self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    @staticmethod
+    def conditional_headers(entry: Dict) -> Dict[str, str]:
+        """根据缓存条目生成条件请求头"""
+        headers = {}
+        etag = _header(entry["headers"], "ETag")
+        last_modified = _header(entry["headers"], "Last-Modified")
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def fetch(self, url: str, send: Sender, headers: Dict[str, str] = None) -> CachedResponse:
+        """
+        带缓存的 GET
+
+        新鲜条目直接返回；过期条目发条件请求，304 返回缓存内容；
+        其他情况正常下载，200 响应写入缓存
+        """
+        headers = dict(headers or {})
+        entry = self.get(url)
+
+        if entry is not None:
+            if entry["expires"] > time.time():
+                return CachedResponse(url, entry["status"], entry["headers"], entry["body"], True)
+            headers.update(self.conditional_headers(entry))
+
+        status, resp_headers, body = send(url, headers)
+
+        if status == 304 and entry is not None:
+            entry = self.revalidated(url, entry, resp_headers)
+            return CachedResponse(url, entry["status"], entry["headers"], entry["body"], True)
+
+        if status == 200:
+            self.store(url, status, resp_headers, body)
+        return CachedResponse(url, status, resp_headers, body, False)
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+def requests_sender(get: Callable, **kwargs) -> Sender:
+    """把 requests 风格的 get 函数（requests.get / session.get / StealthRequester.get）包装成 Sender"""
+    def send(url: str, headers: Dict[str, str]):
+        response = get(url, headers=headers, **kwargs)
+        # response.content 已按 Content-Encoding 解压
+        resp_headers = {k: v for k, v in response.headers.items() if k.lower() not in BODY_FRAMING_HEADERS}
+        return response.status_code, resp_headers, response.content
+    return send
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def default_cache() -> HttpCache:
+    """进程内共享的默认缓存（~/.cache/bear-toolbox/http_cache.sqlite）"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = HttpCache(host_ttls={"www.ft.com": 600})
+        return _default_cache
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧦 代理池
+- 支持多个 HTTP / SOCKS 代理
+- 后台线程定时探测，记录每个代理的延迟和错误率
+- 按权重把流量分给又快又健康的代理
+- 健康状态查询直接返回缓存结果，不阻塞启动
+- 探测结果和业务请求失败写入共享状态文件，比本地记录新的结果其他进程直接复用
+"""
+
+import json
+import os
+import random
+import socket
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+DEFAULT_PROXIES = [
+    "http://127.0.0.1:7890",
+    "socks5://127.0.0.1:7891",
+]
+
+PROBE_URL = "https://www.google.com/robots.txt"
+
+DEFAULT_STATE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "bear-toolbox", "proxy_health.json")
+
+class ProxyStats:
+    """单个代理的健康统计"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.healthy: Optional[bool] = None  # None = 尚未探测
+        self.latency = 1.0                   # 秒，EWMA；首次测得前用默认值
+        self.latency_measured = False
+        self.error_rate = 0.0                # EWMA
+        self.consecutive_failures = 0
+        self.last_checked = 0.0
+
+    def record(self, ok: bool, latency: float = None, alpha: float = 0.3):
+        self.error_rate = (1 - alpha) * self.error_rate + alpha * (0.0 if ok else 1.0)
+        if ok:
+            self.consecutive_failures = 0
+            if latency is not None:
+                self.latency = (1 - alpha) * self.latency + alpha * latency if self.latency_measured else latency
+                self.latency_measured = True
+        else:
+            self.consecutive_failures += 1
+        self.healthy = ok
+        self.last_checked = time.time()
+
+    @property
+    def weight(self) -> float:
+        return max(1.0 - self.error_rate, 0.01) / max(self.latency, 0.05)
+
+    def load(self, state: Dict):
+        """采用其他进程写入的探测结果"""
+        self.healthy = state["healthy"]
+        self.latency = state["latency"]
+        self.latency_measured = state["healthy"]
+        self.error_rate = state["error_rate"]
+        self.consecutive_failures = state["consecutive_failures"]
+        self.last_checked = state["last_checked"]
+
+    def to_dict(self) -> Dict:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "latency": round(self.latency, 3),
+            "error_rate": round(self.error_rate, 3),
+            "consecutive_failures": self.consecutive_failures,
+            "last_checked": self.last_checked,
+        }
+
+class ProbeCache:
+    """
+    跨进程共享的探测结果
+
+    JSON 状态文件 {代理: 统计}，写入时加文件锁并原子替换。
+    成功结果在 ttl 秒内有效；失败结果只缓存 failure_ttl 秒，
+    既避免反复探测已挂掉的代理，又能尽快发现它恢复。
+    """
+
+    def __init__(self, path: str = DEFAULT_STATE_PATH, ttl: float = 300, failure_ttl: float = 30):
+        self.path = path
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def _read(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def fresh(self, url: str) -> Optional[Dict]:
+        """返回仍在 TTL 内的探测结果，没有则 None"""
+        state = self._read().get(url)
+        if not state:
+            return None
+        ttl = self.ttl if state["healthy"] else self.failure_ttl
+        return state if time.time() - state["last_checked"] < ttl else None
+
+    def save(self, url: str, state: Dict):
+        """合并写入一条探测结果"""
+        with open(self.path + ".lock", "w") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            states = self._read()
+            states[url] = state
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path))
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(states, f)
+            os.replace(tmp, self.path)
+
+class ProxyPool:
+    """
+    代理池
+
+    用法：
+        pool = ProxyPool(["http://127.0.0.1:7890", "socks5://127.0.0.1:7891"])
+        pool.start()                   # 后台定时探测
+        proxy = pool.choose()          # 按权重选一个健康的 HTTP 代理，没有则 None
+        pool.record(proxy, ok=False)   # 业务请求失败时反馈，立即移出轮换
+
+    传入 probe_cache 后，探测和业务请求结果在进程间共享：比本地新、且在一个探测周期内的结果直接采用，不再探测
+    """
+
+    def __init__(self, proxies: List[str] = None, probe_url: str = PROBE_URL,
+                 interval: float = 60, timeout: float = 5, max_failures: int = 3,
+                 probe_cache: ProbeCache = None):
+        self.probe_url = probe_url
+        self.interval = interval
+        self.timeout = timeout
+        self.max_failures = max_failures
+        self.probe_cache = probe_cache
+        self._stats: Dict[str, ProxyStats] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        for url in proxies or DEFAULT_PROXIES:
+            self.add(url)
+
+    def add(self, url: str):
+        with self._lock:
+            self._stats.setdefault(url, ProxyStats(url))
+        self._adopt_shared(url)
+
+    def _adopt_shared(self, url: str, max_age: float = None) -> bool:
+        """
+        采用共享状态文件中仍然有效、且比本地记录新的结果
+
+        本地刚记下的业务失败不会被其他进程更早的"健康"探测覆盖；
+        给出 max_age 时只采用这么多秒内的结果，探测周期不会被拉长到 TTL
+        """
+        state = self.probe_cache.fresh(url) if self.probe_cache else None
+        if state is None:
+            return False
+        if max_age is not None and time.time() - state["last_checked"] >= max_age:
+            return False
+        with self._lock:
+            stats = self._stats.get(url)
+            if stats is None or state["last_checked"] <= stats.last_checked:
+                return False
+            stats.load(state)
+        return True
+
+    def _publish(self, url: str):
+        if self.probe_cache is None:
+            return
+        with self._lock:
+            stats = self._stats.get(url)
+            state = stats.to_dict() if stats else None
+        if state:
+            try:
+                self.probe_cache.save(url, state)
+            except OSError:
+                pass
+
+    def remove(self, url: str):
+        with self._lock:
+            self._stats.pop(url, None)
+
+    def _port_open(self, url: str) -> bool:
+        """TCP 连接检查，本地代理没启动时毫秒级返回"""
+        parsed = urlparse(url)
+        try:
+            with socket.create_connection((parsed.hostname, parsed.port), timeout=0.5):
+                return True
+        except OSError:
+            return False
+
+    def probe(self, url: str) -> bool:
+        """通过代理请求 probe_url，记录延迟和结果"""
+        start = time.monotonic()
+        try:
+            ok = self._port_open(url) and requests.get(
+                self.probe_url,
+                proxies={"http": url, "https": url},
+                timeout=self.timeout
+            ).status_code == 200
+        except Exception:
+            ok = False
+        self.record(url, ok, time.monotonic() - start if ok else None)
+        return ok
+
+    def probe_all(self):
+        """探测所有代理；已判定死亡的代理降低探测频率"""
+        with self._lock:
+            stats = list(self._stats.values())
+        now = time.time()
+        for s in stats:
+            dead = s.consecutive_failures >= self.max_failures
+            if dead and now - s.last_checked < self.interval * 5:
+                continue
+            if self._adopt_shared(s.url, max_age=self.interval):
+                continue
+            self.probe(s.url)
+
+    def record(self, url: str, ok: bool, latency: float = None):
+        """记录一次探测或业务请求的结果，并写入共享状态（其他进程也会立即避开出错的代理）"""
+        with self._lock:
+            stats = self._stats.get(url)
+            if stats is None:
+                return
+            stats.record(ok, latency)
+        self._publish(url)
+
+    def is_healthy(self, url: str) -> bool:
+        """返回缓存的健康状态；从未探测过时只做一次 TCP 连接检查"""
+        with self._lock:
+            stats = self._stats.get(url)
+        if stats is None:
+            return False
+        if stats.healthy is None:
+            if not self._port_open(url):
+                self.record(url, False)
+            else:
+                with self._lock:
+                    stats.healthy = True
+        return bool(stats.healthy)
+
+    def choose(self, socks: bool = False) -> Optional[str]:
+        """按 (1 - 错误率) / 延迟 加权随机选择一个健康代理"""
+        schemes = ("socks5", "socks5h", "socks4") if socks else ("http", "https")
+        with self._lock:
+            candidates = [s for s in self._stats.values() if urlparse(s.url).scheme in schemes]
+        candidates = [s for s in candidates if self.is_healthy(s.url)]
+        if not candidates:
+            return None
+        return random.choices([s.url for s in candidates], weights=[s.weight for s in candidates])[0]
+
+    def stats(self) -> List[Dict]:
+        with self._lock:
+            return [s.to_dict() for s in self._stats.values()]
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.probe_all()
+            self._stop.wait(self.interval)
+
+    def start(self) -> "ProxyPool":
+        """启动后台探测线程（重复调用无副作用）"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="proxy-health", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+def default_pool() -> ProxyPool:
+    """进程内共享的代理池（本地 Clash/Mihomo），首次调用时启动后台探测"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ProxyPool(probe_cache=ProbeCache()).start()
+        return _default_pool
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ 按 host 的令牌桶限速器
+每个站点一个令牌桶，不同站点互不等待，同一站点遵守各自的抓取预算
+线程和 asyncio 中都可以使用
+"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+class TokenBucket:
+    """
+    令牌桶
+
+    参数：
+    - rate: 每秒补充的令牌数，None 表示不限速
+    - burst: 桶容量，允许的突发请求数
+    - jitter: 需要等待时额外增加的随机秒数上限，避免请求节奏过于规律
+    """
+
+    def __init__(self, rate: Optional[float] = 1.0, burst: int = 1, jitter: float = 0.0):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.jitter = jitter
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """预占一个令牌，返回调用方需要等待的秒数"""
+        if not self.rate:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            # 令牌可以透支，后来者排在前面的预约之后
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        if wait > 0 and self.jitter:
+            wait += random.uniform(0, self.jitter)
+        return wait
+
+    def acquire(self):
+        """阻塞直到拿到令牌（线程中使用）"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """等待直到拿到令牌（asyncio 中使用）"""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+class HostRateLimiter:
+    """
+    按 host 分桶的限速器
+
+    用法：
+        limiter = HostRateLimiter(rate=1.0, burst=2, jitter=0.5)
+        limiter.set_limit("api.search.brave.com", rate=1.0, burst=1)
+        limiter.acquire("https://example.com/page")       # 线程
+        await limiter.acquire_async("https://example.com") # asyncio
+    """
+
+    def __init__(self, rate: Optional[float] = 1.0, burst: int = 1, jitter: float = 0.0):
+        self.default = {"rate": rate, "burst": burst, "jitter": jitter}
+        self.host_limits: Dict[str, Dict] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_delay(cls, delay: tuple) -> "HostRateLimiter":
+        """由 StealthRequester 风格的 (min_delay, max_delay) 构造"""
+        min_delay, max_delay = delay
+        rate = 1.0 / min_delay if min_delay > 0 else None
+        return cls(rate=rate, burst=1, jitter=max(0.0, max_delay - min_delay))
+
+    @staticmethod
+    def host_of(url_or_host: str) -> str:
+        if "://" in url_or_host:
+            return urlparse(url_or_host).netloc.lower()
+        return url_or_host.lower()
+
+    def set_limit(self, host: str, rate: Optional[float], burst: int = 1, jitter: float = 0.0):
+        """为单个 host 设置独立的速率（覆盖默认值）"""
+        host = self.host_of(host)
+        with self._lock:
+            self.host_limits[host] = {"rate": rate, "burst": burst, "jitter": jitter}
+            self._buckets.pop(host, None)
+
+    def bucket(self, url_or_host: str) -> TokenBucket:
+        host = self.host_of(url_or_host)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(**self.host_limits.get(host, self.default))
+                self._buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url_or_host: str):
+        """阻塞直到该 host 允许发出下一个请求"""
+        self.bucket(url_or_host).acquire()
+
+    async def acquire_async(self, url_or_host: str):
+        """asyncio 版本的 acquire"""
+        await self.bucket(url_or_host).acquire_async()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔁 重试与熔断
+- 指数退避 + full jitter
+- 429/503 遵守 Retry-After
+- 按 host 的重试预算，重试量不超过正常请求的一定比例
+- 按 host 的熔断器，站点持续失败时直接快速失败
+- 非幂等请求（POST 等）默认不重试，调用方确认可以重放时再打开
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE")
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """熔断中，请求未发出"""
+
+def retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """解析 Retry-After（秒数或 HTTP 日期）"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class RetryPolicy:
+    """退避策略：第 n 次重试等待 uniform(0, min(max_delay, base_delay * 2^n))"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 30,
+                 retry_statuses: tuple = RETRY_STATUSES, retry_exceptions: tuple = RETRY_EXCEPTIONS):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = retry_statuses
+        self.retry_exceptions = retry_exceptions
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+class RetryBudget:
+    """
+    重试预算：每个正常请求存入 ratio 个令牌，每次重试取出 1 个
+    上游大面积故障时重试量最多放大到 (1 + ratio) 倍，不会雪崩
+    """
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 10):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+class CircuitBreaker:
+    """
+    熔断器
+    - closed: 正常放行，连续失败 failure_threshold 次后打开
+    - open: 直接拒绝，reset_timeout 秒后进入 half-open
+    - half-open: 放行一个探测请求，成功则关闭，失败则重新打开
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            # half-open 的探测请求迟迟没有结果时，超时后再放行一个
+            if self.state != "closed" and now - self.opened_at >= self.reset_timeout:
+                self.state = "half-open"
+                self.opened_at = now
+                return True
+            return self.state == "closed"
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half-open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+class RetryEngine:
+    """
+    重试引擎 - 所有 HTTP 调用共用，熔断器和重试预算按 host 区分
+
+    用法：
+        engine = default_engine()
+        response = engine.get(url, params=params, timeout=15)
+        response = engine.call(url, lambda: session.post(url, json=payload))
+        response = engine.post(url, json=payload, retry_unsafe=True)   # 确认重放无副作用才重试 POST
+    """
+
+    def __init__(self, policy: RetryPolicy = None, failure_threshold: int = 5,
+                 reset_timeout: float = 30, retry_ratio: float = 0.2):
+        self.policy = policy or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.retry_ratio = retry_ratio
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._budgets: Dict[str, RetryBudget] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self._breakers[host]
+
+    def budget(self, host: str) -> RetryBudget:
+        with self._lock:
+            if host not in self._budgets:
+                self._budgets[host] = RetryBudget(self.retry_ratio)
+            return self._budgets[host]
+
+    def max_attempts(self, method: str, retry_unsafe: bool = False) -> int:
+        """非幂等方法只发一次，除非 retry_unsafe=True"""
+        if retry_unsafe or method.upper() in IDEMPOTENT_METHODS:
+            return self.policy.max_attempts
+        return 1
+
+    def call(self, url: str, send: Callable[[], requests.Response],
+             max_attempts: int = None) -> requests.Response:
+        """
+        执行 send()，按策略重试
+
+        网络错误重试用尽后抛出最后一次异常；可重试状态码用尽后返回最后一次响应；
+        熔断打开时抛出 CircuitOpenError。max_attempts 默认取 policy.max_attempts
+        """
+        host = urlparse(url).netloc.lower()
+        breaker = self.breaker(host)
+        budget = self.budget(host)
+        policy = self.policy
+        max_attempts = max_attempts or policy.max_attempts
+
+        if not breaker.allow():
+            raise CircuitOpenError(f"{host} 熔断中，{self.reset_timeout:.0f}s 内快速失败")
+        budget.deposit()
+
+        attempt = 0
+        while True:
+            last_attempt = attempt + 1 >= max_attempts
+            try:
+                response = send()
+            except policy.retry_exceptions:
+                breaker.record_failure()
+                if last_attempt or not breaker.allow() or not budget.withdraw():
+                    raise
+                delay = policy.backoff(attempt)
+            else:
+                if response.status_code not in policy.retry_statuses:
+                    breaker.record_success()
+                    return response
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                if last_attempt or not breaker.allow() or not budget.withdraw():
+                    return response
+                delay = retry_after_seconds(response)
+                if delay is None:
+                    delay = policy.backoff(attempt)
+                elif delay > policy.max_delay:
+                    # 服务端要求等太久，交给调用方处理
+                    return response
+                response.close()
+
+            time.sleep(delay)
+            attempt += 1
+
+    def request(self, method: str, url: str, session=None, limiter=None,
+                on_response: Callable[[requests.Response], None] = None,
+                retry_unsafe: bool = False, **kwargs) -> requests.Response:
+        """
+        带重试的 requests 调用，session 默认用 requests 模块
+
+        limiter: 每次尝试前 limiter.acquire(url)，重试同样受限速
+        on_response: 每次尝试拿到响应后回调（如按次计入 API 配额）
+        retry_unsafe: 非幂等方法（POST 等）默认只发一次，True 时才按策略重试
+        """
+        http = session or requests
+
+        def send():
+            if limiter is not None:
+                limiter.acquire(url)
+            response = http.request(method, url, **kwargs)
+            if on_response is not None:
+                on_response(response)
+            return response
+
+        return self.call(url, send, self.max_attempts(method, retry_unsafe))
+
+    def get(self, url: str, session=None, **kwargs) -> requests.Response:
+        return self.request("GET", url, session, **kwargs)
+
+    def post(self, url: str, session=None, **kwargs) -> requests.Response:
+        return self.request("POST", url, session, **kwargs)
+
+_default_engine = None
+_default_engine_lock = threading.Lock()
+
+def default_engine() -> RetryEngine:
+    """进程内共享的重试引擎，同一 host 的熔断状态对所有调用方可见"""
+    global _default_engine
+    with _default_engine_lock:
+        if _default_engine is None:
+            _default_engine = RetryEngine()
+        return _default_engine
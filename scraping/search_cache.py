@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🗂️ 搜索结果缓存与配额跟踪
+- 内存 LRU + SQLite 持久化，跨会话复用同样的查询
+- TTL 过期；淘汰时优先丢弃免费引擎的结果，付费结果留得更久
+- 记录付费引擎的用量，快用完时优先走缓存和免费引擎
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".cache", "bear-toolbox", "search_cache.sqlite")
+
+# 引擎配额：(额度, 周期)  周期为 "month" 按自然月重置，"total" 为一次性额度
+QUOTAS = {
+    "brave": (2000, "month"),
+    "serper": (2500, "total"),
+}
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+def _connect(path: str) -> sqlite3.Connection:
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    return sqlite3.connect(path, timeout=10, check_same_thread=False)
+
+class SearchCache:
+    """
+    搜索结果缓存
+
+    用法：
+        cache = SearchCache(ttl=6 * 3600)
+        results = cache.get("brave", "gold price", 10, "zh")
+        if results is None:
+            results = engine.search(...)
+            cache.put("brave", "gold price", 10, "zh", results)
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, ttl: float = 6 * 3600,
+                 memory_items: int = 256, max_rows: int = 20000, quotas: Dict = QUOTAS):
+        self.ttl = ttl
+        self.memory_items = memory_items
+        self.max_rows = max_rows
+        self.paid_engines = set(quotas)
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[Tuple, Tuple[float, List[Dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = _connect(path)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS search_cache (
+                engine TEXT,
+                query TEXT,
+                count INTEGER,
+                lang TEXT,
+                results TEXT,
+                expires REAL,
+                last_access REAL,
+                paid INTEGER,
+                PRIMARY KEY (engine, query, count, lang)
+            )
+        """)
+        self._db.commit()
+
+    def _key(self, engine: str, query: str, count: int, lang: str) -> Tuple:
+        return (engine, normalize_query(query), count, lang or "")
+
+    def get(self, engine: str, query: str, count: int, lang: str = "",
+            allow_stale: bool = False) -> Optional[List[Dict]]:
+        """命中返回结果列表，未命中或已过期返回 None；allow_stale=True 时已过期的结果也返回"""
+        key = self._key(engine, query, count, lang)
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is None:
+                row = self._db.execute(
+                    "SELECT expires, results FROM search_cache "
+                    "WHERE engine = ? AND query = ? AND count = ? AND lang = ?", key
+                ).fetchone()
+                if row is not None:
+                    cached = (row[0], json.loads(row[1]))
+                    self._remember(key, cached)
+                    self._db.execute(
+                        "UPDATE search_cache SET last_access = ? "
+                        "WHERE engine = ? AND query = ? AND count = ? AND lang = ?", (now,) + key
+                    )
+                    self._db.commit()
+            else:
+                self._memory.move_to_end(key)
+
+            if cached is None or (cached[0] <= now and not allow_stale):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return cached[1]
+
+    def put(self, engine: str, query: str, count: int, lang: str, results: List[Dict]):
+        key = self._key(engine, query, count, lang)
+        now = time.time()
+        with self._lock:
+            self._remember(key, (now + self.ttl, results))
+            self._db.execute(
+                "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                key + (json.dumps(results, ensure_ascii=False), now + self.ttl, now,
+                       int(engine in self.paid_engines)),
+            )
+            self._evict(now)
+            self._db.commit()
+
+    def _remember(self, key: Tuple, value: Tuple):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now: float):
+        """超过行数上限时淘汰：先过期的，再免费引擎的，最后按 LRU（调用方持有锁）"""
+        rows = self._db.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        if rows <= self.max_rows:
+            return
+        self._db.execute("DELETE FROM search_cache WHERE expires <= ?", (now,))
+        self._db.execute("""
+            DELETE FROM search_cache WHERE rowid IN (
+                SELECT rowid FROM search_cache ORDER BY paid ASC, last_access ASC
+                LIMIT MAX(0, (SELECT COUNT(*) FROM search_cache) - ?)
+            )
+        """, (self.max_rows,))
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "memory_items": len(self._memory),
+        }
+
+class QuotaTracker:
+    """
+    付费引擎用量跟踪
+
+    用法：
+        quota = QuotaTracker()
+        if not quota.nearly_exhausted("brave"):
+            ...  # 调用 API
+            quota.record("brave")
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, quotas: Dict = QUOTAS, threshold: float = 0.9):
+        self.quotas = quotas
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._db = _connect(path)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS quota_usage (
+                engine TEXT,
+                period TEXT,
+                used INTEGER,
+                PRIMARY KEY (engine, period)
+            )
+        """)
+        self._db.commit()
+
+    def _period(self, engine: str) -> str:
+        _, period = self.quotas[engine]
+        return datetime.now().strftime("%Y-%m") if period == "month" else "total"
+
+    def record(self, engine: str, queries: int = 1):
+        if engine not in self.quotas:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO quota_usage VALUES (?, ?, ?) "
+                "ON CONFLICT(engine, period) DO UPDATE SET used = used + excluded.used",
+                (engine, self._period(engine), queries),
+            )
+            self._db.commit()
+
+    def used(self, engine: str) -> int:
+        if engine not in self.quotas:
+            return 0
+        with self._lock:
+            row = self._db.execute(
+                "SELECT used FROM quota_usage WHERE engine = ? AND period = ?",
+                (engine, self._period(engine)),
+            ).fetchone()
+        return row[0] if row else 0
+
+    def remaining(self, engine: str) -> Optional[int]:
+        """剩余额度，免费引擎返回 None"""
+        if engine not in self.quotas:
+            return None
+        return max(0, self.quotas[engine][0] - self.used(engine))
+
+    def nearly_exhausted(self, engine: str) -> bool:
+        if engine not in self.quotas:
+            return False
+        return self.used(engine) >= self.quotas[engine][0] * self.threshold
@@ -6,14 +6,26 @@
 """
 
 import requests
+import heapq
 import json
-from typing import List, Dict, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
+from typing import List, Dict, Optional, Iterator, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 import os
 import sys
 
 # 添加路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from anti_spider_tools import get_random_headers
+from rate_limiter import HostRateLimiter
+from http_cache import HttpCache, default_cache
+from retry import default_engine
+from search_cache import SearchCache, QuotaTracker
+from session_pool import default_sessions
+from content_extract import extract_article, DEFAULT_MAX_BYTES
+from body_stream import BodyStream, CHUNK_SIZE, DEFAULT_ALLOWED_TYPES, sniff_charset
 
 # 代理设置
 PROXIES = {
@@ -21,6 +33,34 @@ PROXIES = {
     "https": "http://127.0.0.1:7890",
 }
 
+# 限速设置 - 所有引擎和 WebFetch 共用，按 host 分桶
+RATE_LIMITER = HostRateLimiter(rate=2.0, burst=2, jitter=0.3)
+RATE_LIMITER.set_limit("api.search.brave.com", rate=1.0, burst=1)  # 免费档 1 QPS
+RATE_LIMITER.set_limit("google.serper.dev", rate=5.0, burst=5)
+
+# 重试/熔断 - 进程内共享
+RETRY = default_engine()
+
+# 连接池 - 所有引擎和 WebFetch 共用 keep-alive 连接，每个 host 连接数有上限
+SESSIONS = default_sessions()
+SESSIONS.set_limit("https://api.search.brave.com", maxsize=2)
+SESSIONS.set_limit("https://google.serper.dev", maxsize=5)
+SESSION = SESSIONS.session("search")
+
+# 截断的响应体写入缓存时带上这个头，并去掉 ETag/Last-Modified，过期后重新完整下载
+TRUNCATED_HEADER = "X-Body-Truncated"
+
+def quota_counter(quota: Optional[QuotaTracker], name: str):
+    """每次尝试拿到 2xx 响应都计入配额（重试各算一次），quota 为 None 时不计"""
+    if quota is None:
+        return None
+    
+    def count(response: requests.Response):
+        if response.ok:
+            quota.record(name)
+    
+    return count
+
 class BraveSearch:
     """
     Brave Search API (推荐)
@@ -29,10 +69,13 @@ class BraveSearch:
     注册: https://api.search.brave.com/
     """
     
+    NAME = "brave"
     API_URL = "https://api.search.brave.com/res/v1/web/search"
+    LANG = "zh"
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, quota: QuotaTracker = None):
         self.api_key = api_key or os.getenv("BRAVE_API_KEY")
+        self.quota = quota
     
     def search(self, query: str, count: int = 10) -> List[Dict]:
         """搜索"""
@@ -49,16 +92,19 @@ class BraveSearch:
         params = {
             "q": query,
             "count": min(count, 20),
-            "search_lang": "zh",
+            "search_lang": self.LANG,
         }
         
         try:
-            response = requests.get(
+            response = RETRY.get(
                 self.API_URL,
                 headers=headers,
                 params=params,
                 proxies=PROXIES,
-                timeout=15
+                timeout=15,
+                session=SESSION,
+                limiter=RATE_LIMITER,
+                on_response=quota_counter(self.quota, self.NAME)
             )
             
             if response.status_code == 200:
@@ -87,10 +133,13 @@ class SerperSearch:
     注册: https://serper.dev/
     """
     
+    NAME = "serper"
     API_URL = "https://google.serper.dev/search"
+    LANG = ""
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, quota: QuotaTracker = None):
         self.api_key = api_key or os.getenv("SERPER_API_KEY")
+        self.quota = quota
     
     def search(self, query: str, count: int = 10) -> List[Dict]:
         """搜索"""
@@ -108,12 +157,17 @@ class SerperSearch:
         }
         
         try:
-            response = requests.post(
+            # 搜索请求重放没有副作用，允许重试 POST
+            response = RETRY.post(
                 self.API_URL,
                 headers=headers,
                 json=payload,
                 proxies=PROXIES,
-                timeout=15
+                timeout=15,
+                session=SESSION,
+                limiter=RATE_LIMITER,
+                on_response=quota_counter(self.quota, self.NAME),
+                retry_unsafe=True
             )
             
             if response.status_code == 200:
@@ -138,7 +192,9 @@ class WikipediaSearch:
     Wikipedia API - 无需 Key，知识查询
     """
     
+    NAME = "wikipedia"
     API_URL = "https://zh.wikipedia.org/w/api.php"
+    LANG = "zh"
     
     def search(self, query: str, count: int = 10) -> List[Dict]:
         """搜索 Wikipedia"""
@@ -155,12 +211,14 @@ class WikipediaSearch:
         }
         
         try:
-            response = requests.get(
+            response = RETRY.get(
                 self.API_URL,
                 params=params,
                 headers=headers,
                 proxies=PROXIES,
-                timeout=15
+                timeout=15,
+                session=SESSION,
+                limiter=RATE_LIMITER
             )
             
             if response.status_code == 200:
@@ -183,70 +241,264 @@ class WikipediaSearch:
 class WebFetch:
     """
     网页内容抓取（带反爬伪装）
+    默认使用磁盘缓存，过期后发条件请求，内容未变时不重复下载
+    响应体流式读取：Content-Type 不在白名单时直接放弃，超过 max_bytes 的部分不下载
     """
     
-    def fetch(self, url: str) -> Optional[str]:
-        """抓取网页内容"""
+    def __init__(self, use_cache: bool = True, cache: HttpCache = None,
+                 max_bytes: int = 5 * 1024 * 1024, allowed_types: tuple = DEFAULT_ALLOWED_TYPES):
+        self.cache = (cache or default_cache()) if use_cache else None
+        self.max_bytes = max_bytes
+        self.allowed_types = allowed_types
+    
+    def _get(self, url: str, headers: Dict, **kwargs) -> requests.Response:
+        return RETRY.get(url, session=SESSION, limiter=RATE_LIMITER, headers=headers, **kwargs)
+    
+    def open(self, url: str, headers: Dict = None, max_bytes: int = None,
+             truncate: bool = False) -> BodyStream:
+        """
+        不经缓存的限长流式下载，返回 BodyStream（.read() 字节 / .text() 文本 / 文件对象）
+        headers 会合并到默认的伪装请求头上
+        
+        Raises:
+            ContentTypeRejected / BodyTooLarge（truncate=False 时）
+        """
+        request_headers = get_random_headers()
+        request_headers["Accept"] = "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8"
+        request_headers.update(headers or {})
+        
+        response = self._get(url, request_headers, proxies=PROXIES, timeout=20, allow_redirects=True, stream=True)
+        return BodyStream(response, max_bytes or self.max_bytes, self.allowed_types, truncate)
+    
+    def _send(self, url: str, headers: Dict):
+        """
+        缓存用的 Sender：流式读取，超长页面截断到 max_bytes
+        截断的内容不带校验头入缓存，304 不会让不完整的页面一直有效
+        """
+        body = self.open(url, headers, truncate=True)
+        with body:
+            content = body.read()
+            resp_headers = dict(body.headers)
+            if body.truncated:
+                resp_headers = {k: v for k, v in resp_headers.items()
+                                if k.lower() not in ("etag", "last-modified")}
+                resp_headers[TRUNCATED_HEADER] = "1"
+            return body.status_code, resp_headers, content
+    
+    def _download(self, url: str) -> Optional[Tuple[Dict, bytes, bool]]:
+        """下载页面（经过缓存），返回 (响应头, 响应体, 是否截断)；非 200 或出错时返回 None"""
         try:
-            headers = get_random_headers()
-            headers["Accept"] = "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8"
-            
-            response = requests.get(
-                url,
-                headers=headers,
-                proxies=PROXIES,
-                timeout=20,
-                allow_redirects=True
-            )
+            if self.cache is not None:
+                response = self.cache.fetch(url, self._send)
+                status, headers, content = response.status_code, response.headers, response.content
+                truncated = any(k.lower() == TRUNCATED_HEADER.lower() for k in headers)
+            else:
+                with self.open(url, truncate=True) as body:
+                    status, headers, content = body.status_code, body.headers, body.read()
+                    truncated = body.truncated
             
-            if response.status_code == 200:
-                return response.text
+            if status == 200:
+                return headers, content, truncated
             else:
-                print(f"⚠️ HTTP {response.status_code}")
+                print(f"⚠️ HTTP {status}")
                 return None
                 
         except Exception as e:
             print(f"❌ 抓取失败: {e}")
             return None
+    
+    def fetch(self, url: str) -> Optional[str]:
+        """抓取网页内容（原始 HTML）"""
+        downloaded = self._download(url)
+        if downloaded is None:
+            return None
+        headers, content, _ = downloaded
+        return content.decode(sniff_charset(headers, content[:CHUNK_SIZE]), errors="replace")
+    
+    def extract(self, url: str, max_bytes: int = DEFAULT_MAX_BYTES) -> Optional[Dict]:
+        """
+        抓取并提取正文
+        
+        Returns:
+            {"url", "canonical_url", "title", "published", "text", "links", "truncated", "bytes"}
+            下载时被截断（包括缓存中截断过的页面）truncated 也为 True
+        """
+        downloaded = self._download(url)
+        if downloaded is None:
+            return None
+        headers, content, truncated = downloaded
+        chunks = (content[i:i + CHUNK_SIZE] for i in range(0, len(content), CHUNK_SIZE))
+        article = extract_article(chunks, url, sniff_charset(headers, content[:CHUNK_SIZE]), max_bytes)
+        article["truncated"] = article["truncated"] or truncated
+        return article
+
+# ============ 结果合并 ============
+
+# 不影响页面内容的跟踪参数
+TRACKING_PARAMS = {
+    "gclid", "fbclid", "msclkid", "yclid", "dclid", "mc_cid", "mc_eid",
+    "spm", "ref", "ref_src", "igshid", "_ga", "_hsenc", "_hsmi",
+}
+
+def normalize_url(url: str) -> str:
+    """
+    URL 归一化，用于去重
+    - http/https 视为相同，host 小写并去掉 www. 和默认端口
+    - 去掉末尾斜杠、fragment 和跟踪参数（utm_* 等），其余参数排序
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit(("https", host, parts.path.rstrip("/"), urlencode(query), ""))
+
+def merge_results(results: Dict[str, List[Dict]], k: int = 60) -> Iterator[Dict]:
+    """
+    合并多个引擎的结果：按归一化 URL 去重，用 Reciprocal Rank Fusion 排序
+    
+    score(url) = Σ 1 / (k + 该引擎中的排名)
+    
+    Yields:
+        按得分从高到低的结果，附加 score 和 engines 字段；惰性产出，只取前几条时不做全排序
+    """
+    index: Dict[str, Dict] = {}
+    for engine, items in results.items():
+        for rank, item in enumerate(items, 1):
+            key = normalize_url(item["url"])
+            merged = index.get(key)
+            if merged is None:
+                merged = index[key] = dict(item, score=0.0, engines=[])
+            elif not merged.get("description") and item.get("description"):
+                merged["description"] = item["description"]
+            merged["score"] += 1.0 / (k + rank)
+            merged["engines"].append(engine)
+    
+    heap = [(-item["score"], order, item) for order, item in enumerate(index.values())]
+    heapq.heapify(heap)
+    while heap:
+        yield heapq.heappop(heap)[2]
 
 class UnifiedSearch:
     """
     统一搜索接口 - 自动选择可用的搜索源
+    所有引擎并发查询，可设置总截止时间
+    结果先查缓存；付费引擎配额快用完时只用缓存（过期的结果也用），不再消耗额度
+    付费引擎每次尝试（含重试）拿到 2xx 响应都计入配额
+    first / first_n 模式提前返回后，还没发出请求的付费引擎直接跳过
     """
     
-    def __init__(self):
+    MODES = ("all", "first", "first_n")
+    
+    def __init__(self, cache: SearchCache = None, quota: QuotaTracker = None):
+        self.cache = cache or SearchCache()
+        self.quota = quota or QuotaTracker()
         self.engines = {
-            "brave": BraveSearch(),
-            "serper": SerperSearch(),
+            "brave": BraveSearch(quota=self.quota),
+            "serper": SerperSearch(quota=self.quota),
             "wikipedia": WikipediaSearch(),
         }
         self.fetcher = WebFetch()
+        # 截止时间到了不会等慢引擎，留出余量给上一轮还没返回的请求
+        self._executor = ThreadPoolExecutor(max_workers=len(self.engines) * 4)
     
-    def search(self, query: str, count: int = 10) -> Dict[str, List[Dict]]:
+    def _timed_search(self, name: str, engine, query: str, count: int, finished: threading.Event):
+        start = time.monotonic()
+        results = self.cache.get(name, query, count, engine.LANG)
+        if results is None:
+            if finished.is_set() and name in self.quota.quotas:
+                # 本次搜索已经返回，不再为没人要的结果花配额
+                results = []
+            elif self.quota.nearly_exhausted(name):
+                print(f"💸 {name}: 配额剩余 {self.quota.remaining(name)}，仅使用缓存")
+                results = self.cache.get(name, query, count, engine.LANG, allow_stale=True) or []
+            else:
+                results = engine.search(query, count)
+                if results:
+                    self.cache.put(name, query, count, engine.LANG, results)
+        return results, time.monotonic() - start
+    
+    def search(self, query: str, count: int = 10, mode: str = "all",
+               deadline: float = None) -> Dict[str, List[Dict]]:
         """
-        使用所有可用引擎搜索
+        并发使用所有可用引擎搜索
+        
+        Args:
+            mode: "all" 等所有引擎；"first" 第一个非空结果即返回；
+                  "first_n" 累计结果达到 count 条即返回
+            deadline: 总截止时间（秒），到点返回已有结果，未完成的引擎被跳过
         
         Returns:
-            {引擎名: 结果列表}
+            {引擎名: 结果列表}；需要各引擎耗时用 search_timed
         """
+        return self.search_timed(query, count, mode, deadline)[0]
+    
+    def search_timed(self, query: str, count: int = 10, mode: str = "all",
+                     deadline: float = None) -> Tuple[Dict[str, List[Dict]], Dict[str, Optional[float]]]:
+        """
+        同 search，另外返回本次调用各引擎的耗时
+        
+        Returns:
+            ({引擎名: 结果列表}, {引擎名: 耗时秒数，超时或被跳过为 None})
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"mode 必须是 {self.MODES} 之一")
+        
         results = {}
+        latencies: Dict[str, Optional[float]] = {name: None for name in self.engines}
+        finished = threading.Event()
+        futures = {
+            self._executor.submit(self._timed_search, name, engine, query, count, finished): name
+            for name, engine in self.engines.items()
+        }
         
-        for name, engine in self.engines.items():
-            try:
-                r = engine.search(query, count)
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                name = futures[future]
+                try:
+                    r, elapsed = future.result()
+                except Exception as e:
+                    print(f"❌ {name}: {e}")
+                    continue
+                
+                latencies[name] = elapsed
                 if r:
                     results[name] = r
-                    print(f"✅ {name}: {len(r)} 条结果")
+                    print(f"✅ {name}: {len(r)} 条结果 ({elapsed:.2f}s)")
                 else:
-                    print(f"⚠️ {name}: 无结果")
-            except Exception as e:
-                print(f"❌ {name}: {e}")
+                    print(f"⚠️ {name}: 无结果 ({elapsed:.2f}s)")
+                
+                if mode == "first" and results:
+                    break
+                if mode == "first_n" and sum(len(v) for v in results.values()) >= count:
+                    break
+        except FutureTimeoutError:
+            for future, name in futures.items():
+                if not future.done():
+                    print(f"⏱️ {name}: 超过 {deadline}s 截止时间，已跳过")
+        finally:
+            # 提前返回时取消还在排队的引擎；已开始的付费引擎查完缓存后也不再请求
+            finished.set()
+            if mode != "all":
+                for future in futures:
+                    future.cancel()
         
-        return results
+        return results, latencies
+    
+    def merged_search(self, query: str, count: int = 10, **kwargs) -> Iterator[Dict]:
+        """搜索并合并去重，参数同 search，返回按 RRF 得分排序的惰性结果流"""
+        return merge_results(self.search(query, count, **kwargs))
     
     def fetch_article(self, url: str) -> Optional[str]:
-        """抓取文章内容"""
-        return self.fetcher.fetch(url)
+        """抓取文章正文；需要标题 / 发布时间 / canonical URL / 链接时用 self.fetcher.extract(url)"""
+        article = self.fetcher.extract(url)
+        return article["text"] if article else None
 
 
 def demo():
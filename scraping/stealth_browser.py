@@ -13,7 +13,12 @@ import asyncio
 from playwright.async_api import async_playwright, Page, Browser, BrowserContext
 from typing import Optional, Dict, Any
 import json
+import os
 import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from proxy_pool import default_pool
 
 class StealthBrowser:
     """
@@ -75,14 +80,11 @@ class StealthBrowser:
         
         # 添加代理（系统已配置）
         if self.use_proxy:
-            # 检查代理是否可用
-            try:
-                import requests
-                requests.get("https://www.google.com/robots.txt", 
-                           proxies={"http": "http://127.0.0.1:7890", "https": "http://127.0.0.1:7890"},
-                           timeout=5)
-                context_options["proxy"] = {"server": "http://127.0.0.1:7890"}
-            except:
+            # 代理池后台探测，这里直接读取缓存的健康状态
+            proxy = default_pool().choose()
+            if proxy:
+                context_options["proxy"] = {"server": proxy}
+            else:
                 print("⚠️ 代理不可用，使用直连模式")
         
         self.context = await self.browser.new_context(**context_options)
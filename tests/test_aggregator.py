@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧮 多数据源聚合测试（离线，假数据源）
+"""
+
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "finance"))
+
+import aggregator
+from aggregator import QuoteAggregator
+from quotes import make_quote
+
+INSTRUMENTS = {"gold": ("eastmoney:101.GC00Y", "yahoo:GC=F", "sina:fx_sxau")}
+
+class FakeProvider:
+    """按代码返回预设价格；delay 秒后返回，给出 gate 时等 gate 打开才返回"""
+
+    def __init__(self, name, prices, delay=0.0, gate=None):
+        self.name = name
+        self.prices = prices
+        self.delay = delay
+        self.gate = gate
+        self.calls = 0
+
+    def fetch(self, codes, timeout=10):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.gate is not None:
+            self.gate.wait(5)
+        return {code: make_quote(self.name, code, price=self.prices[code]) for code in codes if code in self.prices}
+
+@contextmanager
+def no_store():
+    """聚合结果不写本地行情库"""
+    saved = aggregator.record_quotes
+    aggregator.record_quotes = lambda quotes: 0
+    try:
+        yield
+    finally:
+        aggregator.record_quotes = saved
+
+def make(providers, **kwargs):
+    """只用给出的假数据源对应的代码"""
+    providers = {p.name: p for p in providers}
+    instruments = {
+        name: tuple(s for s in symbols if s.partition(":")[0] in providers)
+        for name, symbols in INSTRUMENTS.items()
+    }
+    return QuoteAggregator(instruments, providers=providers, **kwargs)
+
+def test_fastest_not_blocked_by_stalled_source():
+    gate = threading.Event()
+    stalled = FakeProvider("eastmoney", {"101.GC00Y": 2650.0}, gate=gate)
+    fast = FakeProvider("yahoo", {"GC=F": 2651.0})
+    slow = FakeProvider("sina", {"fx_sxau": 2652.0}, delay=0.2)
+    try:
+        with no_store():
+            agg = make([stalled, fast, slow], deadline=2)
+            start = time.monotonic()
+            result = agg.fastest(["gold"])
+            assert time.monotonic() - start < 0.5
+            assert result["gold"]["sources"] == ["yahoo:GC=F"]
+    finally:
+        gate.set()
+
+def test_stalled_source_not_resubmitted():
+    """上一次请求还卡着时，同一个数据源不再占用新的线程"""
+    gate = threading.Event()
+    stalled = FakeProvider("eastmoney", {"101.GC00Y": 2650.0}, gate=gate)
+    fast = FakeProvider("yahoo", {"GC=F": 2651.0})
+    try:
+        with no_store():
+            agg = make([stalled, fast], deadline=0.2)
+            for _ in range(5):
+                assert agg.fastest(["gold"])["gold"]["price"] == 2651.0
+            assert stalled.calls == 1
+            assert fast.calls == 5
+    finally:
+        gate.set()
+
+    # 卡住的请求返回后恢复正常提交
+    time.sleep(0.1)
+    with no_store():
+        agg.consensus(["gold"])
+    assert stalled.calls == 2
+
+def test_consensus_rejects_outlier():
+    providers = [
+        FakeProvider("eastmoney", {"101.GC00Y": 2650.0}),
+        FakeProvider("yahoo", {"GC=F": 2652.0}),
+        FakeProvider("sina", {"fx_sxau": 2900.0}),
+    ]
+    with no_store():
+        result = make(providers, deadline=2).consensus(["GC00Y"])
+    quote = result["gold"]
+    assert quote["price"] == 2651.0
+    assert sorted(quote["sources"]) == ["eastmoney:101.GC00Y", "yahoo:GC=F"]
+    assert quote["rejected"] == ["sina:fx_sxau"]
+
+def test_quorum_counts_agreeing_quotes():
+    """先到的两个报价互相不一致时不算够数，要等第三个一致的报价"""
+    providers = [
+        FakeProvider("eastmoney", {"101.GC00Y": 2650.0}),
+        FakeProvider("yahoo", {"GC=F": 2900.0}),
+        FakeProvider("sina", {"fx_sxau": 2651.0}, delay=0.3),
+    ]
+    with no_store():
+        result = make(providers, deadline=2).consensus(["gold"], quorum=2)
+    quote = result["gold"]
+    assert sorted(quote["sources"]) == ["eastmoney:101.GC00Y", "sina:fx_sxau"]
+    assert quote["rejected"] == ["yahoo:GC=F"]
+
+    # 已经有两个一致的报价就提前返回，不等慢的源
+    providers = [
+        FakeProvider("eastmoney", {"101.GC00Y": 2650.0}),
+        FakeProvider("yahoo", {"GC=F": 2651.0}),
+        FakeProvider("sina", {"fx_sxau": 2652.0}, delay=1.0),
+    ]
+    with no_store():
+        start = time.monotonic()
+        result = make(providers, deadline=2).consensus(["gold"], quorum=2)
+        assert time.monotonic() - start < 0.5
+    assert result["gold"]["price"] == 2650.5
+
+if __name__ == "__main__":
+    test_fastest_not_blocked_by_stalled_source()
+    test_stalled_source_not_resubmitted()
+    test_consensus_rejects_outlier()
+    test_quorum_counts_agreeing_quotes()
+    print("✅ 聚合测试通过")
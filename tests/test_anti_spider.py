@@ -7,11 +7,14 @@
 
 import sys
 import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 # 添加脚本目录到路径
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
 
-from anti_spider_tools import StealthRequester, DuckDuckGoAdapter, ProxyManager
+from anti_spider_tools import StealthRequester, DuckDuckGoAdapter, ProxyManager, parse_duckduckgo_results
+from retry import RetryEngine, RetryPolicy
 
 def test_basic_proxy():
     """测试基础代理"""
@@ -58,10 +61,40 @@ def test_stealth_request():
         except:
             pass
 
+def test_ddg_parser():
+    """测试 DuckDuckGo 结果解析（离线）"""
+    print("\n" + "=" * 60)
+    print("🧩 测试 3: DuckDuckGo 结果解析")
+    print("=" * 60)
+    
+    html = (
+        '<div class="result"><h2><a rel="nofollow" class="result__a" '
+        'href="//duckduckgo.com/l/?uddg=https%3A%2F%2Fexample.com%2Fgold&amp;rut=x">Gold <b>Price</b></a></h2>'
+        '<a class="result__url" href="#">example.com/gold</a>'
+        '<a class="result__snippet" href="#">Live <b>gold</b> prices &amp; charts</a></div>'
+        '<div class="result"><h2><a rel="nofollow" class="result__a" href="https://example.org/">Second</a></h2></div>'
+    )
+    
+    # 按字节小块喂入，验证增量解析
+    chunks = [html[i:i + 16].encode() for i in range(0, len(html), 16)]
+    results = parse_duckduckgo_results(chunks, max_results=5)
+    expected = {
+        "index": 1,
+        "title": "Gold Price",
+        "url": "https://example.com/gold",
+        "snippet": "Live gold prices & charts",
+        "display_url": "example.com/gold",
+    }
+    
+    passed = len(results) == 2 and results[0] == expected and len(parse_duckduckgo_results(html, 1)) == 1
+    print("✅ 解析正确" if passed else f"❌ 解析结果不符: {results}")
+    assert passed
+    return passed
+
 def test_direct_fetch():
     """测试直接抓取"""
     print("\n" + "=" * 60)
-    print("🌐 测试 3: 直接抓取网页")
+    print("🌐 测试 4: 直接抓取网页")
     print("=" * 60)
     
     test_urls = [
@@ -85,6 +118,54 @@ def test_direct_fetch():
     stealth.close()
     return True
 
+def test_fetch_many():
+    """测试批量抓取（离线，本地 HTTP 服务）"""
+    print("\n" + "=" * 60)
+    print("📦 测试 5: 批量抓取")
+    print("=" * 60)
+    
+    hits = {}
+    
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+        
+        def do_GET(self):
+            hits[self.path] = hits.get(self.path, 0) + 1
+            status = 503 if self.path == "/down" else 200
+            body = self.path.encode()
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    
+    # 503 由 RetryEngine 重试，最多 max_attempts 次，fetch_many 不再叠加一层重试
+    retry = RetryEngine(RetryPolicy(max_attempts=2, base_delay=0))
+    stealth = StealthRequester(use_proxy=False, delay=(0, 0), retry=retry)
+    urls = [f"{base}/{i}" for i in range(6)] + [f"{base}/down"]
+    try:
+        results = list(stealth.fetch_many(iter(urls), concurrency=3, ordered=True))
+        unordered = {url for url, _, _ in stealth.fetch_many(urls[:6], concurrency=3)}
+    finally:
+        stealth.close()
+        server.shutdown()
+    
+    passed = (
+        [url for url, _, _ in results] == urls
+        and all(error is None for _, _, error in results)
+        and [r.text for _, r, _ in results[:6]] == [f"/{i}" for i in range(6)]
+        and results[-1][1].status_code == 503
+        and hits["/down"] == 2
+        and unordered == set(urls[:6])
+    )
+    print("✅ 批量抓取正确" if passed else f"❌ 批量抓取结果不符: {hits}")
+    assert passed
+    return passed
+
 def print_summary():
     """打印使用指南"""
     print("\n" + "=" * 60)
@@ -97,6 +178,10 @@ def print_summary():
     stealth = StealthRequester(use_proxy=True)
     response = stealth.get("https://example.com")
     print(response.text)
+    
+    # 批量抓取，结果边完成边返回
+    for url, response, error in stealth.fetch_many(urls, concurrency=8):
+        ...
     stealth.close()
 
 2️⃣  DuckDuckGo 搜索 (已可用):
@@ -133,7 +218,9 @@ def main():
     
     results.append(("代理连接", test_basic_proxy()))
     results.append(("智能请求", test_stealth_request()))
+    results.append(("结果解析", test_ddg_parser()))
     results.append(("直接抓取", test_direct_fetch()))
+    results.append(("批量抓取", test_fetch_many()))
     
     # 打印总结
     print("\n" + "=" * 60)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📥 限长流式下载测试（离线，假响应分块返回）
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+
+from requests.structures import CaseInsensitiveDict
+
+import search_tools
+from body_stream import BodyStream, BodyTooLarge, ContentTypeRejected, sniff_charset
+from http_cache import HttpCache
+
+class FakeResponse:
+    """按 chunk_size 分块产出 body，记录读了几块、是否关闭"""
+
+    def __init__(self, body, headers=None, status_code=200, url="https://example.com/a"):
+        self.body = body
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.status_code = status_code
+        self.url = url
+        self.chunks_read = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.body), chunk_size):
+            self.chunks_read += 1
+            yield self.body[i:i + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+def test_size_cap():
+    # Content-Length 已超限，不读响应体直接拒绝
+    response = FakeResponse(b"x" * 100, {"Content-Length": "100"})
+    try:
+        BodyStream(response, max_bytes=50)
+    except BodyTooLarge:
+        pass
+    else:
+        raise AssertionError("Content-Length 超限应抛出 BodyTooLarge")
+    assert response.closed and response.chunks_read == 0
+
+    # 没有 Content-Length，读到超限的那一块时抛出
+    response = FakeResponse(b"x" * 100)
+    body = BodyStream(response, max_bytes=50, chunk_size=20)
+    try:
+        body.read()
+    except BodyTooLarge:
+        pass
+    else:
+        raise AssertionError("响应体超限应抛出 BodyTooLarge")
+    assert response.closed and response.chunks_read == 3
+
+    # truncate=True 读到上限即停，不再下载后面的块
+    response = FakeResponse(b"x" * 100, {"Content-Length": "100"})
+    with BodyStream(response, max_bytes=50, truncate=True, chunk_size=20) as body:
+        assert body.read() == b"x" * 50
+        assert body.truncated and body.bytes_read == 50
+    assert response.closed and response.chunks_read == 3
+
+    # 正好等于上限不算截断
+    with BodyStream(FakeResponse(b"x" * 40), max_bytes=40, truncate=True, chunk_size=20) as body:
+        assert body.read() == b"x" * 40
+        assert not body.truncated
+
+def test_content_type_allowlist():
+    response = FakeResponse(b"%PDF-1.4", {"Content-Type": "application/pdf"})
+    try:
+        BodyStream(response)
+    except ContentTypeRejected:
+        pass
+    else:
+        raise AssertionError("PDF 应被拒绝")
+    assert response.closed
+
+    for content_type in ("text/html; charset=utf-8", "application/rss+xml", ""):
+        with BodyStream(FakeResponse(b"ok", {"Content-Type": content_type})) as body:
+            assert body.read() == b"ok"
+    # 非 200 不检查类型，错误页照常返回；allowed_types=None 全部放行
+    assert BodyStream(FakeResponse(b"", {"Content-Type": "image/png"}, status_code=404)).status_code == 404
+    assert BodyStream(FakeResponse(b"png", {"Content-Type": "image/png"}), allowed_types=None).read() == b"png"
+
+def test_sniff_charset():
+    html = b'<html><head><meta charset="gb2312"></head>'
+    # HTTP 头优先；gb2312 / gbk 按 gb18030 解码
+    assert sniff_charset({"Content-Type": "text/html; charset=Big5"}, html) == "big5"
+    assert sniff_charset({"Content-Type": "text/html"}, html) == "gb18030"
+    assert sniff_charset({}, b'<meta http-equiv="Content-Type" content="text/html; charset=GBK">') == "gb18030"
+    assert sniff_charset({}, b'<?xml version="1.0" encoding="ISO-8859-1"?><rss/>') == "iso8859-1"
+    assert sniff_charset({}, b"\xef\xbb\xbf<html>") == "utf-8-sig"
+    assert sniff_charset({}, "<html>".encode("utf-16")) == "utf-16"
+    # 写错的字符集跳过，最后用默认值
+    assert sniff_charset({"Content-Type": "text/html; charset=x-bogus"}, html) == "gb18030"
+    assert sniff_charset({}, b"<html>") == "utf-8"
+
+def test_text_uses_first_chunk_charset():
+    page = '<html><head><meta charset="gbk"></head><body>金价再创新高</body></html>'.encode("gbk")
+    body = BodyStream(FakeResponse(page, {"Content-Type": "text/html"}), chunk_size=48)
+    assert body.encoding == "gb18030"
+    assert "金价再创新高" in body.text()
+
+class FakeRetry:
+    def __init__(self, response):
+        self.response = response
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        return self.response
+
+def test_webfetch_truncated_not_revalidated():
+    """截断的页面入缓存时去掉校验头，并标记截断"""
+    page = b"<html><body>" + b"x" * 200 + b"</body></html>"
+    fake = FakeRetry(FakeResponse(page, {"Content-Type": "text/html", "ETag": '"v1"'}))
+    cache = HttpCache(":memory:", default_ttl=60)
+    fetcher = search_tools.WebFetch(cache=cache, max_bytes=100)
+
+    saved = search_tools.RETRY
+    search_tools.RETRY = fake
+    try:
+        article = fetcher.extract("https://example.com/a")
+        assert article["truncated"]
+        entry = cache.get("https://example.com/a")
+        assert len(entry["body"]) == 100
+        assert "ETag" not in entry["headers"]
+        assert entry["headers"][search_tools.TRUNCATED_HEADER] == "1"
+
+        # 缓存命中时仍然知道页面是截断的
+        assert fetcher.extract("https://example.com/a")["truncated"]
+        assert fake.calls == 1
+    finally:
+        search_tools.RETRY = saved
+
+if __name__ == "__main__":
+    test_size_cap()
+    test_content_type_allowlist()
+    test_sniff_charset()
+    test_text_uses_first_chunk_charset()
+    test_webfetch_truncated_not_revalidated()
+    print("✅ 限长流式下载测试通过")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📰 正文提取测试（离线，内置 HTML 样例）
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+
+from content_extract import extract_article
+
+PARAGRAPH = "Gold prices rose again on Tuesday as investors sought safety, traders said, " * 3
+
+PAGE = f"""<!DOCTYPE html>
+<html><head>
+<title>  Gold rallies |  Example News </title>
+<meta property="og:title" content="Gold rallies to record">
+<meta property="article:published_time" content="2025-01-02T08:00:00Z">
+<link rel="canonical" href="/markets/gold-rallies">
+<script>var ignored = "{PARAGRAPH}";</script>
+</head><body>
+<header><nav><a href="/">Home</a> <a href="/markets">Markets</a></nav></header>
+<div class="sidebar related"><p>Related: {PARAGRAPH}</p><a href="https://ads.example.com/">Ad</a></div>
+<article class="story-body">
+  <h1>Gold rallies to record</h1>
+  <p>{PARAGRAPH}</p>
+  <p>See the <a href="/data/gold#chart">gold chart</a>, for more detail on prices.</p>
+  <div>Analysts expect further gains, with central banks buying, {PARAGRAPH}</div>
+  <p>中文段落：金价再创新高，市场避险情绪升温，投资者纷纷买入黄金。</p>
+</article>
+<div id="comments"><p>Comment: {PARAGRAPH}</p></div>
+<footer><p>Copyright</p></footer>
+</body></html>"""
+
+URL = "https://news.example.com/a/1"
+
+def test_extracts_main_article():
+    result = extract_article(PAGE, url=URL)
+    assert result["title"] == "Gold rallies to record"
+    assert result["canonical_url"] == "https://news.example.com/markets/gold-rallies"
+    assert result["published"] == "2025-01-02T08:00:00Z"
+
+    text = result["text"]
+    assert text.startswith("Gold rallies to record\n\nGold prices rose again")
+    assert "See the gold chart, for more detail" in text
+    assert "Analysts expect further gains" in text      # 直接写在 div 里的文字
+    assert "金价再创新高" in text
+    for boilerplate in ("Related:", "Comment:", "Copyright", "Home", "var ignored"):
+        assert boilerplate not in text
+
+    # 只保留正文容器里的链接，去掉锚点
+    assert result["links"] == [{"url": "https://news.example.com/data/gold", "text": "gold chart"}]
+    assert not result["truncated"]
+    assert result["bytes"] == len(PAGE.encode("utf-8"))
+
+def test_byte_chunks_split_multibyte():
+    """字节块切在多字节字符中间也能正确解码"""
+    data = PAGE.encode("utf-8")
+    chunks = [data[i:i + 7] for i in range(0, len(data), 7)]
+    assert extract_article(iter(chunks), url=URL)["text"] == extract_article(PAGE, url=URL)["text"]
+
+def test_gbk_and_unknown_charset():
+    data = PAGE.encode("gbk")
+    assert "金价再创新高" in extract_article(data, url=URL, encoding="GBK")["text"]
+
+    # 写错的字符集按 utf-8 处理，字符串块和字节块都不报错
+    for chunks in (PAGE, PAGE.encode("utf-8"), [PAGE[:500], PAGE[500:]]):
+        assert "金价再创新高" in extract_article(chunks, url=URL, encoding="x-unknown-charset")["text"]
+    assert "金价再创新高" in extract_article(PAGE, url=URL, encoding=None)["text"]
+
+def test_max_bytes_truncates():
+    result = extract_article(PAGE.encode("utf-8"), url=URL, max_bytes=1500)
+    assert result["truncated"]
+    assert result["bytes"] == 1500
+    assert "金价再创新高" not in result["text"]
+
+if __name__ == "__main__":
+    test_extracts_main_article()
+    test_byte_chunks_split_multibyte()
+    test_gbk_and_unknown_charset()
+    test_max_bytes_truncates()
+    print("✅ 正文提取测试通过")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🦆 DuckDuckGo 分页测试（离线，假 post 返回预设页面）
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+
+import requests
+
+import duck_search_proxy
+from anti_spider_tools import iter_duckduckgo
+
+class FakeResponse:
+    def __init__(self, html):
+        self.html = html.encode()
+        self.encoding = "utf-8"
+
+    def iter_content(self, chunk_size=8192):
+        for i in range(0, len(self.html), chunk_size):
+            yield self.html[i:i + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+def make_page(urls, next_offset=None):
+    results = "".join(
+        f'<div class="result"><h2><a class="result__a" href="{url}">T {url}</a></h2>'
+        f'<a class="result__snippet" href="#">S</a></div>'
+        for url in urls
+    )
+    form = ""
+    if next_offset is not None:
+        form = (f'<form><input type="hidden" name="q" value="gold">'
+                f'<input type="hidden" name="s" value="{next_offset}">'
+                f'<input type="submit" value="Next"></form>')
+    return f"<html><body>{results}{form}</body></html>"
+
+class FakePost:
+    """按表单的 s 参数返回对应页面；pages 里是异常时抛出"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.forms = []
+
+    def __call__(self, form):
+        self.forms.append(dict(form))
+        page = self.pages[int(form.get("s", 0))]
+        if isinstance(page, Exception):
+            raise page
+        return FakeResponse(page)
+
+PAGES = {
+    0: make_page(["https://a/1", "https://a/2"], next_offset=2),
+    2: make_page(["https://a/2", "https://a/3"], next_offset=4),   # 翻页重复的结果去掉
+    4: make_page(["https://a/4"]),                                  # 没有下一页
+}
+
+def test_pages_until_last():
+    post = FakePost(PAGES)
+    results = list(iter_duckduckgo(post, {"q": "gold"}))
+    assert [r["url"] for r in results] == ["https://a/1", "https://a/2", "https://a/3", "https://a/4"]
+    assert [r["index"] for r in results] == [1, 2, 3, 4]
+    assert [f.get("s") for f in post.forms] == [None, "2", "4"]
+
+def test_stops_at_max_results_and_pages():
+    post = FakePost(PAGES)
+    assert len(list(iter_duckduckgo(post, {"q": "gold"}, max_results=2))) == 2
+    # 第一页已凑够，不再翻页
+    assert len(post.forms) == 1
+
+    post = FakePost(PAGES)
+    assert [r["url"] for r in iter_duckduckgo(post, {"q": "gold"}, max_pages=2)] == [
+        "https://a/1", "https://a/2", "https://a/3"]
+    assert len(post.forms) == 2
+
+def test_first_page_error_raised():
+    post = FakePost({0: requests.exceptions.ConnectionError("boom")})
+    try:
+        list(iter_duckduckgo(post, {"q": "gold"}))
+    except requests.exceptions.ConnectionError:
+        pass
+    else:
+        raise AssertionError("第一页失败应抛出")
+
+    # 翻页失败只结束翻页
+    post = FakePost({**PAGES, 2: requests.exceptions.ConnectionError("boom")})
+    assert [r["url"] for r in iter_duckduckgo(post, {"q": "gold"})] == ["https://a/1", "https://a/2"]
+
+def test_search_error_dict():
+    """第一页失败时 duckduckgo_search 仍返回 [{"error": ...}]"""
+    class FailingEngine:
+        def post(self, url, **kwargs):
+            raise requests.exceptions.ProxyError("proxy down")
+
+    saved = duck_search_proxy.default_engine
+    duck_search_proxy.default_engine = FailingEngine
+    try:
+        assert duck_search_proxy.duckduckgo_search("gold") == [{"error": "proxy down"}]
+    finally:
+        duck_search_proxy.default_engine = saved
+
+if __name__ == "__main__":
+    test_pages_until_last()
+    test_stops_at_max_results_and_pages()
+    test_first_page_error_raised()
+    test_search_error_dict()
+    print("✅ DuckDuckGo 分页测试通过")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🗃️ RSS 条目索引测试（离线，内存数据库）
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+
+from feed_store import FeedStore, dedup_items, item_key
+
+def test_item_key_prefers_guid():
+    """guid 相同即视为同一条，link / 标题改了也一样"""
+    a = {"guid": "ft-123", "link": "https://www.ft.com/content/a", "title": "Gold rises"}
+    b = {"guid": "ft-123", "link": "https://www.ft.com/content/a?ftcamp=rss", "title": "Gold rises again"}
+    assert item_key(a) == item_key(b)
+    assert item_key({"link": "https://x"}) == item_key({"link": "https://x", "title": "t"})
+    assert item_key({"guid": "1"}) != item_key({"guid": "2"})
+
+def test_dedup_items_keeps_first():
+    items = [{"guid": "1", "title": "a"}, {"guid": "2"}, {"guid": "1", "title": "b"}]
+    assert dedup_items(items) == [{"guid": "1", "title": "a"}, {"guid": "2"}]
+
+def test_add_new_across_feeds():
+    """同一 guid 出现在多个源只返回一次，同批内重复也只返回一次"""
+    store = FeedStore(":memory:")
+    home = [{"guid": "1"}, {"guid": "2"}, {"guid": "1"}]
+    world = [{"guid": "2"}, {"guid": "3"}]
+
+    assert store.add_new(home, feed="home") == [{"guid": "1"}, {"guid": "2"}]
+    assert store.add_new(world, feed="world") == [{"guid": "3"}]
+    assert store.add_new(home, feed="home") == []
+    assert len(store) == 3
+    assert store.seen({"guid": "3"})
+    assert not store.seen({"guid": "4"})
+
+def test_prune():
+    store = FeedStore(":memory:")
+    store.add_new([{"guid": "old"}])
+    assert store.first_seen({"guid": "old"}) > 0
+    assert store.prune(max_age=-1) == 1
+    assert len(store) == 0
+    assert store.first_seen({"guid": "old"}) == 0
+
+if __name__ == "__main__":
+    test_item_key_prefers_guid()
+    test_dedup_items_keeps_first()
+    test_add_new_across_feeds()
+    test_prune()
+    print("✅ RSS 条目索引测试通过")
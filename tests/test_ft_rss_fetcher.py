@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📰 FT RSS 获取器测试（离线，替换 feed 下载）
+"""
+
+import os
+import sys
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+
+import ft_rss_fetcher
+from ft_rss_fetcher import FeedWatcher, iter_rss_items, parse_rss
+from feed_store import FeedStore
+
+def make_feed(guids):
+    items = "".join(
+        f"<item><title>News {g}</title><link>https://www.ft.com/content/{g}</link><guid>{g}</guid></item>"
+        for g in guids
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>FT</title>{items}</channel></rss>'
+
+@contextmanager
+def feeds(contents):
+    """fetch_feeds 返回 contents 里当前的内容"""
+    saved = ft_rss_fetcher.fetch_feeds
+    ft_rss_fetcher.fetch_feeds = lambda names, proxy=None, cache=None: {name: contents.get(name) for name in names}
+    try:
+        yield contents
+    finally:
+        ft_rss_fetcher.fetch_feeds = saved
+
+def make_watcher(sources, **kwargs):
+    pushed = []
+    watcher = FeedWatcher(sources, pushed.extend, cache=object(), store=FeedStore(":memory:"), **kwargs)
+    return watcher, pushed
+
+def test_watcher_pushes_whole_feed():
+    """两次轮询之间新增的条目再多也都推送，之前推过的不重复"""
+    with feeds({"home": make_feed(range(8))}) as contents:
+        watcher, pushed = make_watcher(["home"])
+        assert watcher.poll(["home"]) == {"home": 8}
+
+        contents["home"] = make_feed(range(20))
+        assert watcher.poll(["home"]) == {"home": 12}
+        assert [item["guid"] for item in pushed] == [str(g) for g in range(20)]
+        assert all(item["feed"] == "home" for item in pushed)
+
+        assert watcher.poll(["home"]) == {"home": 0}
+
+def test_watcher_failed_feed():
+    with feeds({"home": None, "world": make_feed(["w1"])}):
+        watcher, pushed = make_watcher(["home", "world"])
+        assert watcher.poll(["home", "world"]) == {"home": None, "world": 1}
+        assert [item["guid"] for item in pushed] == ["w1"]
+
+def test_reschedule():
+    """有新条目间隔减半，没有则放大 1.5 倍，限制在 [min_interval, max_interval]"""
+    watcher, _ = make_watcher(["home"], interval=100, min_interval=60, max_interval=200)
+    watcher._reschedule("home", 3)
+    assert watcher.intervals["home"] == 60
+    for _ in range(5):
+        watcher._reschedule("home", 0)
+    assert watcher.intervals["home"] == 200
+    watcher._reschedule("home", None)
+    assert watcher.intervals["home"] == 200
+
+RSS1 = """<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/"
+         xmlns:dc="http://purl.org/dc/elements/1.1/">
+  <channel rdf:about="https://example.com/"><title>Example</title></channel>
+  <item rdf:about="https://example.com/1">
+    <title>黄金上涨</title><link>https://example.com/1</link><dc:date>2025-01-02</dc:date>
+  </item>
+</rdf:RDF>"""
+
+ATOM = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Example</title>
+  <entry>
+    <id>urn:1</id>
+    <link rel="self" href="https://example.com/1.atom"/>
+    <link href="https://example.com/1"/>
+    <updated>2025-01-03T00:00:00Z</updated>
+    <published>2025-01-02T00:00:00Z</published>
+    <summary>摘要</summary>
+  </entry>
+</feed>"""
+
+def test_parse_formats():
+    items = parse_rss(make_feed(["a", "b"]))
+    assert [(i["title"], i["link"], i["guid"]) for i in items] == [
+        ("News a", "https://www.ft.com/content/a", "a"), ("News b", "https://www.ft.com/content/b", "b")]
+
+    item, = parse_rss(RSS1)
+    assert (item["title"], item["guid"], item["pub_date"]) == ("黄金上涨", "https://example.com/1", "2025-01-02")
+
+    # Atom 只取 alternate 链接；published 优先于 updated；没有标题时为 N/A
+    item, = parse_rss(ATOM.encode("utf-8"))
+    assert item == {"title": "N/A", "link": "https://example.com/1", "guid": "urn:1",
+                    "description": "摘要", "pub_date": "2025-01-02T00:00:00Z"}
+
+def test_byte_chunks_and_limit():
+    data = make_feed(range(10)).encode("utf-8")
+    read = []
+
+    def chunks():
+        for i in range(0, len(data), 50):
+            read.append(i)
+            yield data[i:i + 50]
+
+    assert [i["guid"] for i in iter_rss_items(chunks(), limit=2)] == ["0", "1"]
+    # 产出 limit 条后不再读后面的块
+    assert len(read) < len(data) // 50
+    assert len(parse_rss(data)) == 10
+    assert parse_rss(data, limit=0) == [] and parse_rss(b"") == [] and parse_rss(None) == []
+
+def test_malformed_xml():
+    """解析出错时保留已产出的条目，不抛异常"""
+    broken = make_feed(["a", "b"]).replace("</channel></rss>", "<item><title>c</oops>")
+    assert [i["guid"] for i in parse_rss(broken)] == ["a", "b"]
+    assert parse_rss("not xml") == []
+
+if __name__ == "__main__":
+    test_watcher_pushes_whole_feed()
+    test_watcher_failed_feed()
+    test_reschedule()
+    test_parse_formats()
+    test_byte_chunks_and_limit()
+    test_malformed_xml()
+    print("✅ FT RSS 获取器测试通过")
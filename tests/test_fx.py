@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+💱 汇率缓存测试（离线，替换行情请求）
+"""
+
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "finance"))
+
+import fx
+from fx import FxRates, OUNCE_TO_GRAM
+from quotes import make_quote
+
+class FakeQuotes:
+    """按代码返回预设价格，记录请求过的代码；prices 里没有的代码视为请求失败"""
+
+    def __init__(self, prices, delay=0.0):
+        self.prices = dict(prices)
+        self.delay = delay
+        self.calls = []
+
+    def __call__(self, symbols, timeout=10):
+        self.calls.extend(symbols)
+        time.sleep(self.delay)
+        return {
+            s: make_quote(*s.split(":", 1), price=self.prices[s])
+            for s in symbols if s in self.prices
+        }
+
+@contextmanager
+def installed(fake):
+    """替换 fx 模块里的行情请求和落盘，退出时恢复"""
+    saved = fx.fetch_quotes, fx.record_quotes
+    fx.fetch_quotes, fx.record_quotes = fake, lambda quotes: 0
+    try:
+        yield fake
+    finally:
+        fx.fetch_quotes, fx.record_quotes = saved
+
+def test_ttl_cache():
+    fake = FakeQuotes({"sina:fx_susdcny": 7.2})
+    with installed(fake):
+        rates = FxRates(ttl=60)
+        assert rates.rate() == 7.2
+        assert rates.rate() == 7.2
+        assert len(fake.calls) == 1
+
+        # 缓存过期后重新请求
+        fake.prices["sina:fx_susdcny"] = 7.3
+        price, fetched, symbol = rates._rates["USDCNY"]
+        rates._rates["USDCNY"] = (price, fetched - 61, symbol)
+        assert rates.rate() == 7.3
+        assert len(fake.calls) == 2
+
+def test_fallback_order():
+    """首选代码失败时用下一个；全部失败时沿用过期值，从未取到过返回 None"""
+    fake = FakeQuotes({"yahoo:CNY=X": 7.1})
+    with installed(fake):
+        rates = FxRates(ttl=60)
+        assert rates.rate() == 7.1
+        assert rates.source() == "yahoo:CNY=X"
+        assert fake.calls == ["sina:fx_susdcny", "yahoo:CNY=X"]
+
+        fake.prices.clear()
+        rates._rates["USDCNY"] = (7.1, time.time() - 600, "yahoo:CNY=X")
+        assert rates.rate() == 7.1
+
+        assert FxRates(ttl=60).rate() is None
+        assert FxRates(ttl=60).usd_oz_to_cny_g(2650.0) is None
+
+def test_observe_and_convert():
+    fake = FakeQuotes({})
+    with installed(fake):
+        rates = FxRates(ttl=60)
+        rates.observe({"sina:fx_susdcny": make_quote("sina", "fx_susdcny", price=7.0)})
+        assert rates.usd_oz_to_cny_g([OUNCE_TO_GRAM, None]) == [7.0, None]
+        assert rates.convert({"a": 2}) == {"a": 14.0}
+        assert fake.calls == []
+
+def test_observe_not_blocked_by_fetch():
+    """请求汇率期间 observe() 不会被锁住"""
+    fake = FakeQuotes({"sina:fx_susdcny": 7.2}, delay=0.5)
+    with installed(fake):
+        rates = FxRates(ttl=60)
+        fetching = threading.Thread(target=rates.rate)
+        fetching.start()
+        time.sleep(0.1)
+
+        start = time.monotonic()
+        rates.observe({"yahoo:CNY=X": make_quote("yahoo", "CNY=X", price=7.1)})
+        assert time.monotonic() - start < 0.2
+        fetching.join()
+
+def test_offshore_kept_separate():
+    """离岸 CNH 只进 USDCNH，不会被当成在岸汇率"""
+    fake = FakeQuotes({"yahoo:CNY=X": 7.1, "eastmoney:133.USDCNH": 7.3})
+    with installed(fake):
+        rates = FxRates(ttl=60)
+        rates.observe({"eastmoney:133.USDCNH": make_quote("eastmoney", "133.USDCNH", price=7.3)})
+        assert rates.rate("USDCNH") == 7.3
+        assert rates.rate() == 7.1
+        assert rates.source() == "yahoo:CNY=X"
+        # 同一数据源的代码优先并进同一批请求
+        assert rates.with_fx(["yahoo:GC=F"]) == ["yahoo:GC=F", "yahoo:CNY=X"]
+        assert rates.with_fx(["eastmoney:101.GC00Y"]) == ["eastmoney:101.GC00Y", "sina:fx_susdcny"]
+
+if __name__ == "__main__":
+    test_ttl_cache()
+    test_fallback_order()
+    test_observe_and_convert()
+    test_observe_not_blocked_by_fetch()
+    test_offshore_kept_separate()
+    print("✅ 汇率测试通过")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+💾 HTTP 缓存测试（离线，内存数据库）
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+
+from http_cache import HttpCache, requests_sender
+
+def test_revalidation_304():
+    """过期条目带 If-None-Match 重新验证，304 时返回缓存内容"""
+    cache = HttpCache(":memory:", default_ttl=0)
+    requests_seen = []
+
+    def send(url, headers):
+        requests_seen.append(dict(headers))
+        if headers.get("If-None-Match") == '"v1"':
+            return 304, {"ETag": '"v1"'}, b""
+        return 200, {"ETag": '"v1"', "Content-Type": "text/plain"}, b"hello"
+
+    first = cache.fetch("https://example.com/a", send)
+    assert (first.status_code, first.content, first.from_cache) == (200, b"hello", False)
+
+    second = cache.fetch("https://example.com/a", send)
+    assert requests_seen[1] == {"If-None-Match": '"v1"'}
+    assert (second.status_code, second.content, second.from_cache) == (200, b"hello", True)
+
+def test_fresh_entry_skips_request():
+    cache = HttpCache(":memory:", default_ttl=60)
+    calls = []
+
+    def send(url, headers):
+        calls.append(url)
+        return 200, {}, b"body"
+
+    cache.fetch("https://example.com/b", send)
+    assert cache.fetch("https://example.com/b", send).from_cache
+    assert len(calls) == 1
+
+def test_no_store_not_cached():
+    cache = HttpCache(":memory:")
+    cache.fetch("https://example.com/c", lambda url, headers: (200, {"Cache-Control": "no-store"}, b"x"))
+    assert cache.get("https://example.com/c") is None
+
+def test_lru_eviction():
+    """超过字节上限时淘汰最久没访问的条目"""
+    body = os.urandom(1000)   # 随机字节压缩不了，每条约 1000 字节
+    cache = HttpCache(":memory:", max_bytes=2500)
+    cache.store("https://example.com/1", 200, {}, body)
+    time.sleep(0.01)
+    cache.store("https://example.com/2", 200, {}, body)
+    time.sleep(0.01)
+    cache.get("https://example.com/1")   # 1 变成最近访问
+    time.sleep(0.01)
+    cache.store("https://example.com/3", 200, {}, body)
+
+    assert cache.get("https://example.com/2") is None
+    assert cache.get("https://example.com/1")["body"] == body
+    assert cache.get("https://example.com/3")["body"] == body
+
+class FakeResponse:
+    def __init__(self, headers, content):
+        self.status_code = 200
+        self.headers = headers
+        self.content = content
+
+def test_sender_drops_encoding_headers():
+    """缓存的是解压后的响应体，重放时不能带 gzip 头"""
+    resp_headers = {"Content-Encoding": "gzip", "Content-Length": "20", "Content-Type": "text/xml", "ETag": '"v1"'}
+    send = requests_sender(lambda url, headers=None: FakeResponse(resp_headers, b"<rss/>"))
+    cache = HttpCache(":memory:", default_ttl=60)
+    cache.fetch("https://example.com/rss", send)
+    hit = cache.fetch("https://example.com/rss", send)
+    assert hit.from_cache and hit.content == b"<rss/>"
+    assert hit.headers == {"Content-Type": "text/xml", "ETag": '"v1"'}
+
+def test_vary_not_cached():
+    """Vary 依赖 User-Agent 等请求头的响应不缓存；只有 Accept-Encoding 照常缓存"""
+    cache = HttpCache(":memory:", default_ttl=60)
+    cache.fetch("https://example.com/ua", lambda url, headers: (200, {"Vary": "Accept-Encoding, User-Agent"}, b"x"))
+    assert cache.get("https://example.com/ua") is None
+    cache.fetch("https://example.com/star", lambda url, headers: (200, {"Vary": "*"}, b"x"))
+    assert cache.get("https://example.com/star") is None
+    cache.fetch("https://example.com/ae", lambda url, headers: (200, {"vary": "accept-encoding"}, b"x"))
+    assert cache.get("https://example.com/ae")["body"] == b"x"
+
+if __name__ == "__main__":
+    test_revalidation_304()
+    test_fresh_entry_skips_request()
+    test_no_store_not_cached()
+    test_lru_eviction()
+    test_sender_drops_encoding_headers()
+    test_vary_not_cached()
+    print("✅ HTTP 缓存测试通过")
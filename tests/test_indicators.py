@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📐 行情指标测试（离线，与逐点的参考实现对比）
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "finance"))
+
+import numpy as np
+
+from indicators import OUNCE_TO_GRAM, IndicatorEngine, RsiState, compute, rsi, sma
+
+def reference_sma(prices, window):
+    return [sum(prices[i - window + 1:i + 1]) / window if i >= window - 1 else None
+            for i in range(len(prices))]
+
+def reference_rsi(prices, period):
+    """教科书 Wilder RSI：前 period 个变动取平均，之后 avg = (avg * (n-1) + x) / n"""
+    out = [None] * len(prices)
+    avg_gain = avg_loss = 0.0
+    for i in range(1, len(prices)):
+        change = prices[i] - prices[i - 1]
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        if i <= period:
+            avg_gain += gain / period
+            avg_loss += loss / period
+        else:
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
+        if i >= period:
+            out[i] = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+    return out
+
+def random_walk(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return (2000 + np.cumsum(rng.normal(0, 5, n))).tolist()
+
+def assert_close(actual, expected):
+    actual = np.asarray(actual, dtype=float)
+    expected = np.array([np.nan if v is None else v for v in expected])
+    assert np.allclose(actual, expected, equal_nan=True), (actual, expected)
+
+def test_sma_matches_reference():
+    prices = random_walk(50)
+    for window in (1, 5, 20):
+        assert_close(sma(prices, window), reference_sma(prices, window))
+    assert np.isnan(sma([1.0, 2.0], 5)).all()
+
+def test_rsi_matches_reference():
+    prices = random_walk(300)
+    for period in (2, 14):
+        assert_close(rsi(prices, period), reference_rsi(prices, period))
+
+def test_rsi_long_series_crosses_chunks():
+    """period=2 时每块约 500 点，3000 点要跨好几块"""
+    prices = random_walk(3000, seed=1)
+    assert_close(rsi(prices, 2), reference_rsi(prices, 2))
+
+def test_rsi_matrix_with_gaps_matches_incremental():
+    """多代码、带缺失值时与逐笔的 RsiState 一致"""
+    x = np.array([random_walk(200, seed=s) for s in range(3)])
+    x[0, 50:60] = np.nan
+    x[1, ::7] = np.nan
+    x[2, :30] = np.nan
+
+    state = RsiState(3, 14)
+    expected = np.column_stack([state.update(x[:, t]) for t in range(x.shape[1])])
+    assert np.allclose(rsi(x, 14), expected, equal_nan=True)
+
+def test_rsi_flat_and_rising():
+    assert rsi([5.0] * 20, 14)[-1] == 50.0
+    assert rsi(list(range(20)), 14)[-1] == 100.0
+
+def test_compute_spread():
+    comex = [2000.0, 2010.0, 2020.0]
+    shfe = [460.0, 462.0, 465.0]
+    result = compute(np.array([comex, shfe]), sma_windows=(2,), spread=(0, 1), usd_cny=7.0)
+    expected = np.array(comex) * 7.0 / OUNCE_TO_GRAM - np.array(shfe)
+    assert np.allclose(result["spread"], expected)
+    assert "spread" not in compute(np.array([comex, shfe]), sma_windows=(2,))
+
+def test_engine_matches_batch():
+    x = np.array([random_walk(60, seed=s) for s in range(2)])
+    engine = IndicatorEngine(["a", "b"], sma_windows=(5,), vol_window=10)
+    latest = engine.warm_up(x)
+    batch = compute(x, sma_windows=(5,), vol_window=10)
+    for key in ("sma_5", "volatility", "rsi", "drawdown"):
+        assert np.allclose(latest[key], batch[key][:, -1]), key
+    assert np.allclose(latest["max_drawdown"], batch["max_drawdown"])
+
+if __name__ == "__main__":
+    test_sma_matches_reference()
+    test_rsi_matches_reference()
+    test_rsi_long_series_crosses_chunks()
+    test_rsi_matrix_with_gaps_matches_incremental()
+    test_rsi_flat_and_rising()
+    test_compute_spread()
+    test_engine_matches_batch()
+    print("✅ 指标测试通过")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧭 代理池测试（离线，不启动后台探测）
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+
+from anti_spider_tools import ProxyManager, StealthRequester
+
+class FakePool:
+    """固定返回一个代理，记录反馈"""
+
+    def __init__(self, url=None):
+        self.url = url
+        self.records = []
+
+    def choose(self, socks=False):
+        return self.url
+
+    def record(self, url, ok):
+        self.records.append((url, ok))
+
+def test_no_proxies_no_pool():
+    """没有配置代理时不创建代理池，始终直连"""
+    manager = ProxyManager(proxies=[])
+    assert manager.pick() is None
+    assert not manager.test_proxy()
+    assert manager.pool is None
+    assert manager.get_proxy() == manager.proxies
+
+def test_pool_created_on_first_use():
+    stealth = StealthRequester(use_proxy=False)
+    try:
+        # 构造请求器不创建代理池
+        assert stealth.proxy_manager._pool is None
+        stealth.proxy_manager.report({"https": "http://127.0.0.1:1"}, ok=False)
+        assert stealth.proxy_manager._pool is None
+    finally:
+        stealth.close()
+
+def test_given_pool_used():
+    pool = FakePool("http://127.0.0.1:7890")
+    manager = ProxyManager(pool=pool)
+    proxies = manager.pick()
+    assert proxies == {"http": "http://127.0.0.1:7890", "https": "http://127.0.0.1:7890"}
+    manager.report(proxies, ok=False)
+    assert pool.records == [("http://127.0.0.1:7890", False)]
+
+    assert ProxyManager(pool=FakePool()).pick() is None
+
+if __name__ == "__main__":
+    test_no_proxies_no_pool()
+    test_pool_created_on_first_use()
+    test_given_pool_used()
+    print("✅ 代理池测试通过")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🗄️ 本地行情库测试（离线，临时目录）
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "finance"))
+
+import numpy as np
+
+from quote_store import COLUMNS, QuoteStore
+from quotes import make_quote
+
+DAY = 86400
+T0 = 1735689600.0   # 2025-01-01 00:00:00 UTC
+
+def quote(price, ts, code="101.GC00Y"):
+    return make_quote("eastmoney", code, price=price, prev_close=100.0, time=ts)
+
+def test_append_dedup():
+    """行情时间不晚于已存最新时间的快照不重复写入，没有价格的不写"""
+    with tempfile.TemporaryDirectory() as root:
+        store = QuoteStore(root)
+        assert store.append(quote(101.0, T0))
+        assert not store.append(quote(101.0, T0))        # 休市时反复抓到同一笔
+        assert not store.append(quote(99.0, T0 - 60))    # 比已存的旧
+        assert not store.append(quote(None, T0 + 60))
+        assert store.append(quote(102.0, T0 + 60))
+        assert store.append_many([quote(103.0, T0 + 120), quote(103.0, T0 + 120)]) == 1
+        assert store.symbols() == ["eastmoney:101.GC00Y"]
+        store.close()
+
+        # 重新打开后从索引恢复最新时间，仍然去重
+        store = QuoteStore(root)
+        assert not store.append(quote(103.0, T0 + 120))
+        store.close()
+
+def test_read_memmap():
+    """单日区间直接返回 memmap 视图；跨日拼接并按 start / end 裁剪"""
+    with tempfile.TemporaryDirectory() as root:
+        store = QuoteStore(root)
+        for i in range(5):
+            store.append(quote(100.0 + i, T0 + i * 60))
+        store.append(quote(200.0, T0 + DAY))
+
+        data = store.read("eastmoney:101.GC00Y", start=T0, end=T0 + 3600)
+        assert isinstance(data["price"], np.memmap)
+        assert data["price"].tolist() == [100.0, 101.0, 102.0, 103.0, 104.0]
+        assert data["time"].tolist() == [T0 + i * 60 for i in range(5)]
+        assert np.allclose(data["change"], [0.0, 1.0, 2.0, 3.0, 4.0])
+        assert np.isnan(data["open"]).all()
+
+        data = store.read("eastmoney:101.GC00Y", start=T0 + 120, columns=["price"])
+        assert set(data) == {"time", "price"}
+        assert data["price"].tolist() == [102.0, 103.0, 104.0, 200.0]
+
+        assert len(store.read("eastmoney:missing")["price"]) == 0
+        store.close()
+
+def append_series(root, offset, count):
+    """子进程：按时间顺序追加 count 条，时间错开 offset 秒"""
+    store = QuoteStore(root)
+    for i in range(count):
+        store.append(quote(100.0 + i, T0 + i + offset))
+    store.close()
+
+def test_two_processes():
+    """两个进程同时写同一个代码：行情时间严格递增，各列和索引条数一致"""
+    with tempfile.TemporaryDirectory() as root:
+        processes = [
+            multiprocessing.Process(target=append_series, args=(root, offset, 300))
+            for offset in (0.0, 0.5)
+        ]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join(60)
+            assert p.exitcode == 0
+
+        store = QuoteStore(root)
+        symbol = "eastmoney:101.GC00Y"
+        path = store._dir(symbol, store.days(symbol)[0])
+        sizes = {os.path.getsize(os.path.join(path, c + ".f8")) for c in COLUMNS}
+        rows = store._db.execute("SELECT rows FROM quote_days WHERE symbol = ?", (symbol,)).fetchone()[0]
+        times = store.read(symbol)["time"]
+        assert sizes == {rows * 8}
+        assert len(times) == rows
+        assert (np.diff(times) > 0).all()
+        store.close()
+
+if __name__ == "__main__":
+    test_append_dedup()
+    test_read_memmap()
+    test_two_processes()
+    print("✅ 行情库测试通过")
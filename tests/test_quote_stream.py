@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📡 行情推送测试（离线：SSE 切分、增量合并，stop() 用本地 SSE 服务验证）
+"""
+
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "finance"))
+
+import quote_stream
+from quote_stream import QuoteStream, iter_sse_data
+
+@contextmanager
+def recorded():
+    """收集写入行情库的记录，不落盘"""
+    saved = quote_stream.record_quotes
+    written = []
+    quote_stream.record_quotes = written.extend
+    try:
+        yield written
+    finally:
+        quote_stream.record_quotes = saved
+
+def make_stream():
+    updates = []
+    stream = QuoteStream(["101.GC00Y", "113.au0"], on_update=lambda *args: updates.append(args))
+    return stream, updates
+
+SNAPSHOT = {"data": {"diff": {
+    "0": {"f12": "GC00Y", "f13": 101, "f14": "COMEX黄金", "f2": 2650.0, "f3": 0.5, "f4": 13.2,
+          "f18": 2636.8, "f124": 1735689600},
+    "1": {"f12": "au0", "f13": 113, "f14": "沪金主力", "f2": 620.0, "f3": "-", "f4": "-",
+          "f18": 615.0, "f124": 1735689600},
+}}}
+
+def test_iter_sse_data():
+    lines = [
+        ": keep-alive", "",
+        "event: message", "data: {\"a\":", "data:  1}", "",
+        "id: 2", "data:{\"b\":2}", "", "",
+        "data: tail",
+    ]
+    assert list(iter_sse_data(lines)) == ['{"a":\n 1}', '{"b":2}', "tail"]
+    assert list(iter_sse_data([])) == []
+
+def test_snapshot_then_delta():
+    with recorded() as written:
+        stream, updates = make_stream()
+        assert stream.handle_message(SNAPSHOT) == 2
+        assert stream.quotes["101.GC00Y"]["time"] == 1735689600
+        # 快照里缺失的涨跌由价格和昨收算出
+        assert abs(stream.quotes["113.au0"]["change"] - 5.0) < 1e-9
+
+        # 增量只带位置和价格：时间取收到的时间，涨跌重算
+        before = time.time()
+        assert stream.handle_message({"data": {"diff": {"0": {"f2": 2660.0}}}}) == 1
+        quote = stream.quotes["101.GC00Y"]
+        assert quote["time"] >= before
+        assert abs(quote["change"] - (2660.0 - 2636.8)) < 1e-9
+        assert abs(quote["change_pct"] - (2660.0 - 2636.8) / 2636.8 * 100) < 1e-9
+        assert quote["name"] == "COMEX黄金"
+
+        code, changed, merged = updates[-1]
+        assert code == "101.GC00Y"
+        assert set(changed) == {"price", "change", "change_pct"}
+        assert written[-1] is merged and len(written) == 3
+
+def test_missing_values_ignored():
+    with recorded() as written:
+        stream, updates = make_stream()
+        stream.handle_message(SNAPSHOT)
+        count = len(updates)
+        assert stream.handle_message({"data": {"diff": {"1": {"f2": "-", "f14": ""}}}}) == 0
+        assert stream.quotes["113.au0"]["price"] == 620.0
+        assert len(updates) == count and len(written) == 2
+
+        # 未知位置（还没收到过快照）直接忽略
+        assert stream.handle_message({"data": {"diff": {"9": {"f2": 1.0}}}}) == 0
+
+class SseHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        # 不带 charset，名称是 UTF-8 中文
+        body = 'data: {"data": {"diff": {"0": {"f12": "GC00Y", "f13": 101, "f14": "COMEX黄金", "f2": 2650.0}}}}\n\n'
+        body = body.encode("utf-8")
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(body), body))
+        self.wfile.flush()
+        time.sleep(5)   # 之后一直没有推送
+
+    def log_message(self, *args):
+        pass
+
+def test_stop_closes_stream():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SseHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    saved_url = quote_stream.SSE_URL
+    quote_stream.SSE_URL = f"http://127.0.0.1:{server.server_port}/sse"
+    try:
+        with recorded():
+            stream, updates = make_stream()
+            messages = []
+            worker = threading.Thread(target=lambda: messages.append(stream.stream()))
+            worker.start()
+            deadline = time.monotonic() + 5
+            while not updates and time.monotonic() < deadline:
+                time.sleep(0.05)
+
+            start = time.monotonic()
+            stream.stop()
+            worker.join(3)
+            assert not worker.is_alive()
+            assert time.monotonic() - start < 1
+            assert messages == [1]
+            assert stream.quotes["101.GC00Y"]["name"] == "COMEX黄金"
+    finally:
+        quote_stream.SSE_URL = saved_url
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_iter_sse_data()
+    test_snapshot_then_delta()
+    test_missing_values_ignored()
+    test_stop_closes_stream()
+    print("✅ 行情推送测试通过")
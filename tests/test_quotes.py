@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📈 批量行情测试（离线，替换 HTTP 请求）
+"""
+
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "finance"))
+
+import quotes
+from quotes import YahooProvider
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+class FakeRetry:
+    """按 URL 返回预设 JSON，记录每次请求"""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.calls = []
+
+    def get(self, url, params=None, **kwargs):
+        self.calls.append((url, params))
+        return FakeResponse(self.routes[url](params))
+
+@contextmanager
+def installed(fake):
+    saved = quotes.RETRY
+    quotes.RETRY = fake
+    try:
+        yield fake
+    finally:
+        quotes.RETRY = saved
+
+SPARK = {
+    "GC=F": {"symbol": "GC=F", "close": [2650.0, None], "timestamp": [1735689600], "chartPreviousClose": 2640.0},
+    "SI=F": {"symbol": "SI=F", "close": [30.5], "timestamp": [1735689600], "chartPreviousClose": 30.0},
+}
+QUOTE = {"quoteResponse": {"result": [
+    {"symbol": "GC=F", "shortName": "Gold Feb 25", "currency": "USD", "exchange": "CMX"},
+    {"symbol": "SI=F", "shortName": "Silver Mar 25", "currency": "USD", "exchange": "CMX"},
+]}}
+
+def make_fake():
+    return FakeRetry({
+        YahooProvider.URL: lambda params: SPARK,
+        YahooProvider.QUOTE_URL: lambda params: QUOTE,
+    })
+
+def test_yahoo_meta_batched_and_persisted():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "yahoo_meta.json")
+        with installed(make_fake()) as fake:
+            result = YahooProvider(meta_path=path).fetch(["GC=F", "SI=F"])
+            urls = [url for url, _ in fake.calls]
+            # 一次 spark + 一次 quote，不按代码逐个请求
+            assert urls == [YahooProvider.URL, YahooProvider.QUOTE_URL]
+            assert fake.calls[1][1] == {"symbols": "GC=F,SI=F"}
+
+        gold = result["GC=F"]
+        assert gold["price"] == 2650.0 and gold["change"] == 10.0
+        assert gold["name"] == "Gold Feb 25"
+        assert gold["currency"] == "USD" and gold["exchange"] == "CMX"
+
+        # 新进程（新实例）直接用本地保存的元数据
+        with installed(make_fake()) as fake:
+            result = YahooProvider(meta_path=path).fetch(["GC=F", "SI=F"])
+            assert [url for url, _ in fake.calls] == [YahooProvider.URL]
+        assert result["SI=F"]["exchange"] == "CMX"
+
+def test_yahoo_meta_failure_not_cached():
+    def broken(params):
+        raise ValueError("401")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "yahoo_meta.json")
+        with installed(FakeRetry({YahooProvider.URL: lambda params: SPARK, YahooProvider.QUOTE_URL: broken})):
+            result = YahooProvider(meta_path=path).fetch(["GC=F"])
+        assert result["GC=F"]["price"] == 2650.0
+        assert result["GC=F"]["currency"] is None
+        assert not os.path.exists(path)
+
+if __name__ == "__main__":
+    test_yahoo_meta_batched_and_persisted()
+    test_yahoo_meta_failure_not_cached()
+    print("✅ 批量行情测试通过")
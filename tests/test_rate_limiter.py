@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ 令牌桶限速器测试（离线）
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+
+from rate_limiter import HostRateLimiter, TokenBucket
+
+def test_bucket_refill():
+    """突发额度用完后需要等待，时间过去后按速率补满（不超过 burst）"""
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    # 第三个请求透支一个令牌，需等 1/rate 秒
+    assert abs(bucket.reserve() - 0.1) < 0.01
+
+    # 模拟过去 1 秒：补 10 个令牌，但桶容量只有 2
+    bucket.updated -= 1.0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() > 0
+
+def test_unlimited_bucket():
+    bucket = TokenBucket(rate=None)
+    assert all(bucket.reserve() == 0 for _ in range(100))
+
+def test_hosts_independent():
+    """不同 host 各用各的桶，单独设置的 host 用自己的速率"""
+    limiter = HostRateLimiter(rate=1, burst=1)
+    limiter.set_limit("api.example.com", rate=100, burst=5)
+
+    assert limiter.bucket("https://a.example.com/x").reserve() == 0
+    assert limiter.bucket("https://b.example.com/y").reserve() == 0
+    assert limiter.bucket("https://a.example.com/z").reserve() > 0.9
+
+    api = limiter.bucket("https://API.example.com/search")
+    assert api is limiter.bucket("api.example.com")
+    assert [api.reserve() for _ in range(5)] == [0] * 5
+
+if __name__ == "__main__":
+    test_bucket_refill()
+    test_unlimited_bucket()
+    test_hosts_independent()
+    print("✅ 限速器测试通过")
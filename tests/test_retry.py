@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔁 重试与熔断测试（离线，假 send 不发网络请求）
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+
+import requests
+
+from anti_spider_tools import AsyncRequester, StealthRequester
+from retry import CircuitBreaker, CircuitOpenError, RetryEngine, RetryPolicy
+
+class FakeResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        self.headers = {}
+        self.ok = status_code < 400
+
+    def close(self):
+        pass
+
+class FakeSession:
+    """按顺序返回预设状态码，记录每次请求的方法"""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.methods = []
+
+    def request(self, method, url, **kwargs):
+        self.methods.append(method)
+        return FakeResponse(self.statuses.pop(0))
+
+    def close(self):
+        pass
+
+class CountingLimiter:
+    def __init__(self):
+        self.acquired = []
+
+    def acquire(self, url):
+        self.acquired.append(url)
+
+    async def acquire_async(self, url):
+        self.acquired.append(url)
+
+def make_engine(max_attempts: int = 3, **kwargs) -> RetryEngine:
+    return RetryEngine(RetryPolicy(max_attempts=max_attempts, base_delay=0), **kwargs)
+
+def test_breaker_opens_after_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+def test_breaker_half_open():
+    """reset_timeout 过后放行一个探测请求：失败重新打开，成功关闭"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    breaker.opened_at -= 31
+    assert breaker.allow()
+    assert breaker.state == "half-open"
+    assert not breaker.allow()   # 探测请求还没结果，不再放行
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    breaker.opened_at -= 31
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+def test_open_breaker_fails_fast():
+    engine = make_engine(failure_threshold=1)
+    session = FakeSession([503, 503])
+    engine.get("https://down.example.com/", session=session)
+    try:
+        engine.get("https://down.example.com/", session=session)
+    except CircuitOpenError:
+        pass
+    else:
+        raise AssertionError("熔断打开后应快速失败")
+    assert len(session.methods) == 1
+
+def test_retries_and_hooks_per_attempt():
+    """限速和 on_response 每次尝试都执行，重试也计入"""
+    engine = make_engine()
+    session = FakeSession([503, 502, 200])
+    limiter = CountingLimiter()
+    seen = []
+    response = engine.get("https://api.example.com/search", session=session,
+                          limiter=limiter, on_response=lambda r: seen.append(r.status_code))
+    assert response.status_code == 200
+    assert len(limiter.acquired) == 3
+    assert seen == [503, 502, 200]
+
+def test_post_not_retried_by_default():
+    engine = make_engine()
+    session = FakeSession([503, 200])
+    assert engine.post("https://api.example.com/order", session=session).status_code == 503
+    assert session.methods == ["POST"]
+
+    session = FakeSession([503, 200])
+    response = engine.post("https://api.example.com/search", session=session, retry_unsafe=True)
+    assert response.status_code == 200
+    assert session.methods == ["POST", "POST"]
+
+def test_network_error_raised_after_attempts():
+    engine = make_engine(max_attempts=2)
+    calls = []
+
+    def send():
+        calls.append(time.monotonic())
+        raise requests.exceptions.ConnectionError("boom")
+
+    try:
+        engine.call("https://flaky.example.com/", send)
+    except requests.exceptions.ConnectionError:
+        pass
+    else:
+        raise AssertionError("重试用尽后应抛出最后一次异常")
+    assert len(calls) == 2
+
+def test_requesters_pace_every_attempt():
+    """StealthRequester / AsyncRequester 的重试同样按 host 限速"""
+    limiter = CountingLimiter()
+    stealth = StealthRequester(use_proxy=False, limiter=limiter, retry=make_engine())
+    stealth.session = FakeSession([503, 502, 200])
+    assert stealth.get("https://api.example.com/a").status_code == 200
+    assert len(limiter.acquired) == 3
+
+    limiter = CountingLimiter()
+    requester = AsyncRequester(use_proxy=False, limiter=limiter, retry=make_engine())
+    requester.session = FakeSession([503, 200])
+    try:
+        assert asyncio.run(requester.get("https://api.example.com/b")).status_code == 200
+    finally:
+        requester.close()
+    # 第一次尝试在事件循环里取令牌，重试在线程里取，不重复
+    assert len(limiter.acquired) == 2
+
+if __name__ == "__main__":
+    test_breaker_opens_after_failures()
+    test_breaker_half_open()
+    test_open_breaker_fails_fast()
+    test_retries_and_hooks_per_attempt()
+    test_post_not_retried_by_default()
+    test_network_error_raised_after_attempts()
+    test_requesters_pace_every_attempt()
+    print("✅ 重试与熔断测试通过")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🗂️ 搜索缓存与配额测试（离线，内存 / 临时数据库）
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+
+from search_cache import SearchCache, QuotaTracker
+from search_tools import UnifiedSearch, quota_counter
+
+RESULTS = [{"title": "Gold", "url": "https://example.com/gold", "description": "金价"}]
+
+def test_cache_hit_and_expiry():
+    cache = SearchCache(":memory:", ttl=60)
+    assert cache.get("brave", "gold price", 10, "zh") is None
+    cache.put("brave", "gold price", 10, "zh", RESULTS)
+    # 查询词忽略大小写和多余空格；count / lang 不同算不同的键
+    assert cache.get("brave", "  Gold   PRICE ", 10, "zh") == RESULTS
+    assert cache.get("brave", "gold price", 5, "zh") is None
+    assert cache.get("serper", "gold price", 10, "zh") is None
+    assert cache.stats()["hits"] == 1
+
+    stale = SearchCache(":memory:", ttl=0)
+    stale.put("brave", "gold", 10, "", RESULTS)
+    assert stale.get("brave", "gold", 10) is None
+    assert stale.get("brave", "gold", 10, allow_stale=True) == RESULTS
+
+def test_cache_persists():
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "search_cache.sqlite")
+        SearchCache(path).put("brave", "gold", 10, "zh", RESULTS)
+        assert SearchCache(path).get("brave", "gold", 10, "zh") == RESULTS
+
+def test_eviction_prefers_free_engines():
+    cache = SearchCache(":memory:", memory_items=0, max_rows=2)
+    cache.put("wikipedia", "gold", 10, "zh", RESULTS)
+    cache.put("brave", "gold", 10, "zh", RESULTS)
+    cache.put("serper", "gold", 10, "", RESULTS)
+    assert cache.get("wikipedia", "gold", 10, "zh") is None
+    assert cache.get("brave", "gold", 10, "zh") == RESULTS
+    assert cache.get("serper", "gold", 10) == RESULTS
+
+def test_quota_exhaustion():
+    quota = QuotaTracker(":memory:", quotas={"brave": (10, "month"), "serper": (10, "total")}, threshold=0.9)
+    quota.record("brave", 8)
+    assert quota.remaining("brave") == 2 and not quota.nearly_exhausted("brave")
+    quota.record("brave")
+    assert quota.remaining("brave") == 1 and quota.nearly_exhausted("brave")
+    quota.record("brave", 5)
+    assert quota.remaining("brave") == 0
+    # 引擎之间分开计数；免费引擎不计
+    assert quota.used("serper") == 0
+    quota.record("wikipedia")
+    assert quota.remaining("wikipedia") is None and not quota.nearly_exhausted("wikipedia")
+
+class FakeResponse:
+    def __init__(self, ok):
+        self.ok = ok
+
+def test_quota_counter_counts_2xx():
+    quota = QuotaTracker(":memory:")
+    count = quota_counter(quota, "brave")
+    for ok in (False, True, True):
+        count(FakeResponse(ok))
+    assert quota.used("brave") == 2
+    assert quota_counter(None, "brave") is None
+
+class FakeEngine:
+    LANG = "zh"
+
+    def __init__(self):
+        self.calls = 0
+
+    def search(self, query, count=10):
+        self.calls += 1
+        return [{"title": "New", "url": "https://example.com/new", "description": ""}]
+
+def test_exhausted_quota_serves_stale_cache():
+    """付费引擎配额快用完时只用缓存，过期的也用，不再请求"""
+    cache = SearchCache(":memory:", ttl=0)
+    quota = QuotaTracker(":memory:", quotas={"brave": (10, "month")})
+    searcher = UnifiedSearch(cache=cache, quota=quota)
+    engine = FakeEngine()
+    searcher.engines = {"brave": engine}
+
+    cache.put("brave", "gold", 10, "zh", RESULTS)
+    quota.record("brave", 9)
+    assert searcher.search("gold") == {"brave": RESULTS}
+    # 没有缓存的查询返回空结果
+    assert searcher.search("silver") == {}
+    assert engine.calls == 0
+
+    # 额度充足时过期缓存不用，正常请求
+    searcher.quota = QuotaTracker(":memory:", quotas={"brave": (10, "month")})
+    assert searcher.search("gold")["brave"][0]["title"] == "New"
+    assert engine.calls == 1
+
+if __name__ == "__main__":
+    test_cache_hit_and_expiry()
+    test_cache_persists()
+    test_eviction_prefers_free_engines()
+    test_quota_exhaustion()
+    test_quota_counter_counts_2xx()
+    test_exhausted_quota_serves_stale_cache()
+    print("✅ 搜索缓存与配额测试通过")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔍 统一搜索测试（离线，假引擎 + 内存数据库）
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+
+from search_cache import SearchCache, QuotaTracker
+from search_tools import UnifiedSearch, merge_results, normalize_url
+
+class FakeEngine:
+    """等 delay 秒后返回预设结果，记录调用次数"""
+
+    LANG = ""
+
+    def __init__(self, results, delay=0.0):
+        self.results = results
+        self.delay = delay
+        self.calls = 0
+
+    def search(self, query, count=10):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.results
+
+def make_searcher(engines):
+    searcher = UnifiedSearch(cache=SearchCache(":memory:"), quota=QuotaTracker(":memory:"))
+    searcher.engines = engines
+    return searcher
+
+def item(n):
+    return {"title": f"T{n}", "url": f"https://example.com/{n}", "description": ""}
+
+def test_all_engines_queried_concurrently():
+    engines = {
+        "brave": FakeEngine([item(1)], delay=0.2),
+        "serper": FakeEngine([item(2)], delay=0.2),
+        "wikipedia": FakeEngine([], delay=0.2),
+    }
+    searcher = make_searcher(engines)
+    start = time.monotonic()
+    results, latencies = searcher.search_timed("gold")
+    assert time.monotonic() - start < 0.5     # 并发，不是 3 × 0.2s
+    assert results == {"brave": [item(1)], "serper": [item(2)]}
+    assert all(latencies[name] >= 0.2 for name in engines)
+
+    # 第二次命中缓存，不再调用引擎；空结果不缓存
+    searcher.search_timed("gold")
+    assert [e.calls for e in engines.values()] == [1, 1, 2]
+
+def test_deadline_skips_slow_engine():
+    slow = FakeEngine([item(3)], delay=1.0)
+    searcher = make_searcher({"wikipedia": FakeEngine([item(1)]), "serper": slow})
+    start = time.monotonic()
+    results, latencies = searcher.search_timed("gold", deadline=0.3)
+    assert time.monotonic() - start < 0.8
+    assert results == {"wikipedia": [item(1)]}
+    assert latencies["serper"] is None and latencies["wikipedia"] is not None
+
+def test_first_mode_returns_early():
+    searcher = make_searcher({
+        "wikipedia": FakeEngine([item(1)]),
+        "serper": FakeEngine([item(2)], delay=1.0),
+    })
+    start = time.monotonic()
+    results = searcher.search("gold", mode="first")
+    assert time.monotonic() - start < 0.8
+    assert results == {"wikipedia": [item(1)]}
+
+    try:
+        searcher.search("gold", mode="fastest")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("未知 mode 应抛出 ValueError")
+
+def test_paid_engine_skipped_after_finish():
+    """搜索已经返回后才开始的付费引擎不再请求，免费引擎照常"""
+    paid, free = FakeEngine([item(1)]), FakeEngine([item(2)])
+    searcher = make_searcher({"brave": paid, "wikipedia": free})
+    finished = threading.Event()
+    finished.set()
+    assert searcher._timed_search("brave", paid, "gold", 10, finished)[0] == []
+    assert searcher._timed_search("wikipedia", free, "gold", 10, finished)[0] == [item(2)]
+    assert (paid.calls, free.calls) == (0, 1)
+
+    # 已有缓存的付费结果仍然返回
+    searcher.cache.put("brave", "gold", 10, "", [item(3)])
+    assert searcher._timed_search("brave", paid, "gold", 10, finished)[0] == [item(3)]
+
+def test_normalize_url():
+    assert normalize_url("http://www.Example.com:443/a/?utm_source=x&b=2&a=1#top") == "https://example.com/a?a=1&b=2"
+    assert normalize_url("https://example.com:8080/a?gclid=1") == "https://example.com:8080/a"
+
+def test_rrf_ordering_with_ties():
+    results = {
+        "brave": [item(1), item(2), item(3)],
+        "serper": [item(2), item(1)],
+        "wikipedia": [item(4)],
+    }
+    merged = list(merge_results(results, k=60))
+    # 1 和 2 得分相同（1/61 + 1/62），按先出现的顺序；4 虽排第一但只有一个引擎，排在其后
+    assert [m["url"] for m in merged] == [
+        "https://example.com/1", "https://example.com/2", "https://example.com/4", "https://example.com/3"]
+    assert merged[0]["score"] == merged[1]["score"] == 1 / 61 + 1 / 62
+    assert merged[0]["engines"] == ["brave", "serper"]
+    assert merged[2]["score"] == 1 / 61
+
+def test_rrf_dedup_keeps_description():
+    results = {
+        "brave": [{"title": "Gold", "url": "https://www.example.com/gold/?utm_source=brave", "description": ""}],
+        "serper": [{"title": "Gold", "url": "http://example.com/gold", "description": "金价"}],
+    }
+    merged = list(merge_results(results))
+    assert len(merged) == 1
+    assert merged[0]["url"] == "https://www.example.com/gold/?utm_source=brave"
+    assert merged[0]["description"] == "金价"
+    assert merged[0]["engines"] == ["brave", "serper"]
+    assert list(merge_results({})) == []
+
+if __name__ == "__main__":
+    test_all_engines_queried_concurrently()
+    test_deadline_skips_slow_engine()
+    test_first_mode_returns_early()
+    test_paid_engine_skipped_after_finish()
+    test_normalize_url()
+    test_rrf_ordering_with_ties()
+    test_rrf_dedup_keeps_description()
+    print("✅ 统一搜索测试通过")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🔌 共享连接池测试（离线，只检查 Session 和 adapter 配置）
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+
+from session_pool import SessionRegistry, default_sessions
+
+def test_same_name_same_session():
+    sessions = SessionRegistry()
+    try:
+        assert sessions.session("search") is sessions.session("search")
+        # 不同名字 Cookie 互相隔离
+        assert sessions.session("search") is not sessions.session("feeds")
+        assert default_sessions() is default_sessions()
+    finally:
+        sessions.close()
+
+def test_pool_sizes():
+    sessions = SessionRegistry(pool_maxsize=4)
+    try:
+        session = sessions.session()
+        adapter = session.get_adapter("https://example.com/")
+        assert adapter._pool_maxsize == 4 and adapter._pool_block
+
+        # 已创建和以后创建的 Session 都按 host 限制连接数
+        sessions.set_limit("https://api.search.brave.com", maxsize=2)
+        for s in (session, sessions.session("later")):
+            assert s.get_adapter("https://api.search.brave.com/res/v1/web/search")._pool_maxsize == 2
+            assert s.get_adapter("https://example.com/")._pool_maxsize == 4
+    finally:
+        sessions.close()
+
+def test_close_forgets_sessions():
+    sessions = SessionRegistry()
+    first = sessions.session("search")
+    sessions.close()
+    assert sessions.session("search") is not first
+    sessions.close()
+
+if __name__ == "__main__":
+    test_same_name_same_session()
+    test_pool_sizes()
+    test_close_forgets_sessions()
+    print("✅ 共享连接池测试通过")